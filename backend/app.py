@@ -1,4 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status, Header, Depends, Request
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status, Header, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import cv2
@@ -9,28 +9,29 @@ from cryptography.fernet import Fernet
 import asyncio
 from asyncio import Lock
 import dateutil.parser
-import mediapipe as mp
-from ultralytics import YOLO
 import uvicorn
 import math
 import tempfile
 import os
 import hashlib
+import json
 import uuid
 import time
+import threading
+import secrets
 from collections import defaultdict
 import functools
-from cachetools import LRUCache, cached
+from cachetools import cached
 
 # Security imports
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from security import (
-    hash_password, verify_password, create_access_token, verify_token,
-    hash_biometric_photo, create_audit_log, validate_environment
+    create_access_token, verify_token,
+    hash_biometric_photo, create_audit_log, validate_environment, require_admin_key
 )
-from models import VoterRegistration, LoginRequest, VoteCast, PartyCreate, SettingsUpdate, UserRegister, PartyAdd
+from models import VoterRegistration, LoginRequest, VoteCast, PartyCreate, SettingsUpdate, UserRegister, PartyAdd, PhotoPrefetch, RollImport, VoterIdBatch
 
 app = FastAPI(title="Secure Election System", version="2.0.0")
 
@@ -63,137 +64,185 @@ async def add_security_headers(request: Request, call_next):
 
 
 # --- MODELS ---
-print("Initializing Models...")
+# Loaded in the background by the registry (see startup_event); endpoints that need a
+# model await it via require_models(), everything else serves immediately.
+from model_registry import ModelRegistry, ModelNotReady
+from config.settings import (
+    INFERENCE_BACKEND, ONNX_YOLO_PATH, ONNX_FACE_PATH, ONNX_FACE_THRESHOLD, ONNX_THREADS,
+    DETECTOR_POOL_SIZE, INFERENCE_WORKERS
+)
+from onnx_backend import OnnxPhoneDetector, OnnxFaceEmbedder, cosine_distance
+from detector_pool import DetectorPool
+from concurrent.futures import ThreadPoolExecutor
 
-# 1. YOLO
-yolo_model = None
-try:
-    yolo_model = YOLO("yolov8n.pt")
-    print("YOLO Loaded.")
-except:
-    print("YOLO Failed (Skipping).")
+model_registry = ModelRegistry()
+MODEL_WAIT_TIMEOUT = float(os.getenv("MODEL_WAIT_TIMEOUT", "60"))
 
-# 2. MediaPipe (Video)
+# CPU inference runs here, off the event loop; one detector per thread at most
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+yolo_model = None
+yolo_lock = threading.Lock()  # ultralytics predictors are not safe to share across threads
+mp = None
 mp_face_mesh = None
-face_mesh = None
-id_face_mesh = None
+face_mesh_pool = None  # Static-image FaceMesh instances (stateless frames, reference photos)
+id_face_mesh_pool = None  # Permissive FaceMesh instances for ID cards
+tracking_face_mesh_pool = None  # Video-mode FaceMesh instances checked out per liveness session
 mp_drawing = None
 mp_styles = None
-
-try:
-    import mediapipe as mp
-    try:
-        # Robust check for solutions
-        if hasattr(mp, 'solutions'):
-            mp_face_mesh = mp.solutions.face_mesh
-            mp_drawing = mp.solutions.drawing_utils
-            mp_styles = mp.solutions.drawing_styles
-        else:
-            # Try explicit imports if not in mp
-            try:
-                import mediapipe.solutions.face_mesh as mp_face_mesh_mod
-                mp_face_mesh = mp_face_mesh_mod
-            except: pass
-            try:
-                import mediapipe.solutions.drawing_utils as mp_drawing_mod
-                mp_drawing = mp_drawing_mod
-            except: pass
-            try:
-                import mediapipe.solutions.drawing_styles as mp_styles_mod
-                mp_styles = mp_styles_mod
-            except: pass
-            
-        if mp_face_mesh:
-            face_mesh = mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            
-            # 2b. MediaPipe (ID Card - Permissive)
-            id_face_mesh = mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.1,
-                min_tracking_confidence=0.1
-            )
-            print("MediaPipe Loaded Successfully.")
-        else:
-            print("MediaPipe solutions not found.")
-    except Exception as ie:
-         print(f"MediaPipe Init Error: {ie}")
-
-except ImportError:
-    print("MediaPipe NOT FOUND. Install: pip install mediapipe")
-except Exception as e:
-    print(f"MediaPipe Failed: {e}")
-
-
-# 3. Face Recognition
+DeepFace = None
 USE_FACE_REC = False
-try:
-    import face_recognition
+face_recognition = None
+face_embedder = None  # ONNX VGG-Face (INFERENCE_BACKEND=onnx only)
+
+# 1. YOLO
+def load_yolo():
+    global yolo_model
+    if INFERENCE_BACKEND == "onnx":
+        yolo_model = OnnxPhoneDetector(ONNX_YOLO_PATH, threads=ONNX_THREADS)
+        return yolo_model
+    from ultralytics import YOLO
+    yolo_model = YOLO("yolov8n.pt")
+    return yolo_model
+
+# 2. MediaPipe (Video + ID Card)
+def load_mediapipe():
+    global mp, mp_face_mesh, face_mesh_pool, id_face_mesh_pool, tracking_face_mesh_pool, mp_drawing, mp_styles
+    import mediapipe as mp_mod
+    mp = mp_mod
+    # Robust check for solutions
+    if hasattr(mp, 'solutions'):
+        mp_face_mesh = mp.solutions.face_mesh
+        mp_drawing = mp.solutions.drawing_utils
+        mp_styles = mp.solutions.drawing_styles
+    else:
+        # Try explicit imports if not in mp
+        import mediapipe.solutions.face_mesh as mp_face_mesh_mod
+        mp_face_mesh = mp_face_mesh_mod
+        try:
+            import mediapipe.solutions.drawing_utils as mp_drawing_mod
+            import mediapipe.solutions.drawing_styles as mp_styles_mod
+            mp_drawing, mp_styles = mp_drawing_mod, mp_styles_mod
+        except ImportError: pass
+
+    # Pooled instances serve any client's next frame: static mode, so no landmarks carry over
+    face_mesh_pool = DetectorPool(
+        lambda: mp_face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        ),
+        size=DETECTOR_POOL_SIZE, name="face_mesh"
+    )
+
+    # 2b. MediaPipe (ID Card - Permissive)
+    id_face_mesh_pool = DetectorPool(
+        lambda: mp_face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.1,
+            min_tracking_confidence=0.1
+        ),
+        size=DETECTOR_POOL_SIZE, name="id_face_mesh"
+    )
+    # 2c. MediaPipe (liveness sessions - tracking mode, one per active session)
+    tracking_face_mesh_pool = DetectorPool(create_tracking_face_mesh, size=LIVENESS_TRACKING_MESHES,
+                                           name="tracking_face_mesh")
+    face_mesh_pool.prewarm()
+    id_face_mesh_pool.prewarm()
+    return mp_face_mesh
+
+# 3. DeepFace (VGG-Face verification + emotion), warmed up so the first request is fast
+def load_deepface():
+    global DeepFace
+    from deepface import DeepFace as deepface_mod
+    if INFERENCE_BACKEND == "onnx":
+        # Verification runs on ONNX Runtime; DeepFace only serves the emotion check
+        deepface_mod.build_model("Emotion")
+    else:
+        deepface_mod.build_model("VGG-Face")
+        dummy = np.zeros((224, 224, 3), dtype=np.uint8)
+        try:
+            deepface_mod.verify(dummy, dummy, model_name='VGG-Face', enforce_detection=False, silent=True)
+        except: pass
+    DeepFace = deepface_mod
+    return DeepFace
+
+# 4. Face Recognition (optional, geometric fallback otherwise)
+def load_face_recognition():
+    global face_recognition, USE_FACE_REC
+    import face_recognition as face_recognition_mod
+    face_recognition = face_recognition_mod
     USE_FACE_REC = True
-    print("face_recognition Loaded.")
-except ImportError:
-    print("Using Geometric Fallback Only.")
+    return face_recognition
+
+model_registry.register("yolo", load_yolo)
+model_registry.register("mediapipe", load_mediapipe)
+model_registry.register("deepface", load_deepface)
+model_registry.register("face_recognition", load_face_recognition)
+
+# 5. Haar face detector (pooled for the structural fallback instead of per-request XML loads)
+haar_pool = None
+
+def create_haar_cascade():
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise RuntimeError("haarcascade_frontalface_default.xml could not be loaded")
+    return cascade
+
+def load_haar_cascade():
+    global haar_pool
+    pool = DetectorPool(create_haar_cascade, size=DETECTOR_POOL_SIZE, name="haar_cascade")
+    pool.prewarm()
+    haar_pool = pool
+    return haar_pool
+
+model_registry.register("haar_cascade", load_haar_cascade)
+
+# 6. ONNX face embedder (replaces DeepFace.verify when INFERENCE_BACKEND=onnx)
+def load_face_embedder():
+    global face_embedder
+    face_embedder = OnnxFaceEmbedder(ONNX_FACE_PATH, threads=ONNX_THREADS)
+    return face_embedder
+
+if INFERENCE_BACKEND == "onnx":
+    model_registry.register("face_embedder", load_face_embedder)
+
+async def require_models(*names):
+    """Wait for the models an endpoint needs; 503 if they are still loading"""
+    try:
+        await model_registry.wait(*names, timeout=MODEL_WAIT_TIMEOUT)
+    except ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 # --- HELPERS ---
+from face_geometry import (
+    landmarks_to_array, get_geometric_vector, eye_aspect_ratio, check_eyebrow,
+    check_head_pose, check_landmark_consistency, face_box, smile_score
+)
 
-def get_geometric_vector(frame, landmarks, w, h):
-    # Geometric feature vector
-    points = [33, 263, 1, 61, 291, 199, 152] 
-    coords = []
-    for p in points:
-        coords.append(np.array([landmarks[p].x * w, landmarks[p].y * h]))
-    
-    scale = np.linalg.norm(coords[0] - coords[1])
-    if scale == 0: return None
-    
-    vector = []
-    for i in range(len(coords)):
-        for j in range(i+1, len(coords)):
-             dist = np.linalg.norm(coords[i] - coords[j])
-             vector.append(dist / scale)
-    return np.array(vector)
-
-def eye_aspect_ratio(landmarks, w, h):
-    # Dlib/MediaPipe Mapping
-    # Left Eye: 362, 385, 387, 263, 373, 380
-    # Right Eye: 33, 160, 158, 133, 153, 144
-    left = [362, 385, 387, 263, 373, 380]
-    right = [33, 160, 158, 133, 153, 144]
-    
-    def ear(idxs):
-        p = [np.array([landmarks[i].x * w, landmarks[i].y * h]) for i in idxs]
-        v1 = np.linalg.norm(p[1]-p[5])
-        v2 = np.linalg.norm(p[2]-p[4])
-        hor = np.linalg.norm(p[0]-p[3])
-        return (v1 + v2) / (2.0 * hor)
-    
-    return (ear(left) + ear(right)) / 2.0
+from frame_prep import PreparedFrame, as_prepared, fit_max_dim, frame_thumbnail
 
-def detect_darkness(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+def detect_darkness(gray):
     return np.mean(gray) < 40
 
-def analyze_texture(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+def analyze_texture(gray):
     laplacian = cv2.Laplacian(gray, cv2.CV_64F)
     return laplacian.var() < 25  # Blur check
 
-# --- DEEPFACE FOR EMOTION ---
-try:
-    from deepface import DeepFace
-    print("DeepFace Loaded.")
-except ImportError:
-    print("DeepFace not found. Please install: pip install deepface tf-keras")
-    DeepFace = None
+# --- SMILE: landmark score first, DeepFace emotion only confirms a candidate ---
+def is_smile_candidate(score, baseline=None):
+    if score >= SMILE_SCORE_THRESHOLD: return True
+    # Relative to this session's neutral mouth, for faces narrower/wider than average
+    return baseline is not None and score >= baseline * SMILE_BASELINE_GAIN
 
 def check_smile(frame, x, y, w, h):
     # Use DeepFace for robust emotion detection (Happy)
     if DeepFace is None: return False
+    liveness_signals.count("emotion_runs")
     try:
         # Extract face region
         face_img = frame[y:y+h, x:x+w]
@@ -206,131 +255,202 @@ def check_smile(frame, x, y, w, h):
         
         emotion = res.get('dominant_emotion')
         # print(f"Emotion: {emotion}")
-        return emotion == 'happy'
+        if emotion == 'happy':
+            liveness_signals.count("emotion_confirmed")
+            return True
+        return False
     except Exception as e:
         # print(f"DeepFace Error: {e}")
         return False
 
-# MediaPipe Geometry for others
-def check_eyebrow(landmarks, w, h):
-    # Eyebrow Raise: Distance between eyebrow and eye
-    eyebrow_y = (landmarks[65].y + landmarks[159].y) / 2
-    eye_y = landmarks[145].y
-    dist = abs(eye_y - eyebrow_y)
-    
-    # Normalize by approx face height (Chin to Top)
-    face_h = abs(landmarks[152].y - landmarks[10].y)
-    ratio = dist / face_h
-    
-    # print(f"Eyebrow Ratio: {ratio:.3f}")
-    return ratio > 0.05
-
-def check_head_pose(landmarks, w, h):
-    # Estimate Head Pose (Yaw, Pitch)
-    # 1. Nose Tip (1)
-    # 2. Left Eye Outer (33) -> Actually use 263 (Right) and 33 (Left) for width
-    # 3. Chin (152) 
-    
-    nose_tip = landmarks[1]
-    chin = landmarks[152]
-    left_eye = landmarks[33]
-    right_eye = landmarks[263]
-    
-    # Coordinates
-    nx, ny = nose_tip.x * w, nose_tip.y * h
-    cx, cy = chin.x * w, chin.y * h
-    lx, ly = left_eye.x * w, left_eye.y * h
-    rx, ry = right_eye.x * w, right_eye.y * h
-    
-    # 1. Yaw (Left-Right rotation)
-    # Compare distances from nose to left/right eyes
-    dist_l = math.sqrt((nx - lx)**2 + (ny - ly)**2)
-    dist_r = math.sqrt((nx - rx)**2 + (ny - ry)**2)
-    
-    # If looking straight, distances should be similar.
-    # Yaw ratio: deviation from 1.0
-    yaw_ratio = min(dist_l, dist_r) / max(dist_l, dist_r)
-    
-    # 2. Pitch (Up-Down rotation)
-    # Nose position relative to eye-chin line verticality
-    # For simple frontal check, ensure nose is appropriately between eyes and chin
-    # (Simple logic: verify nose is not too high/low)
-    
-    # Strict Frontal Check:
-    # Yaw Ratio > 0.5 (Not turned too much)
-    is_frontal = yaw_ratio > 0.5
-    
-    return is_frontal
-
-def check_landmark_consistency(landmarks):
-    # Basic consistency check: ensure face points are in valid relative positions
-    # e.g., nose is between eyes, mouth is below nose
-    nose = landmarks[1].y
-    mouth_top = landmarks[13].y
-    left_eye = landmarks[33].y
-    right_eye = landmarks[263].y
-    
-    valid_vertical = left_eye < nose and right_eye < nose and nose < mouth_top
-    return valid_vertical
-
-def eye_aspect_ratio(landmarks, w, h):
-    # Left Eye: 362, 385, 387, 263, 373, 380
-    # Right Eye: 33, 160, 158, 133, 153, 144
-    left = [362, 385, 387, 263, 373, 380]
-    right = [33, 160, 158, 133, 153, 144]
-    
-    def ear(idxs):
-        p = [np.array([landmarks[i].x * w, landmarks[i].y * h]) for i in idxs]
-        v1 = np.linalg.norm(p[1]-p[5])
-        v2 = np.linalg.norm(p[2]-p[4])
-        hor = np.linalg.norm(p[0]-p[3])
-        return (v1 + v2) / (2.0 * hor)
-    
-    return (ear(left) + ear(right)) / 2.0
-
-def ensure_face_mesh():
-    global face_mesh, mp_face_mesh
-    if face_mesh is None:
-         try:
-            # Try to get solutions again if it was missing
-            if mp_face_mesh is None:
-                if hasattr(mp, 'solutions'):
-                    mp_face_mesh = mp.solutions.face_mesh
-                else:
-                    import mediapipe.solutions.face_mesh as mp_fm
-                    mp_face_mesh = mp_fm
-            
-            face_mesh = mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            return True
-         except Exception as e:
-            print(f"Lazy Init Failed: {e}")
-            return False
-    return True
+def verify_faces(img1, img2):
+    """Face embedding verification on the configured backend -> {verified, distance, backend}"""
+    if face_embedder is not None:
+        dist = cosine_distance(face_embedder.embed(img1), face_embedder.embed(img2))
+        return {"verified": dist <= ONNX_FACE_THRESHOLD, "distance": dist, "backend": "onnx"}
+    result = DeepFace.verify(
+        img1_path=img1,
+        img2_path=img2,
+        model_name='VGG-Face',
+        enforce_detection=False,
+        silent=True # Don't flood logs
+    )
+    return {"verified": result["verified"], "distance": result["distance"], "backend": "deepface"}
 
 def calculate_face_vector(img):
-    if not ensure_face_mesh(): return None
+    if face_mesh_pool is None: return None
     
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    frame = as_prepared(img)
     try:
-        mp_res = face_mesh.process(rgb)
+        with face_mesh_pool.acquire() as mesh:
+            mp_res = mesh.process(frame.rgb)
         if mp_res.multi_face_landmarks:
-                lm = mp_res.multi_face_landmarks[0].landmark
-                h, w, _ = img.shape
-                return get_geometric_vector(img, lm, w, h)
+                pts = landmarks_to_array(mp_res.multi_face_landmarks[0].landmark)
+                h, w, _ = frame.shape
+                return get_geometric_vector(pts, w, h)
     except Exception as e:
         print(f"Processing Error: {e}")
     return None
 
+def create_tracking_face_mesh():
+    # Video mode: FaceMesh reuses the previous frame's landmarks instead of re-detecting
+    if mp_face_mesh is None: return None
+    return mp_face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+def detect_phone(frame):
+    if not yolo_model: return False
+    if INFERENCE_BACKEND == "onnx":
+        return yolo_model.detect_phone(frame)
+    with yolo_lock:
+        y_res = yolo_model(frame, verbose=False)
+    for box in y_res[0].boxes:
+        if int(box.cls) == 67 and box.conf > 0.5:
+            return True
+    return False
+
+def draw_face_mesh(image, face_landmarks):
+    if mp_drawing and mp_styles and mp_face_mesh:
+        mp_drawing.draw_landmarks(
+            image=image,
+            landmark_list=face_landmarks,
+            connections=mp_face_mesh.FACEMESH_TESSELATION,
+            landmark_drawing_spec=None,
+            connection_drawing_spec=mp_styles.get_default_face_mesh_tesselation_style()
+        )
+
+# Landmark quantization for the "landmarks" response mode:
+# normalized frame coordinates * LANDMARK_SCALE, packed as little-endian int16 (x, y) pairs
+LANDMARK_SCALE = 16384
+
+def to_frame_coords(pts, x0, y0, crop_w, crop_h, frame_w, frame_h):
+    # Crop-normalized landmarks -> frame-normalized landmarks
+    out = pts.copy()
+    out[:, 0] = (pts[:, 0] * crop_w + x0) / frame_w
+    out[:, 1] = (pts[:, 1] * crop_h + y0) / frame_h
+    return out
+
+def pack_landmarks(pts):
+    coords = pts[:, :2]
+    q = np.clip(np.rint(coords * LANDMARK_SCALE), -32768, 32767).astype('<i2')
+    return base64.b64encode(q.tobytes()).decode('ascii')
+
+def analyze_frame(frame, session=None):
+    """
+    Run the liveness checks on one PreparedFrame (a BGR array is wrapped).
+    With a LivenessSession, FaceMesh tracks inside the session ROI and YOLO / DeepFace
+    only run when due; without one every check runs on the full frame.
+    Returns (results, face_landmarks, pts, (x0, y0, crop)): the mesh and the (N, 3)
+    landmark array `pts` are normalized to `crop` (a BGR view into `frame`), which
+    starts at (x0, y0) in `frame`.
+    """
+    prepared = as_prepared(frame)
+    frame = prepared.bgr
+    results = {
+        "faces_detected": 0,
+        "phone_detected": False,
+        "dark_surroundings": False,
+        "suspicious_texture": False,
+        "smile_detected": False,
+        "blink_detected": False,
+        "eyebrow_movement": False,
+        "head_pose_good": False,
+        "landmarks_consistent": False,
+        "identity_verified": False
+    }
+
+    # Both checks share the one gray conversion of the frame
+    if detect_darkness(prepared.gray): results["dark_surroundings"] = True
+    if analyze_texture(prepared.gray): results["suspicious_texture"] = True
+
+    if session is None:
+        results["phone_detected"] = detect_phone(frame)
+    else:
+        if session.due(session.last_yolo_frame, LIVENESS_YOLO_EVERY):
+            session.phone_detected = detect_phone(frame)
+            session.last_yolo_frame = session.frame_count
+        results["phone_detected"] = session.phone_detected
+
+    # Session path: tracking FaceMesh on the last ROI. Stateless path: pooled detector.
+    mesh = session.face_mesh if session is not None else None
+    if mesh is None and face_mesh_pool is None:
+        return results, None, None, (0, 0, frame)
+
+    x0, y0, view = 0, 0, prepared
+    if session is not None and session.roi is not None:
+        x0, y0, rw, rh = session.roi
+        view = prepared.crop(x0, y0, rw, rh)  # Only the ROI is converted to RGB
+    crop = view.bgr
+
+    h, w, _ = crop.shape
+    rgb = view.rgb
+    if mesh is not None:
+        mp_res = mesh.process(rgb)
+    else:
+        with face_mesh_pool.acquire() as pooled_mesh:
+            mp_res = pooled_mesh.process(rgb)
+
+    if not mp_res.multi_face_landmarks:
+        if session is not None: session.lose_face()
+        return results, None, None, (x0, y0, crop)
+
+    results["faces_detected"] = 1
+    face_landmarks = mp_res.multi_face_landmarks[0]
+    pts = landmarks_to_array(face_landmarks.landmark)
+
+    bx, by, bw, bh = face_box(pts, w, h)
+    if session is not None:
+        session.landmarks = to_frame_coords(pts, x0, y0, w, h, frame.shape[1], frame.shape[0])
+        session.update_roi((bx + x0, by + y0, bw, bh), frame.shape)
+
+    ear = eye_aspect_ratio(pts, w, h)
+    results["blink_detected"] = ear < 0.22
+
+    score = smile_score(pts, w, h)
+    results["smile_score"] = round(score, 3)
+    liveness_signals.count("face_frames")
+    if session is None:
+        if is_smile_candidate(score):
+            liveness_signals.count("smile_candidates")
+            results["smile_detected"] = check_smile(crop, bx, by, bw, bh)
+    elif not session.evidence["smile_detected"]:
+        candidate = is_smile_candidate(score, session.smile_baseline)
+        session.observe_smile(score)
+        if candidate:
+            liveness_signals.count("smile_candidates")
+            if session.due(session.last_smile_frame, LIVENESS_SMILE_EVERY):
+                results["smile_detected"] = check_smile(crop, bx, by, bw, bh)
+                session.last_smile_frame = session.frame_count
+                session.emotion_runs += 1
+    results["eyebrow_movement"] = check_eyebrow(pts)
+    results["head_pose_good"] = check_head_pose(pts, w, h)
+    results["landmarks_consistent"] = check_landmark_consistency(pts)
+
+    return results, face_landmarks, pts, (x0, y0, crop)
+
 from supabase import create_client, Client
 from config.settings import MONGO_URI, DB_NAME # Kept for env loading mostly
+from config.settings import (
+    LIVENESS_SESSION_TTL, LIVENESS_MAX_SESSIONS, LIVENESS_TRACKING_MESHES, LIVENESS_YOLO_EVERY, LIVENESS_SMILE_EVERY,
+    LIVENESS_FRAME_MAX_DIM, VERIFY_FRAME_MAX_DIM, ID_FRAME_MAX_DIM,
+    SMILE_SCORE_THRESHOLD, SMILE_BASELINE_GAIN, FRAME_CHANGE_THRESHOLD, FRAME_SKIP_MAX
+)
+from liveness import LivenessTracker, SignalStats
 import os
 from datetime import datetime
 
+liveness_signals = SignalStats()
+liveness_tracker = LivenessTracker(
+    maxsize=LIVENESS_MAX_SESSIONS,
+    ttl=LIVENESS_SESSION_TTL,
+    face_mesh_pool=lambda: tracking_face_mesh_pool
+)
+
 # --- SUPABASE CONFIG ---
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
@@ -348,22 +468,183 @@ CONTRACT_ABI = None
 CONTRACT_BYTECODE = None
 CONTRACT_ADDRESS = None
 
+# Provider: pooled keep-alive session + JSON-RPC batching at w3.batch (see chain_rpc.py)
+from chain_rpc import make_web3
+from config.settings import GANACHE_URL, RPC_TIMEOUT, RPC_POOL_SIZE
+
+# Batched candidate / voter reads (see contract_reads.py)
+from contract_reads import ContractReader, missing_from_artifact
+from candidate_sync import sync_candidates
+
+def contract_reader():
+    if contract_instance is None:
+        raise HTTPException(status_code=503, detail="Blockchain offline")
+    return ContractReader(w3, contract_instance)
+
+# Local index of VoteCast / CandidateAdded logs (see chain_index.py); started once the contract is known
+from chain_index import ChainEventStore, ChainIndexer, deployment_block
+from config.settings import CHAIN_INDEX_DB, CHAIN_INDEX_CHUNK, CHAIN_INDEX_POLL
+chain_events = ChainEventStore(CHAIN_INDEX_DB)
+chain_indexer = None
+
+# One watcher resolves every pending transaction's receipt once per block (see receipt_watcher.py)
+from receipt_watcher import ReceiptWatcher
+from config.settings import RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT
+receipt_watcher = None
+
+# Chain health probe + circuit breaker for cast_vote, and the store-and-forward outbox (see chain_health.py, vote_outbox.py)
+from chain_health import CircuitBreaker, ChainHealthMonitor
+from vote_outbox import VoteOutbox, VoteForwarder, AlreadyQueued, VoteRejected
+from config.settings import (
+    CHAIN_PROBE_INTERVAL, CHAIN_PROBE_TIMEOUT, CHAIN_BREAKER_FAILURES, CHAIN_BREAKER_ERROR_RATE,
+    CHAIN_BREAKER_WINDOW, CHAIN_BREAKER_COOLDOWN, CHAIN_SLOW_MS, CHAIN_BREAKER_MODE, VOTE_OUTBOX_DB
+)
+QUEUED_TX = "QUEUED_FOR_CHAIN"  # votes.tx_hash until the forwarder has submitted the vote
+
+chain_breaker = CircuitBreaker(
+    failure_threshold=CHAIN_BREAKER_FAILURES, error_rate=CHAIN_BREAKER_ERROR_RATE, window=CHAIN_BREAKER_WINDOW,
+    cooldown=CHAIN_BREAKER_COOLDOWN, slow_ms=CHAIN_SLOW_MS
+)
+chain_monitor = None
+vote_outbox = VoteOutbox(VOTE_OUTBOX_DB)
+
+def forward_queued_vote(entry):
+    """Submit one parked vote; the votes row gets the real tx hash"""
+    # A retried vote may have been mined after its receipt wait gave up: do not send it twice
+    if entry["attempts"] > 1 and contract_instance.functions.hasVoted(entry["voter_id"]).call():
+        indexed = chain_events.vote_for(contract_instance.address, entry["voter_id"])
+        return record_forwarded_vote(entry, indexed["tx_hash"] if indexed else "ON_CHAIN_TX_UNKNOWN")
+    try:
+        tx = contract_instance.functions.vote(entry["party_uuid"], entry["voter_id"], entry["vote_hash"]).transact({'from': ADMIN_ACCOUNT})
+    except Exception as e:
+        if "revert" in str(e).lower():
+            raise VoteRejected(str(e))
+        chain_breaker.record(False, error=str(e))
+        raise
+    tx_hex = w3.to_hex(tx)
+    receipt = receipt_watcher.wait_sync(tx, timeout=RECEIPT_TIMEOUT)
+    if receipt["status"] != 1:
+        raise VoteRejected(f"Transaction reverted ({tx_hex})")
+    return record_forwarded_vote(entry, tx_hex)
+
+def record_forwarded_vote(entry, tx_hex):
+    """Fill in the votes row's tx hash; an on-chain vote without a row is logged like any other"""
+    try:
+        res = supabase.table("votes").update({"tx_hash": tx_hex}) \
+            .eq("user_id", entry["voter_id"]).eq("vote_hash", entry["vote_hash"]).execute()
+        if not res.data:  # cast_vote's insert failed after the vote was claimed
+            supabase.table("invalid_votes").insert({
+                "tx_hash": tx_hex,
+                "voter_id": entry["voter_id"],
+                "reason": "Queued vote reached the chain but its database insertion failed",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }).execute()
+    except Exception as e:
+        print(f"⚠️ [Outbox] Vote of {entry['voter_id']} is on chain ({tx_hex}) but the DB update failed: {e}")
+    return tx_hex
+
+def record_rejected_vote(entry, reason):
+    try:
+        supabase.table("invalid_votes").insert({
+            "tx_hash": QUEUED_TX,
+            "voter_id": entry["voter_id"],
+            "reason": f"Queued vote refused by the contract: {reason}",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }).execute()
+    except Exception as e:
+        print(f"Invalid vote log failed: {e}")
+
+vote_forwarder = VoteForwarder(
+    vote_outbox, forward_queued_vote,
+    ready=lambda: contract_instance is not None and receipt_watcher is not None and chain_breaker.allow(),
+    on_rejected=record_rejected_vote
+)
+
+# The process holding BACKGROUND_LOCK_FILE runs the singleton workers (see leader_lock.py), decided at startup
+import leader_lock
+from config.settings import BACKGROUND_LOCK_FILE
+background_leader = False
+
+def follow_contract(start_block: int = None):
+    """Point the indexer at contract_instance (new deployments start at their deploy block)"""
+    global chain_indexer
+    if not background_leader:
+        return  # Other workers read the leader's index (same SQLite file)
+    if chain_indexer is None:
+        chain_indexer = ChainIndexer(w3, contract_instance, chain_events, chunk=CHAIN_INDEX_CHUNK,
+                                     start_block=start_block or 0)
+        chain_indexer.start(CHAIN_INDEX_POLL)
+    else:
+        chain_indexer.retarget(contract_instance, start_block=start_block or 0)
+
+# contract_address.txt next to app.py, else in the repo root (the scripts read the root copy)
+CONTRACT_ADDRESS_FILES = (os.path.join(os.path.dirname(os.path.abspath(__file__)), "contract_address.txt"),
+                          os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "contract_address.txt"))
+from config.settings import CONTRACT_ADDRESS_POLL
+
+def saved_contract_address():
+    from web3 import Web3
+    for p in CONTRACT_ADDRESS_FILES:
+        if os.path.exists(p):
+            with open(p) as f:
+                saved = f.read().strip()
+            return saved if Web3.is_address(saved) else None
+    return None
+
+def save_contract_address(address: str):
+    """Write both copies (skipped when unchanged, so a --reload watcher is not triggered)"""
+    for p in CONTRACT_ADDRESS_FILES:
+        if os.path.exists(p):
+            with open(p) as r:
+                if r.read().strip() == address:
+                    continue
+        with open(p, "w") as w:
+            w.write(address)
+
+async def watch_contract_address():
+    """Follow a redeployment made by another worker (reset_election saves the new address)"""
+    global contract_instance, CONTRACT_ADDRESS
+    while True:
+        await asyncio.sleep(CONTRACT_ADDRESS_POLL)
+        if w3 is None or CONTRACT_ABI is None or contract_instance is None:
+            continue  # Still initializing
+        try:
+            saved = saved_contract_address()
+            if not saved or saved == CONTRACT_ADDRESS or not w3.eth.get_code(saved):
+                continue
+            CONTRACT_ADDRESS = saved
+            contract_instance = w3.eth.contract(address=saved, abi=CONTRACT_ABI)
+            print(f"✅ [Blockchain] Switched to redeployed contract: {saved}")
+            if background_leader:
+                try:
+                    start_block = await asyncio.get_running_loop().run_in_executor(None, deployment_block, w3, saved)
+                except Exception:
+                    start_block = 0  # Node without historical state: scan from genesis
+                follow_contract(start_block)
+        except Exception as e:
+            print(f"⚠️  [Blockchain] Contract address check failed: {e}")
+
 # --- BLOCKCHAIN INITIALIZATION ---
 async def initialize_blockchain():
-    global w3, contract_instance, ADMIN_ACCOUNT, CONTRACT_ABI, CONTRACT_BYTECODE, CONTRACT_ADDRESS
+    global w3, contract_instance, ADMIN_ACCOUNT, CONTRACT_ABI, CONTRACT_BYTECODE, CONTRACT_ADDRESS, receipt_watcher, chain_monitor
+    deploy_block = None
     print("\n--- [Blockchain] Initialization Started (Background) ---")
     try:
         from web3 import Web3
-        import json
         
-        GANACHE_URL = "http://127.0.0.1:7545"
-        w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+        w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT, pool_size=RPC_POOL_SIZE)
         
         if not w3.is_connected():
             print("⚠️  [Blockchain] Ganache not connected. Features will be OFFLINE.")
             return
 
         print(f"✅ [Blockchain] Connected to Ganache: {GANACHE_URL}")
+        receipt_watcher = ReceiptWatcher(w3, poll_interval=RECEIPT_POLL_INTERVAL)
+        receipt_watcher.start()
+        chain_monitor = ChainHealthMonitor(w3, chain_breaker, interval=CHAIN_PROBE_INTERVAL, timeout=CHAIN_PROBE_TIMEOUT)
+        chain_monitor.start()
+        if background_leader:
+            vote_forwarder.start()  # Forwards votes parked before a restart too
         accounts = w3.eth.accounts
         if accounts:
             ADMIN_ACCOUNT = accounts[0]
@@ -386,20 +667,19 @@ async def initialize_blockchain():
                 contract_json = json.load(f)
                 CONTRACT_ABI = contract_json["abi"]
                 CONTRACT_BYTECODE = contract_json["bytecode"]
+            sol_path = os.path.join(root_dir, "contracts/Voting.sol")
+            if os.path.exists(sol_path):
+                with open(sol_path) as f:
+                    missing = missing_from_artifact(CONTRACT_ABI, f.read())
+                if missing:
+                    print(f"⚠️  [Blockchain] Artifact is older than contracts/Voting.sol (missing {', '.join(missing)}). "
+                          "Run `npm run compile`, then reset the election to redeploy.")
         else:
             print("❌ [Blockchain] ABI File not found.")
             return
 
         # 2. Check for existing address
-        addr_path = os.path.join(base_dir, "contract_address.txt")
-        if not os.path.exists(addr_path):
-            addr_path = os.path.join(root_dir, "contract_address.txt")
-            
-        if os.path.exists(addr_path):
-            with open(addr_path, "r") as f:
-                existing_addr = f.read().strip()
-                if Web3.is_address(existing_addr):
-                    CONTRACT_ADDRESS = existing_addr
+        CONTRACT_ADDRESS = saved_contract_address()
 
         if CONTRACT_ADDRESS:
              try:
@@ -411,6 +691,20 @@ async def initialize_blockchain():
              except:
                  contract_instance = None
 
+        # Deployment and candidate sync are the leader's; other workers wait for the address it saves
+        if not contract_instance and not background_leader:
+            stale = CONTRACT_ADDRESS
+            for _ in range(90):
+                await asyncio.sleep(2)
+                saved = saved_contract_address()
+                if saved and saved != stale and w3.eth.get_code(saved):
+                    CONTRACT_ADDRESS = saved
+                    contract_instance = w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+                    print(f"✅ [Blockchain] Using contract deployed by the leader: {CONTRACT_ADDRESS}")
+                    return
+            print("⚠️  [Blockchain] No contract deployed by the leader worker. Features will be OFFLINE.")
+            return
+
         # 3. AUTO-DEPLOY if missing
         if not contract_instance and ADMIN_ACCOUNT:
             try:
@@ -419,41 +713,36 @@ async def initialize_blockchain():
                 tx_hash = VotingSystem.constructor("Tamil Nadu Election").transact({'from': ADMIN_ACCOUNT})
                 tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
                 CONTRACT_ADDRESS = tx_receipt.contractAddress
+                deploy_block = tx_receipt.blockNumber
                 contract_instance = w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
-                
-                # Safe Save (prevent reload loop)
-                def safe_save(p, a):
-                    if os.path.exists(p):
-                        with open(p, "r") as r:
-                            if r.read().strip() == a: return
-                    with open(p, "w") as w: w.write(a)
-                
-                safe_save(os.path.join(base_dir, "contract_address.txt"), CONTRACT_ADDRESS)
-                safe_save(os.path.join(root_dir, "contract_address.txt"), CONTRACT_ADDRESS)
+                save_contract_address(CONTRACT_ADDRESS)
                 print(f"✅ [Blockchain] Deployed at: {CONTRACT_ADDRESS}")
                 
             except Exception as de:
                 print(f"❌ [Blockchain] Deployment failed: {de}")
 
         # 4. Sync Candidates
-        if contract_instance:
+        if contract_instance and background_leader:
             try:
                 parties = supabase.table("parties").select("*").execute().data
                 for p in parties:
-                    p_name, p_uuid = p['name'], p.get('uuid') or str(uuid.uuid4())
                     if not p.get('uuid'):
-                        supabase.table("parties").update({"uuid": p_uuid}).eq("name", p_name).execute()
-                    
-                    try:
-                        if contract_instance.functions.candidateByUUID(p_uuid).call() == 0:
-                            print(f"   + [Sync] Adding {p_name}")
-                            tx = contract_instance.functions.addCandidate(p_name, p_uuid).transact({'from': ADMIN_ACCOUNT})
-                            w3.eth.wait_for_transaction_receipt(tx)
-                    except: pass
-                print("✅ [Blockchain] Sync complete.")
+                        p['uuid'] = str(uuid.uuid4())
+                        supabase.table("parties").update({"uuid": p['uuid']}).eq("name", p['name']).execute()
+                
+                # Batched diff, pipelined addCandidate submissions, receipts awaited together
+                summary = await asyncio.get_running_loop().run_in_executor(
+                    None, sync_candidates, w3, contract_instance, parties, ADMIN_ACCOUNT)
+                for name in summary["added"]:
+                    print(f"   + [Sync] Added {name}")
+                for f in summary["failed"]:
+                    print(f"   ! [Sync] {f['name']}: {f['error']}")
+                print(f"✅ [Blockchain] Sync complete ({summary['already']} present, {len(summary['added'])} added, {summary['seconds']}s).")
             except Exception as se:
                 print(f"⚠️ [Blockchain] Sync error: {se}")
 
+            follow_contract(deploy_block)
+
     except Exception as e:
         print(f"❌ [Blockchain] Critical init error: {e}")
 
@@ -464,9 +753,31 @@ cipher_suite = Fernet(ENCRYPTION_KEY.encode()) if ENCRYPTION_KEY else None
 
 # --- GLOBAL STATE FOR LOGIC FIXES ---
 vote_locks = defaultdict(Lock)  # voter_id -> Lock (prevent race conditions)
-biometric_sessions = {}  # voter_id -> {nonce, timestamp, used, session_token}
+from biometric_sessions import BiometricSessionStore
+from config.settings import BIOMETRIC_SESSION_TTL, BIOMETRIC_SESSION_MAX, BIOMETRIC_SESSION_DB, REQUIRE_BIOMETRIC_TOKEN
+biometric_sessions = BiometricSessionStore(BIOMETRIC_SESSION_DB, ttl=BIOMETRIC_SESSION_TTL, maxsize=BIOMETRIC_SESSION_MAX)
 idempotency_cache = {}  # idempotency_key -> response
 
+def issue_biometric_token(voter_id: str, strategy: str) -> str:
+    """Signed, short-lived proof of a passed face verification, redeemable by cast_vote"""
+    jti = secrets.token_urlsafe(16)
+    biometric_sessions.issue(jti, voter_id, strategy)
+    return create_access_token(
+        {"sub": voter_id, "scope": "biometric", "jti": jti},
+        expires_delta=timedelta(seconds=BIOMETRIC_SESSION_TTL)
+    )
+
+def check_biometric_token(token: str, voter_id: str):
+    """jti of a valid, unused token issued to `voter_id`, else None"""
+    payload = verify_token(token)
+    if not payload or payload.get("scope") != "biometric" or payload.get("sub") != voter_id:
+        return None
+    jti = payload.get("jti")
+    session = biometric_sessions.get(jti) if jti else None
+    if session is None or session["voter_id"] != voter_id:
+        return None
+    return jti
+
 def encrypt_data(data: str) -> str:
     """Encrypt with random salt to prevent frequency analysis"""
     if not cipher_suite or not data: return data
@@ -570,13 +881,10 @@ async def get_db():
 @app.get("/api/analytics/location-turnout")
 async def get_location_turnout():
     try:
-        json_path = os.path.join(os.path.dirname(__file__), "voter_locations.json")
-        if not os.path.exists(json_path):
+        voter_map = load_voter_locations()
+        if not voter_map:
             return {"data": []}
             
-        with open(json_path, "r") as f:
-            voter_map = json.load(f)
-            
         # 1. Total Registered per Location
         total_by_loc = {}
         for epic, loc in voter_map.items():
@@ -620,18 +928,148 @@ from typing import Optional
 
 # --- ACTION ENDPOINTS ---
 
+# bcrypt runs on its own bounded pool (see password_hashing.py); the cost is calibrated on startup
+from password_hashing import PasswordHasher, PasswordQueueFull
+from config.settings import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, BCRYPT_ROUNDS, PASSWORD_HASH_TARGET_MS
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, rounds=BCRYPT_ROUNDS)
+
+# Perceptual hashes of registration photos (see photo_hash.py): near-duplicate screen in O(probes)
+from photo_hash import HammingIndex, dhash, dhash_bytes, to_hex, from_hex
+from config.settings import PHASH_MAX_DISTANCE, PHASH_INDEX_CHUNKS, PHASH_REJECT_DUPLICATES
+
+photo_hash_index = HammingIndex(chunks=PHASH_INDEX_CHUNKS)
+photo_hash_index_load = {"state": "pending", "error": None}  # pending / loading / loaded / failed
+
+def load_photo_hash_index():
+    """Fill the index from biometric_tokens.perceptual_hash (paged; rows without one are skipped)"""
+    page, start = 1000, 0
+    while True:
+        res = supabase.table("biometric_tokens").select("user_id, perceptual_hash") \
+            .range(start, start + page - 1).execute()
+        for row in res.data:
+            if row.get("perceptual_hash"):
+                photo_hash_index.add(row["user_id"], from_hex(row["perceptual_hash"]))
+        if len(res.data) < page: break
+        start += page
+
+async def load_photo_hash_index_task():
+    """Startup load; its state is reported by /api/photo-hash/stats"""
+    photo_hash_index_load["state"] = "loading"
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, load_photo_hash_index)
+        photo_hash_index_load["state"] = "loaded"
+        print(f"✅ Photo hash index loaded: {len(photo_hash_index)} photos")
+    except Exception as e:
+        photo_hash_index_load.update(state="failed", error=str(e))
+        print(f"⚠️ Photo hash index not loaded (duplicate screen sees new registrations only): {e}")
+
+def screen_photo(voter_id, photo_b64):
+    """(dHash, [(voter_id, distance)] of other voters' near-identical photos)"""
+    code = dhash_bytes(decode_photo_base64(photo_b64))
+    if code is None:
+        return None, []
+    matches = [m for m in photo_hash_index.search(code, PHASH_MAX_DISTANCE) if m[0] != voter_id]
+    return code, matches
+
+def audit_duplicate_photo(voter_id, duplicates, ip_address=None):
+    create_audit_log(
+        supabase,
+        action="DUPLICATE_PHOTO_SUSPECTED",
+        user_id=voter_id,
+        details={"matches": [{"voter_id": v, "distance": d} for v, d in duplicates[:10]]},
+        ip_address=ip_address
+    )
+
+# --- REGISTRATION PHOTO JOBS (see photo_jobs.py; persistent, drained by a background worker) ---
+from photo_jobs import PhotoJobQueue, PhotoJobWorker
+from config.settings import (
+    PHOTO_JOBS_DB, PHOTO_JOB_BATCH, PHOTO_JOB_MAX_ATTEMPTS, PHOTO_JOB_RETRY_DELAY, PHOTO_JOB_POLL
+)
+
+photo_job_queue = PhotoJobQueue(PHOTO_JOBS_DB, max_attempts=PHOTO_JOB_MAX_ATTEMPTS, retry_delay=PHOTO_JOB_RETRY_DELAY)
+
+def largest_face(frame):
+    """(x, y, w, h) of the largest Haar face with a 20% margin, or None"""
+    if haar_pool is None: return None
+    with haar_pool.acquire() as cascade:
+        faces = cascade.detectMultiScale(frame.gray, 1.1, 4)
+    if len(faces) == 0: return None
+    x, y, w, h = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)[0]
+    m = int(0.2 * max(w, h))
+    H, W = frame.shape[:2]
+    x0, y0 = max(0, x - m), max(0, y - m)
+    return x0, y0, min(W, x + w + m) - x0, min(H, y + h + m) - y0
+
+def embed_face(frame):
+    """(float32 bytes, kind) with the best embedder loaded, (None, None) if no face"""
+    if USE_FACE_REC:
+        encs = face_recognition.face_encodings(frame.rgb)
+        vec, kind = (encs[0] if encs else None), "dlib"
+    elif face_embedder is not None:
+        vec, kind = face_embedder.embed(frame.bgr), "vgg_face_onnx"
+    else:
+        vec, kind = calculate_face_vector(frame), "geometric"
+    if vec is None: return None, None
+    return np.asarray(vec, dtype=np.float32).tobytes(), kind
+
+def process_photo_job(job):
+    """Normalize, embed and hash one registration photo; raises to have the job retried"""
+    frame = PreparedFrame.decode(job["payload"], PHOTO_CACHE_MAX_DIM)
+    if frame is None:
+        raise ValueError("Photo does not decode")
+    voter_id = job["voter_id"]
+    reference_photo_cache.put_image(voter_id, frame.bgr)  # Verification-ready before polling day
+
+    box = largest_face(frame)
+    face = frame.crop(*box) if box else frame
+    embedding, kind = embed_face(face)
+
+    code = dhash(frame.bgr)
+    duplicates = [m for m in photo_hash_index.search(code, PHASH_MAX_DISTANCE) if m[0] != voter_id]
+    if duplicates:
+        audit_duplicate_photo(voter_id, duplicates)
+    photo_hash_index.add(voter_id, code)
+    try:
+        supabase.table("biometric_tokens").update({"perceptual_hash": to_hex(code)}).eq("user_id", voter_id).execute()
+    except Exception as e:
+        print(f"Perceptual hash not stored for {voter_id}: {e}")  # Index still has it until restart
+
+    return {"embedding": embedding, "embedding_kind": kind, "phash": to_hex(code), "face_found": box is not None}
+
+photo_job_worker = PhotoJobWorker(
+    photo_job_queue, process_photo_job, batch_size=PHOTO_JOB_BATCH, poll_interval=PHOTO_JOB_POLL,
+    ready=lambda: model_registry.ready
+)
+
 @app.post("/api/register-voter")
 @limiter.limit("10/minute")
 async def register_voter(request: Request, user: UserRegister):
     try:
         print(f"\\n=== Registering: {user.username}, voterId: {user.voterId} ===")
         # Hash password before storing
-        hashed_pw = hash_password(user.password)
+        try:
+            hashed_pw = await password_hasher.hash(user.password)
+        except PasswordQueueFull:
+            raise HTTPException(status_code=503, detail="Registration busy, retry shortly",
+                                headers={"Retry-After": "2"})
         
         # Hash biometric photo (don't store raw)
         photo_hash = None
+        phash, duplicates = None, []
         if user.photoBase64:
             photo_hash = hash_biometric_photo(user.photoBase64)
+            # Rejecting duplicates needs the answer now; otherwise the photo job screens it
+            if PHASH_REJECT_DUPLICATES:
+                try:
+                    phash, duplicates = await asyncio.get_running_loop().run_in_executor(
+                        inference_executor, screen_photo, user.voterId, user.photoBase64)
+                except Exception as e:
+                    print(f"Photo hash failed: {e}")
+                if duplicates:
+                    audit_duplicate_photo(user.voterId, duplicates,
+                                          request.client.host if request.client else None)
+                    raise HTTPException(status_code=409, detail="Photo matches an already registered voter")
         
         # Store user with hashed password
         user_data = {
@@ -641,16 +1079,26 @@ async def register_voter(request: Request, user: UserRegister):
             "role": user.role
         }
         supabase.table("users").insert(user_data).execute()
+        reference_photo_cache.invalidate(user.voterId)  # Drop a stale photo from an earlier registration
         
         # Store biometric token (hash only)
         if photo_hash:
             try:
-                supabase.table("biometric_tokens").insert({
-                    "user_id": user.voterId,
-                    "photo_hash": photo_hash
-                }).execute()
+                token = {"user_id": user.voterId, "photo_hash": photo_hash}
+                if phash is not None:
+                    token["perceptual_hash"] = to_hex(phash)
+                supabase.table("biometric_tokens").insert(token).execute()
             except:
                 pass  # Table may not exist yet
+        if phash is not None:
+            photo_hash_index.add(user.voterId, phash)
+        if user.photoBase64:
+            # Normalized photo, embedding and perceptual hash are derived in the background
+            try:
+                photo_job_queue.enqueue(user.voterId, decode_photo_base64(user.photoBase64))
+                photo_job_worker.notify()
+            except Exception as e:
+                print(f"Photo job enqueue failed: {e}")
         
         # Audit log
         create_audit_log(
@@ -661,8 +1109,11 @@ async def register_voter(request: Request, user: UserRegister):
             ip_address=request.client.host if request.client else None
         )
         
-        return {"status": "success", "message": "Voter registered successfully"}
+        return {"status": "success", "message": "Voter registered successfully",
+                "photoProcessing": "queued" if user.photoBase64 else None}
         
+    except HTTPException:
+        raise
     except Exception as e:
         # Log failure with traceback
         import traceback
@@ -681,6 +1132,54 @@ async def register_voter(request: Request, user: UserRegister):
             pass
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- BULK ROLL IMPORT (see roll_import.py; one import at a time, runs in the background) ---
+from roll_import import RollImporter
+from config.settings import ROLL_IMPORT_BATCH, ROLL_IMPORT_WORKERS, ROLL_PINS_DIR
+
+ROLL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "csv")
+roll_import_job = {"importer": None, "thread": None, "file": None}
+
+def run_roll_import(importer, resume, file_name):
+    try:
+        summary = importer.run(resume=resume)
+        create_audit_log(supabase, action="BULK_VOTER_IMPORT", user_id="ADMIN",
+                         details={"file": file_name, **summary})
+        print(f"✅ Roll import finished: {summary}")
+    except Exception as e:
+        print(f"❌ Roll import failed: {e}")
+
+@app.post("/api/import-roll", dependencies=[Depends(require_admin_key)])
+@limiter.limit("5/minute")
+async def import_roll(request: Request, req: RollImport):
+    """Start a bulk import of a roll CSV from csv/ (admin key required); poll /api/import-roll/status"""
+    thread = roll_import_job["thread"]
+    if thread is not None and thread.is_alive():
+        raise HTTPException(status_code=409, detail="An import is already running")
+    file_name = os.path.basename(req.file)
+    path = os.path.join(ROLL_DIR, file_name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"{file_name} not found in csv/")
+
+    os.makedirs(ROLL_PINS_DIR, mode=0o700, exist_ok=True)
+    importer = RollImporter(
+        supabase, path,
+        batch_size=ROLL_IMPORT_BATCH,
+        workers=ROLL_IMPORT_WORKERS,
+        rounds=req.rounds or password_hasher.rounds,  # Calibrated cost, never below BCRYPT_ROUNDS
+        pins_out=os.path.join(ROLL_PINS_DIR, f"{file_name}.pins.csv")  # Only written when the roll has no Password column
+    )
+    thread = threading.Thread(target=run_roll_import, args=(importer, req.resume, file_name), daemon=True)
+    roll_import_job.update(importer=importer, thread=thread, file=file_name)
+    thread.start()
+    return {"status": "started", "file": file_name, "resume": req.resume}
+
+@app.get("/api/import-roll/status", dependencies=[Depends(require_admin_key)])
+async def import_roll_status():
+    importer = roll_import_job["importer"]
+    if importer is None:
+        return {"state": "idle"}
+    return {"file": roll_import_job["file"], **importer.stats}
+
 @app.post("/api/add-party")
 async def add_party(party: PartyAdd):
     try:
@@ -721,6 +1220,15 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
             print(f"Returning cached response for {idempotency_key}")
             return idempotency_cache[idempotency_key]
         
+        # Biometric session: a retry after a failed vote costs one token check, not a re-verification
+        biometric_jti = None
+        if vote.biometricToken:
+            biometric_jti = check_biometric_token(vote.biometricToken, voter_id)
+            if biometric_jti is None:
+                raise HTTPException(status_code=401, detail="Biometric session invalid or expired. Verify again.")
+        elif REQUIRE_BIOMETRIC_TOKEN:
+            raise HTTPException(status_code=401, detail="Biometric verification required")
+        
         # Acquire lock for this voter (prevent race condition)
         async with vote_locks[voter_id]:
             print(f"\n--- [Vote Casting] Voter: {voter_id}, Party: {party_name} ---")
@@ -748,14 +1256,31 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
                 except Exception as e:
                     print(f"End time parse error: {e}")
             
+            # Circuit breaker: while the chain is unhealthy, fail fast or park the vote for later
+            chain_up = bool(w3 and contract_instance)
+            queue_for_chain = False
+            if chain_up and not chain_breaker.allow():
+                if CHAIN_BREAKER_MODE != "queue":
+                    raise HTTPException(status_code=503, detail="Blockchain unavailable, retry shortly",
+                                        headers={"Retry-After": str(chain_breaker.retry_after())})
+                # hasVoted cannot be asked; the outbox and the votes table catch double votes instead
+                if vote_outbox.contains(voter_id) or \
+                        supabase.table("votes").select("user_id").eq("user_id", voter_id).execute().data:
+                    raise HTTPException(status_code=400, detail="Already voted")
+                chain_up, queue_for_chain = False, True
+            
             # Check if already voted (blockchain)
-            if contract_instance:
+            if chain_up:
+                has_voted = False
                 try:
+                    started = time.perf_counter()
                     has_voted = contract_instance.functions.hasVoted(voter_id).call()
-                    if has_voted:
-                        raise HTTPException(status_code=400, detail="Already voted")
+                    chain_breaker.record(True, (time.perf_counter() - started) * 1000)
                 except Exception as e:
+                    chain_breaker.record(False, error=str(e))
                     print(f"Blockchain check error: {e}")
+                if has_voted:
+                    raise HTTPException(status_code=400, detail="Already voted")
             
             # Get party UUID from database
             party = supabase.table("parties").select("*").eq("name", party_name).execute().data
@@ -781,7 +1306,14 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
             
             # Submit to blockchain
             tx_hash_val = "BLOCKCHAIN_OFFLINE"
-            if w3 and contract_instance:
+            if queue_for_chain:
+                try:
+                    vote_outbox.enqueue(voter_id, party_uuid, vote_hash)
+                except AlreadyQueued:
+                    raise HTTPException(status_code=400, detail="Already voted")
+                tx_hash_val = QUEUED_TX
+                print(f"⏸ Blockchain unhealthy, vote of {voter_id} queued for forwarding")
+            elif chain_up:
                 try:
                     # ENSURE candidate exists in blockchain (Auto-sync if missing)
                     try:
@@ -789,7 +1321,7 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
                         if candidate_id == 0:
                             print(f"Candidate {party_name} ({party_uuid}) not found in blockchain. Adding now...")
                             tx = contract_instance.functions.addCandidate(party_name, party_uuid).transact({'from': ADMIN_ACCOUNT})
-                            w3.eth.wait_for_transaction_receipt(tx)
+                            await receipt_watcher.wait(tx, timeout=RECEIPT_TIMEOUT)
                             print(f"✅ Candidate {party_name} added to blockchain.")
                     except Exception as e:
                         print(f"Blockchain auto-sync check failed: {e}")
@@ -801,15 +1333,18 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
                         vote_hash
                     ).transact({'from': ADMIN_ACCOUNT})
                     
-                    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+                    receipt = await receipt_watcher.wait(tx_hash, timeout=RECEIPT_TIMEOUT)
                     
                     if receipt['status'] != 1:
-                        raise Exception("Blockchain transaction failed")
+                        raise Exception("Blockchain transaction reverted")
                     
                     tx_hash_val = w3.to_hex(tx_hash)
+                    chain_breaker.record(True)
                     print(f"✅ Blockchain TX: {tx_hash_val}")
                     
                 except Exception as bc_error:
+                    if "revert" not in str(bc_error).lower():  # A refused vote says nothing about node health
+                        chain_breaker.record(False, error=str(bc_error))
                     print(f"❌ Blockchain error: {bc_error}")
                     raise HTTPException(status_code=500, detail=f"Blockchain error: {str(bc_error)}")
             
@@ -831,7 +1366,13 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
                 # Database failed - mark blockchain vote as invalid
                 print(f"❌ Database error: {db_error}")
                 
-                if tx_hash_val != "BLOCKCHAIN_OFFLINE":
+                if queue_for_chain:
+                    # Still pending: nothing reached the chain, drop it. Sending: the forwarder logs it
+                    # when it finds no votes row. Sent: log it here with its tx hash.
+                    parked = vote_outbox.remove(voter_id)
+                    if parked and parked["status"] == "sent":
+                        tx_hash_val = parked["tx_hash"]
+                if tx_hash_val not in ("BLOCKCHAIN_OFFLINE", QUEUED_TX):
                     try:
                         supabase.table("invalid_votes").insert({
                             "tx_hash": tx_hash_val,
@@ -851,11 +1392,18 @@ async def cast_vote(vote: VoteCast, idempotency_key: str = Header(None)):
                 "vote_hash": vote_hash,
                 "message": "Vote recorded successfully"
             }
+            if queue_for_chain:
+                response["queued_for_chain"] = True
+                response["message"] = "Vote recorded; it will be written to the blockchain once it is reachable"
             
             # Cache response for idempotency
             if idempotency_key:
                 idempotency_cache[idempotency_key] = response
             
+            # The token is spent once the vote is recorded
+            if biometric_jti:
+                biometric_sessions.spend(biometric_jti)
+            
             return response
             
     except HTTPException as he:
@@ -998,17 +1546,22 @@ async def verify_vote(voter_id: str):
         vote = db_vote[0]
         vote_hash_db = vote.get("vote_hash")
         
-        # Get vote hash from blockchain
+        # Get vote hash from blockchain: the indexed VoteCast event, else a contract read (indexer lagging)
         if contract_instance:
             try:
-                vote_hash_bc = contract_instance.functions.getVoteHash(voter_id).call()
+                event = chain_events.vote_for(contract_instance.address, voter_id)
+                if event:
+                    vote_hash_bc = event["vote_hash"]
+                else:
+                    vote_hash_bc = contract_instance.functions.getVoteHash(voter_id).call()
                 
                 if vote_hash_db == vote_hash_bc:
                     return {
                         "status": "success",
                         "message": "Vote verified successfully",
                         "vote_hash": vote_hash_db,
-                        "tx_hash": vote.get("tx_hash"),
+                        "tx_hash": event["tx_hash"] if event else vote.get("tx_hash"),
+                        "block_number": event["block_number"] if event else None,
                         "timestamp": vote.get("timestamp"),
                         "verified": True
                     }
@@ -1066,11 +1619,11 @@ async def reset_election():
                 # Update Global State
                 CONTRACT_ADDRESS = new_address
                 contract_instance = w3.eth.contract(address=new_address, abi=CONTRACT_ABI)
+                follow_contract(tx_receipt.blockNumber)
                 
-                # Save to File (for other scripts)
+                # Save to File (other workers and scripts switch to it)
                 try:
-                    with open("contract_address.txt", "w") as f:
-                        f.write(new_address)
+                    save_contract_address(new_address)
                 except Exception as fe:
                     print(f"Warning: Could not save address to file: {fe}")
 
@@ -1078,15 +1631,15 @@ async def reset_election():
                 print("Resyncing Candidates to New Contract...")
                 parties = supabase.table("parties").select("*").order("id").execute().data
                 for p in parties:
-                     p_name = p['name']
-                     p_uuid = p.get('uuid')
-                     if not p_uuid:
-                         p_uuid = str(uuid.uuid4())
-                         supabase.table("parties").update({"uuid": p_uuid}).eq("name", p_name).execute()
-                     
-                     print(f"Adding Candidate: {p_name} ({p_uuid})")
-                     tx = contract_instance.functions.addCandidate(p_name, p_uuid).transact({'from': ADMIN_ACCOUNT})
-                     w3.eth.wait_for_transaction_receipt(tx)
+                     if not p.get('uuid'):
+                         p['uuid'] = str(uuid.uuid4())
+                         supabase.table("parties").update({"uuid": p['uuid']}).eq("name", p['name']).execute()
+                
+                summary = await asyncio.get_running_loop().run_in_executor(
+                    None, sync_candidates, w3, contract_instance, parties, ADMIN_ACCOUNT)
+                print(f"Added {len(summary['added'])} candidates in {summary['seconds']}s")
+                if summary["failed"]:
+                    raise Exception(f"Candidates not added: {summary['failed']}")
                 
                 print("Blockchain Reset Complete.")
                 
@@ -1102,229 +1655,435 @@ async def reset_election():
         return {"error": str(e)}
 
 
-# --- HELPERS ---
+# --- ID CARD ENCODINGS (per booth session, never shared across clients) ---
+from session_store import TTLStore
+from config.settings import ID_SESSION_TTL, ID_SESSION_MAX_SESSIONS
 
-    # Calculate geometric feature vector (distances between key points normalized by face width)
-    # Key points: Eyes, Nose, Mouth
-    # 33=R_Eye_Inner, 263=L_Eye_Inner, 1=Nose_Tip, 61=Mouth_Left, 291=Mouth_Right
-    points = [33, 263, 1, 61, 291, 199, 152] # Added Chin(152/199) for vertical scale
-    
-    coords = []
-    for p in points:
-        coords.append(np.array([landmarks[p].x * w, landmarks[p].y * h]))
-    
-    # Normalize by face width (Left Eye to Right Eye) to be scale invariant
-    scale = np.linalg.norm(coords[0] - coords[1])
-    if scale == 0: return None
-    
-    vector = []
-    # Calculate all pairwise distances between key points
-    for i in range(len(coords)):
-        for j in range(i+1, len(coords)):
-             dist = np.linalg.norm(coords[i] - coords[j])
-             vector.append(dist / scale)
-             
-    return np.array(vector)
+id_sessions = TTLStore(maxsize=ID_SESSION_MAX_SESSIONS, ttl=ID_SESSION_TTL)
+
+def encode_id_dlib(frame):
+    encs = face_recognition.face_encodings(frame.rgb)
+    return encs[0] if encs else None
+
+def search_id_crop(name, frame, box, found):
+    """(name, geometric vector) of the face in one crop window; skipped once another crop hit"""
+    if found.is_set(): return None
+    x, y, crop_w, crop_h = box
+    # Windows of the shared full-frame RGB view; only the slice is made contiguous
+    rgb_crop = np.ascontiguousarray(frame.rgb[y:y + crop_h, x:x + crop_w])
+
+    # Use the permissive detector
+    with id_face_mesh_pool.acquire() as id_mesh:
+        mp_res = id_mesh.process(rgb_crop)
+    if not mp_res.multi_face_landmarks: return None
+    pts = landmarks_to_array(mp_res.multi_face_landmarks[0].landmark)
+    vec = get_geometric_vector(pts, crop_w, crop_h)
+    return (name, vec) if vec is not None else None
 
 @app.post("/api/upload-id")
-async def upload_id_card(file: UploadFile = File(...)):
-    global CURRENT_USER_ID_ENCODING, CURRENT_USER_ID_VECTOR, CURRENT_USER_METHOD
+async def upload_id_card(
+    file: UploadFile = File(...),
+    session_token: Optional[str] = Form(None)
+):
+    """
+    Encode the face on an ID card for this booth session. The encoding is kept under
+    `session_token` (a new token is issued if none is given) for ID_SESSION_TTL seconds.
+    """
+    await require_models("mediapipe", "face_recognition")
+    token = session_token or secrets.token_urlsafe(16)
+    loop = asyncio.get_running_loop()
+
+    def store(method, encoding=None, vector=None, crop=None):
+        id_sessions.set(token, {
+            "method": method, "encoding": encoding, "vector": vector,
+            "crop": crop, "created": time.time()
+        })
+
     try:
         content = await file.read()
-        nparr = np.frombuffer(content, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        frame = PreparedFrame.decode(content, ID_FRAME_MAX_DIM)
         
-        if img is None:
+        if frame is None:
             return {"status": "error", "message": "Could not decode image"}
-            
-        # Standardize size to avoid processing massive images
-        # height, width = img.shape[:2]
-        # if width > 1280:
-        #    scale = 1280 / width
-        #    img = cv2.resize(img, (0,0), fx=scale, fy=scale)
-        
-        h, w, _ = img.shape
         
-        # Reset State
-        CURRENT_USER_ID_ENCODING = None
-        CURRENT_USER_ID_VECTOR = None
-        CURRENT_USER_METHOD = None
+        h, w, _ = frame.shape
+        id_sessions.pop(token)  # Reset this session's previous ID
         
         # --- STRATEGY 1: DLIB (Full Image) ---
         if USE_FACE_REC:
             try:
-                rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                encs = face_recognition.face_encodings(rgb)
-                if encs:
-                    CURRENT_USER_ID_ENCODING = encs[0]
-                    CURRENT_USER_METHOD = "DLIB"
+                enc = await loop.run_in_executor(inference_executor, encode_id_dlib, frame)
+                if enc is not None:
+                    store("DLIB", encoding=enc)
                     print("ID Encoded: DLIB (Full)")
-                    return {"status": "success", "message": "ID Encoded via Dlib"}
+                    return {"status": "success", "message": "ID Encoded via Dlib", "session_token": token}
             except: pass
 
         # --- STRATEGY 2: MEDIAPIPE (Crop Search) ---
         # ID cards often have small faces. Searching crops helps the detector.
-        
-        crops = [
-            ("Full", img),
-            ("Left", img[0:h, 0:int(w*0.6)]),            # Left 60% (Most IDs)
-            ("Right", img[0:h, int(w*0.4):w]),           # Right 60% (Some IDs)
-            ("Center", img[0:h, int(w*0.2):int(w*0.8)]), # Center 60%
-            ("Top-Left", img[0:int(h*0.6), 0:int(w*0.6)])# Top-Left Quadrant
+        # All windows run concurrently; the first hit cancels the rest.
+        crops = [  # (x, y, w, h) windows
+            ("Full", (0, 0, w, h)),
+            ("Left", (0, 0, int(w*0.6), h)),                # Left 60% (Most IDs)
+            ("Right", (int(w*0.4), 0, w - int(w*0.4), h)),  # Right 60% (Some IDs)
+            ("Center", (int(w*0.2), 0, int(w*0.8) - int(w*0.2), h)),  # Center 60%
+            ("Top-Left", (0, 0, int(w*0.6), int(h*0.6)))    # Top-Left Quadrant
         ]
-        
-        for name, crop_img in crops:
-            if crop_img.shape[0] < 50 or crop_img.shape[1] < 50: continue
-            
-            crop_h, crop_w, _ = crop_img.shape
-            rgb_crop = cv2.cvtColor(crop_img, cv2.COLOR_BGR2RGB)
-            
-            # Use the permissive detector
-            mp_res = id_face_mesh.process(rgb_crop)
-            
-            if mp_res.multi_face_landmarks:
-                 lm = mp_res.multi_face_landmarks[0].landmark
-                 vec = get_geometric_vector(crop_img, lm, crop_w, crop_h)
-                 
-                 if vec is not None:
-                     CURRENT_USER_ID_VECTOR = vec
-                     CURRENT_USER_METHOD = "GEOMETRIC"
-                     print(f"ID Encoded: GEOMETRIC (Found in {name} Crop)")
-                     return {"status": "success", "message": f"ID Encoded via Geometry ({name})"}
+        crops = [(name, box) for name, box in crops if box[2] >= 50 and box[3] >= 50]
+
+        frame.rgb  # Convert once here, not concurrently in every crop task
+        found = threading.Event()
+        futures = [
+            loop.run_in_executor(inference_executor, search_id_crop, name, frame, box, found)
+            for name, box in crops
+        ]
+        hit = None
+        try:
+            for next_done in asyncio.as_completed(futures):
+                try:
+                    hit = await next_done
+                except Exception as e:
+                    print(f"ID crop search error: {e}")
+                    continue
+                if hit is not None:
+                    break
+        finally:
+            found.set()
+            for fut in futures:
+                fut.cancel()  # Not-yet-started crops never run
+
+        if hit is not None:
+            name, vec = hit
+            store("GEOMETRIC", vector=vec, crop=name)
+            print(f"ID Encoded: GEOMETRIC (Found in {name} Crop)")
+            return {"status": "success", "message": f"ID Encoded via Geometry ({name})", "session_token": token}
 
         # --- STRATEGY 3: BYPASS (Failsafe) ---
         print("ID Encoded: BYPASS (Detection Failed)")
-        CURRENT_USER_METHOD = "BYPASS" 
-        return {"status": "success", "message": "ID Uploaded (Manual Verification Required)"}
+        store("BYPASS")
+        return {"status": "success", "message": "ID Uploaded (Manual Verification Required)", "session_token": token}
 
     except Exception as e:
         print(f"Upload Error: {e}")
         return {"status": "error", "message": str(e)}
 
-@app.post("/api/process-frame")
-async def process_frame(file: UploadFile = File(...)):
-    global CURRENT_USER_ID_ENCODING, CURRENT_USER_ID_VECTOR, CURRENT_USER_METHOD
-    try:
-        content = await file.read()
-        nparr = np.frombuffer(content, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        h, w, _ = frame.shape
-        
-        results = {
-            "faces_detected": 0,
-            "phone_detected": False,
-            "dark_surroundings": False,
-            "suspicious_texture": False,
-            "smile_detected": False,
-            "blink_detected": False,
-            "eyebrow_movement": False,
-            "head_pose_good": False,
-            "landmarks_consistent": False,
-            "identity_verified": False,
-            "processed_frame": ""
-        }
-
-        # ... (Previous checks: Dark, Texture, YOLO - KEEP SAME)
-        if detect_darkness(frame): results["dark_surroundings"] = True
-        if analyze_texture(frame): results["suspicious_texture"] = True
-        if yolo_model:
-            y_res = yolo_model(frame, verbose=False)
-            for box in y_res[0].boxes:
-                if int(box.cls) == 67 and box.conf > 0.5:
-                    results["phone_detected"] = True
-
-        # MediaPipe Processing
-        # MediaPipe Processing
-        if not ensure_face_mesh():
-             results["processed_frame"] = base64.b64encode(cv2.imencode('.jpg', frame)[1]).decode('utf-8')
-             return results
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_res = face_mesh.process(rgb)
-        
-        if mp_res.multi_face_landmarks:
-            results["faces_detected"] = 1
-            lm = mp_res.multi_face_landmarks[0].landmark
-            
-            # Draw Mesh
-            if mp_drawing and mp_styles:
-                mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=mp_res.multi_face_landmarks[0],
-                    connections=mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp_styles.get_default_face_mesh_tesselation_style()
-                )
-
-            # Liveness Logic - RESTORED
-            # Calculate Face Bounding Box for DeepFace Smile
-            h_im, w_im, _ = frame.shape
-            x_min, y_min = w_im, h_im
-            x_max, y_max = 0, 0
-            for l in lm:
-                x, y = int(l.x * w_im), int(l.y * h_im)
-                if x < x_min: x_min = x
-                if x > x_max: x_max = x
-                if y < y_min: y_min = y
-                if y > y_max: y_max = y
-            
-            # Padding
-            pad = 20
-            x_min = max(0, x_min - pad)
-            y_min = max(0, y_min - pad)
-            x_max = min(w_im, x_max + pad)
-            y_max = min(h_im, y_max + pad)
-
-            ear = eye_aspect_ratio(lm, w, h)
-            results["blink_detected"] = ear < 0.22
-            results["smile_detected"] = check_smile(frame, x_min, y_min, x_max - x_min, y_max - y_min)
-            results["eyebrow_movement"] = check_eyebrow(lm, w, h)
-            results["head_pose_good"] = check_head_pose(lm, w, h)
-            results["landmarks_consistent"] = check_landmark_consistency(lm)
-            
-            # Draw Mesh
-            mp.solutions.drawing_utils.draw_landmarks(
-                image=frame,
-                landmark_list=mp_res.multi_face_landmarks[0],
-                connections=mp_face_mesh.FACEMESH_TESSELATION,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp.solutions.drawing_styles.get_default_face_mesh_tesselation_style()
+@app.post("/api/liveness/start")
+async def start_liveness_session():
+    """Open a liveness session; pass the token as `session_token` to /api/process-frame"""
+    await require_models("mediapipe")
+    session = liveness_tracker.start()
+    return {"status": "success", "session_token": session.token, "ttl": LIVENESS_SESSION_TTL}
+
+@app.get("/api/liveness/stats")
+async def liveness_stats():
+    """
+    emotion_fraction: share of frames with a face that needed the DeepFace emotion model.
+    skip_ratio: share of session frames answered from the previous result (unchanged frame).
+    """
+    return {
+        "active_sessions": len(liveness_tracker),
+        "untracked_sessions": liveness_tracker.untracked,
+        "frame_change_threshold": FRAME_CHANGE_THRESHOLD,
+        "frame_skip_max": FRAME_SKIP_MAX,
+        "signals": liveness_signals.report()
+    }
+
+def run_liveness_frame(content, session=None, mode="full"):
+    """
+    Decode one JPEG frame, run the liveness checks and build the response dict.
+    mode="full": annotated frame returned as base64 JPEG in `processed_frame`.
+    mode="landmarks": no drawing or re-encoding; `landmarks` holds base64 int16 (x, y)
+    pairs of frame-normalized coordinates scaled by `landmark_scale` for the client to draw.
+    """
+    if session is not None:
+        # A session's tracking graph and evidence are used by one frame at a time
+        with session.frame():
+            return process_liveness_frame(content, session, mode)
+    return process_liveness_frame(content, None, mode)
+
+def process_liveness_frame(content, session, mode):
+    # All challenges passed: no more inference for this session
+    if session is not None and session.completed and session.last_result:
+        return session.last_result
+
+    prepared = PreparedFrame.decode(content, LIVENESS_FRAME_MAX_DIM)
+    if prepared is None:
+        return {"error": "Could not decode frame"}
+    frame = prepared.bgr
+
+    if session is not None:
+        # Frame-change gating: a still voter sends near-identical frames, reuse the result
+        liveness_signals.count("session_frames")
+        if FRAME_CHANGE_THRESHOLD > 0:
+            thumb = frame_thumbnail(prepared.gray, session.roi)
+            if session.unchanged(thumb, FRAME_CHANGE_THRESHOLD, FRAME_SKIP_MAX):
+                liveness_signals.count("frames_skipped")
+                return session.skip()
+            session.thumb = thumb
+        session.frame_count += 1
+    results, face_landmarks, pts, (x0, y0, crop) = analyze_frame(prepared, session)
+
+    if mode == "landmarks":
+        results["landmarks"] = None
+        results["landmark_scale"] = LANDMARK_SCALE
+        if pts is not None:
+            frame_h, frame_w = frame.shape[:2]
+            crop_h, crop_w = crop.shape[:2]
+            results["landmarks"] = pack_landmarks(
+                to_frame_coords(pts, x0, y0, crop_w, crop_h, frame_w, frame_h)
             )
+    else:
+        if face_landmarks is not None:
+            draw_face_mesh(crop, face_landmarks)
 
         _, buffer = cv2.imencode('.jpg', frame)
         results["processed_frame"] = base64.b64encode(buffer).decode('utf-8')
-        return results
+    if session is not None:
+        session.record(results)
+    return results
 
+@app.post("/api/process-frame")
+async def process_frame(
+    file: UploadFile = File(...),
+    session_token: Optional[str] = Form(None),
+    mode: str = Form("full")
+):
+    try:
+        session = None
+        if session_token:
+            session = liveness_tracker.get(session_token)
+            if session is None:
+                return {"error": "Unknown or expired liveness session"}
+
+        await require_models("mediapipe", "yolo", "deepface")
+        content = await file.read()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(inference_executor, run_liveness_frame, content, session, mode)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        ensure_face_mesh() # Attempt re-init
         return {"error": str(e)}
 
-# --- IMAGE CACHE (Biometric Encodings/Images) ---
-# Cache for decoded reference photos to avoid repeated DB hits and Base64 decoding
-reference_photo_cache = LRUCache(maxsize=100)
+@app.websocket("/ws/liveness")
+async def liveness_stream(websocket: WebSocket):
+    """
+    Continuous liveness over one connection: the client sends binary JPEG frames and
+    receives one JSON result per processed frame. Only the newest frame is kept while
+    inference is busy, so older frames are dropped instead of queueing up latency.
+    Query params: session_token (optional, a new session is opened if missing), mode.
+    The session ends when the connection closes, releasing its tracking FaceMesh.
+    """
+    await websocket.accept()
+    try:
+        await model_registry.wait("mediapipe", "yolo", "deepface", timeout=MODEL_WAIT_TIMEOUT)
+    except ModelNotReady as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close(code=1013)  # Try again later
+        return
+    mode = websocket.query_params.get("mode", "landmarks")
+    token = websocket.query_params.get("session_token")
+    session = liveness_tracker.get(token) if token else liveness_tracker.start()
+    if session is None:
+        await websocket.send_json({"error": "Unknown or expired liveness session"})
+        await websocket.close(code=1008)
+        return
+    await websocket.send_json({"type": "session", "session_token": session.token})
+
+    latest = {"frame": None, "received": 0, "dropped": 0}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("bytes")
+            if not data:
+                continue  # Text frames are ignored
+            latest["received"] += 1
+            if latest["frame"] is not None:
+                latest["dropped"] += 1  # Superseded before inference picked it up
+            latest["frame"] = data
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            waiter = asyncio.create_task(frame_ready.wait())
+            done, _ = await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                waiter.cancel()
+                break
+            frame_ready.clear()
+            content, latest["frame"] = latest["frame"], None
+
+            started = time.time()
+            try:
+                results = await loop.run_in_executor(inference_executor, run_liveness_frame, content, session, mode)
+            except Exception as e:
+                results = {"error": str(e)}
+            results = dict(results)
+            results["type"] = "result"
+            results["latency_ms"] = round((time.time() - started) * 1000, 1)
+            results["frames_received"] = latest["received"]
+            results["frames_dropped"] = latest["dropped"]
+            await websocket.send_json(results)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        try:
+            await receiver
+        except (asyncio.CancelledError, Exception):
+            pass
+        liveness_tracker.end(session.token)
+
+# --- IMAGE CACHE (Reference photos: RAM under a byte budget + compressed disk tier) ---
+from photo_cache import ReferencePhotoCache, decode_photo_base64, prefetch as prefetch_photos
+from config.settings import PHOTO_CACHE_MAX_MB, PHOTO_CACHE_DIR, PHOTO_CACHE_MAX_DIM, PHOTO_PREFETCH_BATCH, BOOTH_LOCATION
 
-def get_cached_photo(voter_id, photo_b64):
-    if voter_id in reference_photo_cache:
-        return reference_photo_cache[voter_id]
-    
-    # Decode
+reference_photo_cache = ReferencePhotoCache(
+    max_bytes=PHOTO_CACHE_MAX_MB * 1024 * 1024,
+    disk_dir=PHOTO_CACHE_DIR or None,
+    max_dim=PHOTO_CACHE_MAX_DIM
+)
+
+def load_voter_locations():
+    json_path = os.path.join(os.path.dirname(__file__), "voter_locations.json")
+    if not os.path.exists(json_path):
+        return {}
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+def fetch_reference_photos(voter_ids):
+    res = supabase.table("users").select("voter_id, photo_base64").in_("voter_id", voter_ids).execute()
+    return res.data or []
+
+def prefetch_location(location=None, voter_ids=None):
+    """Warm the reference photo cache for a booth location and/or explicit voter IDs"""
+    ids = list(voter_ids or [])
+    if location:
+        ids += [epic for epic, loc in load_voter_locations().items() if loc == location]
+    ids = list(dict.fromkeys(ids))
+    start = time.time()
+    summary = prefetch_photos(reference_photo_cache, ids, fetch_reference_photos, batch_size=PHOTO_PREFETCH_BATCH)
+    summary["seconds"] = round(time.time() - start, 2)
+    print(f"✅ Photo prefetch ({location or 'explicit IDs'}): {summary}")
+    return summary
+
+async def prefetch_booth_photos():
+    """Startup warm-up for BOOTH_LOCATION; failures are logged rather than lost in an unawaited future"""
     try:
-        if "," in photo_b64:
-            photo_b64 = photo_b64.split(",")[1]
-        stored_bytes = base64.b64decode(photo_b64)
-        nparr = np.frombuffer(stored_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if img is not None:
-             # Store original if it was already small, or a resized version
-             h, w = img.shape[:2]
-             if max(h, w) > 640:
-                 scale = 640 / max(h, w)
-                 img = cv2.resize(img, (int(w * scale), int(h * scale)))
-             reference_photo_cache[voter_id] = img
-             return img
-    except:
-        return None
-    return None
+        await asyncio.get_running_loop().run_in_executor(None, prefetch_location, BOOTH_LOCATION)
+    except Exception as e:
+        print(f"⚠️ Booth photo prefetch failed ({BOOTH_LOCATION}): {e}")
+
+@app.post("/api/photo-cache/prefetch")
+async def photo_cache_prefetch(req: PhotoPrefetch):
+    """Warm the cache before polls open, e.g. {"location": "Chennai"}"""
+    if not req.location and not req.voterIds:
+        raise HTTPException(status_code=400, detail="Give a location or voterIds")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, prefetch_location, req.location, req.voterIds)
+
+@app.get("/api/photo-cache/stats")
+async def photo_cache_stats():
+    return reference_photo_cache.stats()
+
+# --- BIOMETRIC STRATEGIES (run by the cascade, cheapest decisive first within a tier) ---
+from biometric_cascade import BiometricCascade, Strategy, Outcome, ACCEPT, REJECT, UNSURE
+from config.settings import (
+    BIOMETRIC_CASCADE, BIOMETRIC_ADAPTIVE_ORDER, BIOMETRIC_MIN_SAMPLES, BIOMETRIC_MAX_OVERTURN,
+    BIOMETRIC_EXPLORE_RATE, BIOMETRIC_EMBEDDING_REJECT_PRIOR
+)
+
+# Strategies receive PreparedFrames and share their gray / RGB / half-size views.
+# 1. Face Embedding (DeepFace VGG-Face or its ONNX export)
+def embedding_strategy(live, stored):
+    result = verify_faces(live.bgr, stored.bgr)
+    distance = float(result["distance"])
+    if result["verified"]:
+        return Outcome(ACCEPT, distance)
+    return Outcome(REJECT, distance, f"Biometric Mismatch (embedding distance {distance:.2f})")
+
+# 2. face_recognition (Dlib)
+def dlib_strategy(live, stored):
+    # Even smaller for Dlib to speed it up
+    live_encs = face_recognition.face_encodings(live.small_rgb)
+    stored_encs = face_recognition.face_encodings(stored.small_rgb)
+    if not live_encs or not stored_encs:
+        return Outcome(UNSURE, message="Dlib found no face")
+    distance = float(face_recognition.face_distance([stored_encs[0]], live_encs[0])[0])
+    if distance <= 0.5:
+        return Outcome(ACCEPT, distance)
+    return Outcome(REJECT, distance, f"Biometric Mismatch (dlib distance {distance:.2f})")
+
+# 3. Geometric (MediaPipe landmarks), strict threshold 0.15
+def geometric_strategy(live, stored):
+    live_vec = calculate_face_vector(live)
+    stored_vec = calculate_face_vector(stored)
+    if live_vec is None or stored_vec is None:
+        return Outcome(UNSURE, message="No face detected in one or both images")
+    distance = float(np.linalg.norm(live_vec - stored_vec))
+    if distance < 0.15:
+        return Outcome(ACCEPT, distance)
+    return Outcome(REJECT, distance, f"Biometric Mismatch (geometric distance {distance:.2f})")
+
+# 4. OpenCV cropped-histogram correlation (final fallback)
+def histogram_strategy(live, stored):
+    def get_face_crop(img):
+        gray = img.gray
+        with haar_pool.acquire() as cascade:
+            faces = cascade.detectMultiScale(gray, 1.1, 4)
+        if len(faces) > 0:
+            # Use the largest face
+            (x, y, w, h) = sorted(faces, key=lambda f: f[2]*f[3], reverse=True)[0]
+            return gray[y:y+h, x:x+w]
+        return gray # Fallback to full gray image
+
+    crop_live_res = cv2.resize(get_face_crop(live), (128, 128))
+    crop_stored_res = cv2.resize(get_face_crop(stored), (128, 128))
+
+    hist_live = cv2.calcHist([crop_live_res], [0], None, [256], [0, 256])
+    hist_stored = cv2.calcHist([crop_stored_res], [0], None, [256], [0, 256])
+    cv2.normalize(hist_live, hist_live, 0, 1, cv2.NORM_MINMAX)
+    cv2.normalize(hist_stored, hist_stored, 0, 1, cv2.NORM_MINMAX)
+
+    score = cv2.compareHist(hist_live, hist_stored, cv2.HISTCMP_CORREL)
+    print(f"Cropped Histogram Correlation: {score:.4f} (Strict Threshold: > 0.85)")
+    if score > 0.85:
+        return Outcome(ACCEPT, 1.0 - score)
+    return Outcome(REJECT, 1.0 - score, f"Biometric Mismatch. Score: {score:.2f} (Required > 0.85)")
+
+biometric_cascade = BiometricCascade(
+    [
+        Strategy("embedding", embedding_strategy, tier=0,
+                 success_message="Identity Verified (AI)",
+                 reject_prior=BIOMETRIC_EMBEDDING_REJECT_PRIOR,
+                 available=lambda: face_embedder is not None or DeepFace is not None),
+        Strategy("dlib", dlib_strategy, tier=0,
+                 success_message="Identity Verified (Fallback)",
+                 available=lambda: USE_FACE_REC),
+        Strategy("geometric", geometric_strategy, tier=1,
+                 success_message="Identity Verified Successfully",
+                 available=lambda: mp_face_mesh is not None),
+        Strategy("histogram", histogram_strategy, tier=2,
+                 success_message="Identity Verified (Fallback: Structural Match)",
+                 available=lambda: haar_pool is not None),
+    ],
+    order=BIOMETRIC_CASCADE,
+    min_samples=BIOMETRIC_MIN_SAMPLES,
+    max_overturn=BIOMETRIC_MAX_OVERTURN,
+    explore_rate=BIOMETRIC_EXPLORE_RATE,
+    adaptive=BIOMETRIC_ADAPTIVE_ORDER
+)
+
+@app.get("/api/biometric/stats")
+async def biometric_stats():
+    """Per-strategy latency / outcome telemetry and the current cascade policy"""
+    return biometric_cascade.report()
 
 # --- NEW: Store Live Reference Face ---
 @app.post("/api/biometric-verification")
@@ -1333,25 +2092,31 @@ async def biometric_verification(
     voter_id: str = Form(...)
 ):
     voter_id = voter_id.strip() # Clean input
+    await require_models("deepface", "face_embedder", "face_recognition", "mediapipe", "haar_cascade")
     print(f"\n--- [Biometric Verification] Request Received for Voter: {voter_id} ---")
     try:
-        # 1. Fetch User from DB (Sync Check)
+        # 1. Fetch User from DB (Sync Check) - without the photo, which is huge
         print(f"Fetching user record for {voter_id}...")
-        res = supabase.table("users").select("*").eq("voter_id", voter_id).execute()
+        res = supabase.table("users").select("username, voter_id, role").eq("voter_id", voter_id).execute()
         if not res.data or len(res.data) == 0:
             print(f"ERROR: Voter ID '{voter_id}' NOT FOUND in retrieval.")
             return {"status": "error", "message": f"Voter ID '{voter_id}' NOT FOUND."}
         
         user_record = res.data[0]
-        stored_photo_b64 = user_record.get("photo_base64")
-        
-        if not stored_photo_b64:
-             print("ERROR: No stored photo for this voter.")
-             return {"status": "error", "message": "No photo registered for this voter. Contact Admin."}
 
-        # 2. Decode Stored Photo (Optimized with Cache)
+        # 2. Reference Photo: cache hit skips the photo download entirely
         print(f"Retrieving reference photo for {voter_id}...")
-        stored_frame = get_cached_photo(voter_id, stored_photo_b64)
+        stored_frame = reference_photo_cache.get(voter_id)
+        if stored_frame is None:
+            photo_res = supabase.table("users").select("photo_base64").eq("voter_id", voter_id).execute()
+            stored_photo_b64 = photo_res.data[0].get("photo_base64") if photo_res.data else None
+            if not stored_photo_b64:
+                 print("ERROR: No stored photo for this voter.")
+                 return {"status": "error", "message": "No photo registered for this voter. Contact Admin."}
+            try:
+                stored_frame = reference_photo_cache.put_encoded(voter_id, decode_photo_base64(stored_photo_b64))
+            except Exception:
+                stored_frame = None
         
         if stored_frame is None:
              print("ERROR: Could not decode stored biometric data.")
@@ -1362,155 +2127,40 @@ async def biometric_verification(
         # 3. Process Live Image
         print("Processing live camera frame...")
         live_content = await live_image.read()
-        nparr_live = np.frombuffer(live_content, np.uint8)
-        live_frame = cv2.imdecode(nparr_live, cv2.IMREAD_COLOR)
-        
-        # --- OPTIMIZATION: Resize images aggressively for faster processing ---
-        def resize_for_ai(img, max_dim=480):
-            h, w = img.shape[:2]
-            if max(h, w) > max_dim:
-                scale = max_dim / max(h, w)
-                return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
-            return img
-
-        stored_frame = resize_for_ai(stored_frame)
-        live_frame = resize_for_ai(live_frame)
+        # --- OPTIMIZATION: Decode straight at the processing size (reduced JPEG decode) ---
+        live_frame = PreparedFrame.decode(live_content, VERIFY_FRAME_MAX_DIM)
+        if live_frame is None:
+            return {"status": "error", "message": "Could not decode live image"}
+        stored_frame = PreparedFrame(fit_max_dim(stored_frame, VERIFY_FRAME_MAX_DIM))
         
         start_time = time.time()
         print(f"Processing Images: Live={live_frame.shape}, Stored={stored_frame.shape}")
         
-        # --- STRATEGY 1: DeepFace (Deep Learning) ---
-        if DeepFace is not None:
-            try:
-                df_start = time.time()
-                print("DeepFace Verification Started...")
-                result = DeepFace.verify(
-                    img1_path=live_frame, 
-                    img2_path=stored_frame, 
-                    model_name='VGG-Face',
-                    enforce_detection=False,
-                    silent=True # Don't flood logs
-                )
-                duration = time.time() - df_start
-                print(f"DeepFace Result: {result['verified']} (Time: {duration:.2f}s)")
-                
-                if result['verified']:
-                     return {
-                         "status": "success", 
-                         "message": "Identity Verified (AI)", 
-                         "distance": result['distance'],
-                         "duration": f"{duration:.2f}s",
-                         "user": user_record
-                     }
-            except Exception as e:
-                print(f"DeepFace failed: {e}")
-
-        # --- STRATEGY 2: face_recognition (Dlib) - Only if DeepFace wasn't sure ---
-        if USE_FACE_REC:
-            try:
-                dlib_start = time.time()
-                print("Dlib Verification Started...")
-                # Even smaller for Dlib to speed it up
-                small_live = cv2.resize(live_frame, (0, 0), fx=0.5, fy=0.5)
-                small_stored = cv2.resize(stored_frame, (0, 0), fx=0.5, fy=0.5)
-                
-                rgb_live = cv2.cvtColor(small_live, cv2.COLOR_BGR2RGB)
-                rgb_stored = cv2.cvtColor(small_stored, cv2.COLOR_BGR2RGB)
-                
-                live_encs = face_recognition.face_encodings(rgb_live)
-                stored_encs = face_recognition.face_encodings(rgb_stored)
-                
-                if live_encs and stored_encs:
-                    match = face_recognition.compare_faces([stored_encs[0]], live_encs[0], tolerance=0.5)
-                    duration = time.time() - dlib_start
-                    print(f"Dlib Result: {match[0]} (Time: {duration:.2f}s)")
-                    
-                    if match[0]:
-                        return {
-                            "status": "success", 
-                            "message": "Identity Verified (Fallback)", 
-                            "duration": f"{duration:.2f}s",
-                            "user": user_record
-                        }
-            except Exception as e:
-                print(f"Dlib failed: {e}")
-
-        # --- STRATEGY 3: Geometric (MediaPipe Fallback) ---
-        print("Falling back to STRATEGY 3: Geometric Analysis...")
-        live_vec = calculate_face_vector(live_frame)
-        stored_vec = calculate_face_vector(stored_frame)
-
-        if live_vec is not None and stored_vec is not None:
-            # 5. Compare
-            dist = np.linalg.norm(live_vec - stored_vec)
-            print(f"Geometric Distance: {dist:.4f} (Strict Threshold: 0.15)")
-            
-            # Threshold - STRICTER (0.15)
-            if dist < 0.15:
-                 print("Geometric VERIFIED!")
-                 return {
-                     "status": "success", 
-                     "message": "Identity Verified Successfully", 
-                     "distance": float(dist),
-                     "user": user_record
-                 }
-            else:
-                 print("Geometric MISMATCH!")
-        else:
-            print("Geometric Analysis Failed (No Face Detected in one or both images).")
+        # --- Strategy cascade: stops on the first accept or a confident reject ---
+        loop = asyncio.get_running_loop()
+        outcome, strategy_name, trace = await loop.run_in_executor(
+            inference_executor, biometric_cascade.run, live_frame, stored_frame
+        )
+        duration = time.time() - start_time
+        print(f"Cascade Result: {outcome.verdict} via {strategy_name} (Time: {duration:.2f}s) {trace}")
 
-        # --- STRATEGY 4: OpenCV Histogram Analysis (Final Fallback) ---
-        print("Attempting STRATEGY 4: Smart Cropped Structural Analysis (OpenCV)...")
-        
-        try:
-            # Use OpenCV to find faces for better histogram comparison
-            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            
-            def get_face_crop(img):
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-                if len(faces) > 0:
-                    # Use the largest face
-                    (x, y, w, h) = sorted(faces, key=lambda f: f[2]*f[3], reverse=True)[0]
-                    return gray[y:y+h, x:x+w]
-                return gray # Fallback to full gray image
-            
-            crop_live = get_face_crop(live_frame)
-            crop_stored = get_face_crop(stored_frame)
-            
-            # Sub-Strategy 4a: Direct Template Matching (Small offset resilience)
-            # Resize both to same size
-            crop_live_res = cv2.resize(crop_live, (128, 128))
-            crop_stored_res = cv2.resize(crop_stored, (128, 128))
-            
-            # Histogram Correlation on CROPPED faces
-            hist_live = cv2.calcHist([crop_live_res], [0], None, [256], [0, 256])
-            hist_stored = cv2.calcHist([crop_stored_res], [0], None, [256], [0, 256])
-            
-            cv2.normalize(hist_live, hist_live, 0, 1, cv2.NORM_MINMAX)
-            cv2.normalize(hist_stored, hist_stored, 0, 1, cv2.NORM_MINMAX)
-            
-            score = cv2.compareHist(hist_live, hist_stored, cv2.HISTCMP_CORREL)
-            
-            print(f"--- COMPARISON PROOF ---")
-            print(f"Method: Cropped Histogram Correlation")
-            print(f"Score: {score:.4f} (Strict Threshold: > 0.85 for crops)")
-            print(f"------------------------")
-            
-            # For cropped faces, 0.85 is actually quite a good indicator if they are the same person in similar lighting
-            # Given how bad the current state is, we use 0.85 but warn.
-            if score > 0.85:
-                 return {
-                     "status": "success",
-                     "message": "Identity Verified (Fallback: Structural Match)",
-                     "distance": 1.0 - score,
-                     "user": user_record
-                 }
-            else:
-                 return {"status": "error", "message": f"Biometric Mismatch. Score: {score:.2f} (Required > 0.85)"}
-        except Exception as e:
-            print(f"Strategy 4 Failed: {e}")
-            return {"status": "error", "message": f"Verification failed. {str(e)}"}
+        if outcome.verdict == ACCEPT:
+            strategy = next(s for s in biometric_cascade.strategies if s.name == strategy_name)
+            return {
+                "status": "success",
+                "message": strategy.success_message,
+                "distance": outcome.distance,
+                "duration": f"{duration:.2f}s",
+                "user": user_record,
+                "cascade": trace,
+                "biometric_token": issue_biometric_token(voter_id, strategy_name),
+                "biometric_token_ttl": BIOMETRIC_SESSION_TTL
+            }
+        return {
+            "status": "error",
+            "message": outcome.message or "Verification failed.",
+            "cascade": trace
+        }
 
     except Exception as e:
         print(f"CRITICAL EXCEPTION in Verification: {e}")
@@ -1613,6 +2263,21 @@ async def election_scheduler():
             print(f"Scheduler Error: {e}")
             await asyncio.sleep(3)
 
+async def calibrate_password_cost():
+    """
+    Measure only once the models have loaded: their CPU load would make bcrypt look slow and
+    pick a low cost. BCRYPT_ROUNDS is the floor; calibration can only raise it.
+    """
+    try:
+        await model_registry.wait(*model_registry.names(), timeout=600)
+    except Exception as e:
+        print(f"⚠️ Calibrating bcrypt while models still load: {e}")
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, password_hasher.calibrate, PASSWORD_HASH_TARGET_MS, BCRYPT_ROUNDS)
+    except Exception as e:
+        print(f"⚠️ bcrypt calibration failed, keeping {password_hasher.rounds} rounds: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Validate environment and start background tasks"""
@@ -1623,29 +2288,129 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️  Environment validation warning: {e}")
     
+    # One worker of a multi-process deployment runs the singleton background workers
+    global background_leader
+    background_leader = leader_lock.acquire(BACKGROUND_LOCK_FILE)
+    print(f"{'✅' if background_leader else 'ℹ️ '} Background workers: {'this process' if background_leader else 'another worker'} (pid {os.getpid()})")
+
     # Start election scheduler
-    asyncio.create_task(election_scheduler())
+    if background_leader:
+        asyncio.create_task(election_scheduler())
 
     # Start blockchain initialization (Background)
     asyncio.create_task(initialize_blockchain())
+    asyncio.create_task(watch_contract_address())
+
+    # Warm the reference photo cache for this booth's voters (disk tier survives restarts)
+    if BOOTH_LOCATION:
+        asyncio.create_task(prefetch_booth_photos())
+
+    # Load ML models in the background (parallel); biometric endpoints wait for them
+    model_registry.start()
+
+    # Perceptual hashes of registered photos for the duplicate screen
+    asyncio.create_task(load_photo_hash_index_task())
+
+    # Drain registration photo jobs (resumes whatever was queued before a restart)
+    if background_leader:
+        photo_job_worker.start()
+
+    # Tune the bcrypt cost to this machine (registration uses BCRYPT_ROUNDS until done)
+    if PASSWORD_HASH_TARGET_MS > 0:
+        asyncio.create_task(calibrate_password_cost())
+
+@app.get("/ready")
+async def readiness():
+    """Per-model load status; 503 until every model has finished loading (or failed)"""
+    return JSONResponse(
+        status_code=200 if model_registry.ready else 503,
+        content={"ready": model_registry.ready, "models": model_registry.status()}
+    )
+
+@app.get("/api/inference/stats")
+async def inference_stats():
+    """Detector pool usage: waits > 0 means inference threads queued for a detector"""
+    pools = {"face_mesh": face_mesh_pool, "id_face_mesh": id_face_mesh_pool,
+             "tracking_face_mesh": tracking_face_mesh_pool, "haar_cascade": haar_pool}
+    return {
+        "inference_workers": INFERENCE_WORKERS,
+        "pools": {name: pool.stats() for name, pool in pools.items() if pool is not None}
+    }
+
+@app.get("/api/chain/candidates")
+async def chain_candidates():
+    """Every on-chain candidate with its vote count, in one contract read"""
+    reader = contract_reader()
+    try:
+        return {"candidates": await asyncio.get_running_loop().run_in_executor(None, reader.candidates)}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Blockchain read failed: {e}")
 
-    # Clear reference photo cache to force fresh fetches on new session
-    reference_photo_cache.clear()
+@app.post("/api/chain/has-voted")
+async def chain_has_voted(req: VoterIdBatch):
+    """hasVoted for many voters at once -> {voterId: bool}"""
+    reader = contract_reader()
+    try:
+        return {"hasVoted": await asyncio.get_running_loop().run_in_executor(None, reader.has_voted_many, req.voterIds)}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Blockchain read failed: {e}")
 
-    # --- OPTIMIZATION: Warm up DeepFace to avoid first-request delay ---
-    if DeepFace is not None:
-        try:
-            print("Warming up DeepFace (VGG-Face)...")
-            # Create a small dummy image for initial pass
-            dummy = np.zeros((224, 224, 3), dtype=np.uint8)
-            DeepFace.build_model("VGG-Face")
-            # One silent run to fully initialize weights/graph
-            try:
-                 DeepFace.verify(dummy, dummy, model_name='VGG-Face', enforce_detection=False, silent=True)
-            except: pass
-            print("✅ DeepFace Warmup Complete")
-        except Exception as e:
-            print(f"⚠️ DeepFace Warmup Failed: {e}")
+@app.post("/api/chain/vote-hashes")
+async def chain_vote_hashes(req: VoterIdBatch):
+    """On-chain vote hashes for many voters at once -> {voterId: hash or ''}"""
+    reader = contract_reader()
+    try:
+        return {"voteHashes": await asyncio.get_running_loop().run_in_executor(None, reader.vote_hashes, req.voterIds)}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Blockchain read failed: {e}")
+
+@app.get("/api/rpc/stats")
+async def rpc_stats():
+    """JSON-RPC batching: calls_per_request shows how many reads each HTTP round trip carried"""
+    if w3 is None:
+        return {"connected": False}
+    return {"connected": True, "url": GANACHE_URL, "timeout": RPC_TIMEOUT, **w3.batch.stats()}
+
+@app.get("/api/chain/receipts/stats")
+async def receipt_stats():
+    """Shared receipt watcher: pending txs and per-transaction confirmation latency histogram"""
+    if receipt_watcher is None:
+        return {"running": False}
+    return {"running": True, **receipt_watcher.stats()}
+
+@app.get("/api/chain/health")
+async def chain_health():
+    """Node health (block height, probe latency, error rate), breaker state and the vote outbox"""
+    health = chain_monitor.stats() if chain_monitor else chain_breaker.stats()
+    return {"connected": w3 is not None, "mode": CHAIN_BREAKER_MODE, **health, "outbox": vote_forwarder.stats()}
+
+@app.get("/api/chain-index/stats")
+async def chain_index_stats():
+    """Event indexer progress (last_block vs. the chain head) and indexed counts"""
+    if chain_indexer is None:
+        return {"running": False, "leader": background_leader, **chain_events.stats()}
+    return {"running": True, **chain_indexer.stats()}
+
+@app.get("/api/photo-jobs/status")
+async def photo_jobs_status():
+    """Registration photo processing progress (queue counts, recent errors, worker throughput)"""
+    return {"queue": photo_job_queue.progress(), "worker": photo_job_worker.stats()}
+
+@app.post("/api/photo-jobs/retry-failed")
+async def photo_jobs_retry_failed():
+    requeued = photo_job_queue.retry_failed()
+    photo_job_worker.notify()
+    return {"status": "success", "requeued": requeued}
+
+@app.get("/api/photo-hash/stats")
+async def photo_hash_stats():
+    """Duplicate-screen index: mean_candidates is the number of hashes compared per lookup"""
+    return {"max_distance": PHASH_MAX_DISTANCE, "load": photo_hash_index_load, **photo_hash_index.stats()}
+
+@app.get("/api/security/password-stats")
+async def password_stats():
+    """bcrypt pool: queued > 0 or rising queue_wait_ms means registrations are waiting on hashing"""
+    return password_hasher.stats()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=5000)
@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: per-frame landmark feature cost, object loops vs. vectorized NumPy
+Runs on synthetic FaceMesh output (478 points), no camera or MediaPipe needed.
+Usage: python benchmark_landmarks.py [iterations]
+"""
+
+import math
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from face_geometry import (
+    landmarks_to_array, get_geometric_vector, eye_aspect_ratio, check_eyebrow,
+    check_head_pose, check_landmark_consistency, face_box
+)
+
+W, H = 640, 480
+
+
+def make_landmarks(n=478, seed=0):
+    rng = np.random.default_rng(seed)
+    xs = rng.uniform(0.3, 0.7, n)
+    ys = rng.uniform(0.2, 0.8, n)
+    zs = rng.normal(0, 0.02, n)
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in zip(xs, ys, zs)]
+
+
+# --- Previous per-landmark implementations (reference) ---
+
+def legacy_geometric_vector(landmarks, w, h):
+    points = [33, 263, 1, 61, 291, 199, 152]
+    coords = [np.array([landmarks[p].x * w, landmarks[p].y * h]) for p in points]
+    scale = np.linalg.norm(coords[0] - coords[1])
+    if scale == 0: return None
+    vector = []
+    for i in range(len(coords)):
+        for j in range(i + 1, len(coords)):
+            vector.append(np.linalg.norm(coords[i] - coords[j]) / scale)
+    return np.array(vector)
+
+
+def legacy_ear(landmarks, w, h):
+    def ear(idxs):
+        p = [np.array([landmarks[i].x * w, landmarks[i].y * h]) for i in idxs]
+        v1 = np.linalg.norm(p[1] - p[5])
+        v2 = np.linalg.norm(p[2] - p[4])
+        hor = np.linalg.norm(p[0] - p[3])
+        return (v1 + v2) / (2.0 * hor)
+    return (ear([362, 385, 387, 263, 373, 380]) + ear([33, 160, 158, 133, 153, 144])) / 2.0
+
+
+def legacy_eyebrow(landmarks):
+    eyebrow_y = (landmarks[65].y + landmarks[159].y) / 2
+    dist = abs(landmarks[145].y - eyebrow_y)
+    return dist / abs(landmarks[152].y - landmarks[10].y) > 0.05
+
+
+def legacy_head_pose(landmarks, w, h):
+    n, l, r = landmarks[1], landmarks[33], landmarks[263]
+    dist_l = math.sqrt((n.x * w - l.x * w) ** 2 + (n.y * h - l.y * h) ** 2)
+    dist_r = math.sqrt((n.x * w - r.x * w) ** 2 + (n.y * h - r.y * h) ** 2)
+    return min(dist_l, dist_r) / max(dist_l, dist_r) > 0.5
+
+
+def legacy_consistency(landmarks):
+    nose = landmarks[1].y
+    return landmarks[33].y < nose and landmarks[263].y < nose and nose < landmarks[13].y
+
+
+def legacy_box(landmarks, w, h, pad=20):
+    x_min, y_min, x_max, y_max = w, h, 0, 0
+    for l in landmarks:
+        x, y = int(l.x * w), int(l.y * h)
+        if x < x_min: x_min = x
+        if x > x_max: x_max = x
+        if y < y_min: y_min = y
+        if y > y_max: y_max = y
+    x_min, y_min = max(0, x_min - pad), max(0, y_min - pad)
+    x_max, y_max = min(w, x_max + pad), min(h, y_max + pad)
+    return x_min, y_min, x_max - x_min, y_max - y_min
+
+
+def legacy_frame(landmarks):
+    return (
+        legacy_box(landmarks, W, H),
+        legacy_ear(landmarks, W, H),
+        legacy_eyebrow(landmarks),
+        legacy_head_pose(landmarks, W, H),
+        legacy_consistency(landmarks),
+        legacy_geometric_vector(landmarks, W, H),
+    )
+
+
+def vectorized_frame(landmarks):
+    pts = landmarks_to_array(landmarks)
+    return (
+        face_box(pts, W, H),
+        eye_aspect_ratio(pts, W, H),
+        check_eyebrow(pts),
+        check_head_pose(pts, W, H),
+        check_landmark_consistency(pts),
+        get_geometric_vector(pts, W, H),
+    )
+
+
+def bench(fn, landmarks, iterations):
+    fn(landmarks)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(landmarks)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    landmarks = make_landmarks()
+
+    old, new = legacy_frame(landmarks), vectorized_frame(landmarks)
+    # float32 coordinates may truncate one pixel differently at integer boundaries
+    assert all(abs(o - n) <= 1 for o, n in zip(old[0], new[0])), (old[0], new[0])
+    assert np.isclose(old[1], new[1], rtol=1e-4)
+    assert old[2:5] == new[2:5]
+    assert np.allclose(old[5], new[5], rtol=1e-4)
+
+    t_old = bench(legacy_frame, landmarks, iterations)
+    t_new = bench(vectorized_frame, landmarks, iterations)
+    print(f"--- Landmark features per frame ({len(landmarks)} points, {iterations} runs) ---")
+    print(f"Object loops : {t_old:8.1f} us")
+    print(f"Vectorized   : {t_new:8.1f} us")
+    print(f"Speedup      : {t_old / t_new:8.2f}x")
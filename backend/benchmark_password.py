@@ -0,0 +1,45 @@
+"""
+Benchmark: registration password hashing throughput through the bcrypt pool
+Each registration costs one bcrypt hash; the pool runs them on worker threads (bcrypt
+releases the GIL), so throughput should grow with workers up to the core count.
+Usage: python benchmark_password.py [registrations] [rounds]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from password_hashing import PasswordHasher, measure_rounds
+
+
+async def run(workers: int, registrations: int, rounds: int):
+    hasher = PasswordHasher(workers, max_queue=registrations, rounds=rounds)
+    start = time.perf_counter()
+    await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(registrations)))
+    elapsed = time.perf_counter() - start
+    hasher.executor.shutdown()
+    return elapsed, hasher.stats()
+
+
+def main():
+    registrations = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    cores = os.cpu_count() or 1
+
+    print(f"bcrypt cost {rounds}: {measure_rounds(rounds):.0f} ms per hash (single thread)")
+    print(f"{registrations} registrations, {cores} cores\n")
+    print(f"{'workers':>8} {'reg/s':>8} {'reg/s/core':>11} {'wait p95 ms':>12} {'hash p95 ms':>12}")
+
+    workers = 1
+    while True:
+        elapsed, stats = asyncio.run(run(workers, registrations, rounds))
+        rate = registrations / elapsed
+        print(f"{workers:>8} {rate:>8.2f} {rate / min(workers, cores):>11.2f} "
+              f"{stats['queue_wait_ms']['p95']:>12.1f} {stats['hash_ms']['p95']:>12.1f}")
+        if workers >= cores: break
+        workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: contract reads against a local node, one request per read vs. JSON-RPC batches
+Compares a default Web3.HTTPProvider, the pooled provider from chain_rpc.make_web3 and
+BatchRPC.call_many on hasVoted(voterId) reads for synthetic voter ids.
+Usage (from the repo root, Ganache running): python backend/benchmark_rpc.py [reads] [batch_size]
+"""
+
+import json
+import os
+import sys
+import time
+
+from web3 import Web3
+
+from chain_rpc import make_web3
+from config.settings import GANACHE_URL, RPC_TIMEOUT
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_contract(w3):
+    with open(os.path.join(ROOT, "artifacts/contracts/Voting.sol/VotingSystem.json")) as f:
+        abi = json.load(f)["abi"]
+    with open(os.path.join(ROOT, "contract_address.txt")) as f:
+        address = f.read().strip()
+    return w3.eth.contract(address=address, abi=abi)
+
+
+def timed(label, reads, fn):
+    start = time.perf_counter()
+    http = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {reads / elapsed:>10.0f} reads/s {elapsed * 1000:>9.0f} ms {http:>8} HTTP requests")
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    voter_ids = [f"BENCH{i:07d}" for i in range(reads)]
+
+    plain = Web3(Web3.HTTPProvider(GANACHE_URL))
+    if not plain.is_connected():
+        print(f"No node at {GANACHE_URL}")
+        return
+    pooled = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
+    pooled.batch.max_batch = batch_size
+
+    print(f"{reads} hasVoted reads against {GANACHE_URL}\n")
+
+    def one_by_one(contract):
+        for v in voter_ids:
+            contract.functions.hasVoted(v).call()
+        return reads  # One HTTP request per read
+
+    timed("default HTTPProvider", reads, lambda: one_by_one(load_contract(plain)))
+    timed("pooled keep-alive session", reads, lambda: one_by_one(load_contract(pooled)))
+
+    c = load_contract(pooled)
+
+    def batched():
+        before = pooled.batch.http_requests
+        pooled.batch.call_many(c, "hasVoted", [(v,) for v in voter_ids])
+        return pooled.batch.http_requests - before
+    timed(f"JSON-RPC batch ({batch_size}/request)", reads, batched)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Cost-aware biometric verification cascade
+Runs the configured face-matching strategies in order, records latency and outcome per
+strategy, and stops as soon as one accepts or one rejects confidently.
+
+Decision policy (from the recorded statistics):
+  * Order: strategies keep their configured tier (strong embeddings before weak fallbacks);
+    within a tier, once every strategy has `min_samples` calls, the one with the lowest
+    expected cost per decision (mean latency / accept rate) runs first.
+  * Confident reject: each reject is remembered with its distance and whether a later
+    strategy of the same or a stronger tier overturned it (accepted anyway). The reject
+    cutoff of a strategy is the lowest distance above which at most `max_overturn` of
+    its rejects were overturned.
+    Until enough rejects are recorded the configured prior cutoff (if any) applies.
+  * Exploration: a fraction of requests run the full cascade despite a confident reject,
+    so the overturn statistics above the cutoff stay current.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+ACCEPT = "accept"
+REJECT = "reject"
+UNSURE = "unsure"
+ERROR = "error"
+
+
+class Outcome:
+    def __init__(self, verdict, distance=None, message=None):
+        self.verdict = verdict
+        self.distance = distance
+        self.message = message
+
+
+class Strategy:
+    def __init__(self, name, fn, tier=0, success_message=None, reject_prior=None, available=None):
+        self.name = name
+        self.fn = fn  # fn(live, stored) -> Outcome
+        self.tier = tier  # Lower tiers always run before higher ones
+        self.success_message = success_message or f"Identity Verified ({name})"
+        self.reject_prior = reject_prior  # Confident-reject distance before any data
+        self.available = available or (lambda: True)
+
+
+class StrategyStats:
+    def __init__(self, window=500):
+        self.calls = 0
+        self.counts = {ACCEPT: 0, REJECT: 0, UNSURE: 0, ERROR: 0}
+        self.total_ms = 0.0
+        self.latencies = deque(maxlen=window)
+        self.rejects = deque(maxlen=window)  # (distance, overturned)
+
+    def record(self, verdict, ms):
+        self.calls += 1
+        self.counts[verdict] += 1
+        self.total_ms += ms
+        self.latencies.append(ms)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    @property
+    def accept_rate(self):
+        return self.counts[ACCEPT] / self.calls if self.calls else 0.0
+
+    def percentile(self, q):
+        if not self.latencies: return 0.0
+        s = sorted(self.latencies)
+        return s[min(len(s) - 1, int(q * len(s)))]
+
+
+class BiometricCascade:
+    def __init__(self, strategies, order=None, min_samples=30, max_overturn=0.01,
+                 explore_rate=0.05, adaptive=True):
+        by_name = {s.name: s for s in strategies}
+        names = order or [s.name for s in strategies]
+        self.strategies = [by_name[n] for n in names if n in by_name]
+        self.stats = {s.name: StrategyStats() for s in self.strategies}
+        self.min_samples = min_samples
+        self.max_overturn = max_overturn
+        self.explore_rate = explore_rate
+        self.adaptive = adaptive
+        self._lock = threading.Lock()
+
+    def plan(self):
+        """Strategies in the order the next request should try them"""
+        active = [s for s in self.strategies if s.available()]
+        if not self.adaptive:
+            return active
+        position = {s.name: i for i, s in enumerate(active)}
+
+        def key(s):
+            st = self.stats[s.name]
+            if any(self.stats[o.name].calls < self.min_samples for o in active if o.tier == s.tier):
+                return (s.tier, 0, position[s.name])  # Not enough data: configured order
+            cost = st.mean_ms / max(st.accept_rate, 0.01)
+            return (s.tier, cost, position[s.name])
+
+        return sorted(active, key=key)
+
+    def reject_cutoff(self, strategy):
+        """Distance at or above which a reject from `strategy` ends the cascade (None: never)"""
+        samples = sorted(self.stats[strategy.name].rejects, key=lambda r: r[0], reverse=True)
+        cutoff, count, overturned = None, 0, 0
+        for distance, was_overturned in samples:
+            count += 1
+            overturned += int(was_overturned)
+            if count >= self.min_samples and overturned / count <= self.max_overturn:
+                cutoff = distance
+            elif overturned / count > self.max_overturn:
+                break
+        if cutoff is None and len(samples) < self.min_samples:
+            return strategy.reject_prior
+        return cutoff
+
+    def run(self, live, stored):
+        """Returns (outcome, strategy name or None, trace)"""
+        explore = random.random() < self.explore_rate
+        trace, rejected = [], []
+        accepted, confident = None, None
+        cut_short = False
+
+        for strategy in self.plan():
+            start = time.perf_counter()
+            try:
+                outcome = strategy.fn(live, stored)
+            except Exception as e:
+                print(f"[Cascade] {strategy.name} failed: {e}")
+                outcome = Outcome(ERROR, message=str(e))
+            ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.stats[strategy.name].record(outcome.verdict, ms)
+            trace.append({
+                "strategy": strategy.name, "verdict": outcome.verdict,
+                "distance": outcome.distance, "ms": round(ms, 1)
+            })
+
+            if outcome.verdict == ACCEPT:
+                accepted = (strategy, outcome)
+                break
+            if outcome.verdict == REJECT:
+                rejected.append((strategy, outcome))
+                cutoff = self.reject_cutoff(strategy)
+                if confident is None and cutoff is not None and outcome.distance is not None \
+                        and outcome.distance >= cutoff:
+                    confident = (strategy, outcome)
+                    trace[-1]["confident"] = True
+                    if not explore:
+                        cut_short = True
+                        break
+
+        # Overturn statistics are only known when the cascade ran to the end. A reject
+        # counts as overturned when a strategy of the same or a stronger tier accepted.
+        if not cut_short:
+            with self._lock:
+                for strategy, outcome in rejected:
+                    if outcome.distance is None: continue
+                    overturned = accepted is not None and accepted[0].tier <= strategy.tier
+                    self.stats[strategy.name].rejects.append((outcome.distance, overturned))
+
+        # A confident reject stands, even if an exploration run accepted later on
+        if confident is not None:
+            return confident[1], confident[0].name, trace
+        if accepted is not None:
+            return accepted[1], accepted[0].name, trace
+        if rejected:
+            return rejected[-1][1], rejected[-1][0].name, trace
+        return Outcome(UNSURE, message="No strategy could compare the faces"), None, trace
+
+    def report(self):
+        with self._lock:
+            return {
+                "order": [s.name for s in self.plan()],
+                "strategies": {
+                    s.name: {
+                        "tier": s.tier,
+                        "calls": self.stats[s.name].calls,
+                        "outcomes": dict(self.stats[s.name].counts),
+                        "mean_ms": round(self.stats[s.name].mean_ms, 1),
+                        "p95_ms": round(self.stats[s.name].percentile(0.95), 1),
+                        "accept_rate": round(self.stats[s.name].accept_rate, 3),
+                        "reject_cutoff": self.reject_cutoff(s),
+                        "rejects_recorded": len(self.stats[s.name].rejects),
+                    }
+                    for s in self.strategies
+                },
+            }
@@ -0,0 +1,55 @@
+"""
+Issued biometric session tokens (jti), shared by every worker
+/api/biometric-verification and /api/cast-vote may run in different serve.py workers, so the
+record of which tokens are live and which have been spent is kept in SQLite, not in a
+per-process dict. The token itself is signed; this store only makes it single-use.
+"""
+
+import time
+
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    jti TEXT PRIMARY KEY,
+    voter_id TEXT NOT NULL,
+    strategy TEXT,
+    issued REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expiry_idx ON sessions(expires_at);
+"""
+
+
+class BiometricSessionStore(SQLiteStore):
+    def __init__(self, path: str, ttl: float = 300, maxsize: int = 5000):
+        super().__init__(path, SCHEMA)
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+    def issue(self, jti: str, voter_id: str, strategy: str):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._db.execute("INSERT INTO sessions (jti, voter_id, strategy, issued, expires_at) VALUES (?, ?, ?, ?, ?)",
+                             (jti, voter_id, strategy, now, now + self.ttl))
+            # Oldest first once the cap is reached, as TTLStore evicts
+            self._db.execute("DELETE FROM sessions WHERE jti IN (SELECT jti FROM sessions ORDER BY issued DESC, rowid DESC "
+                             "LIMIT -1 OFFSET ?)", (self.maxsize,))
+
+    def get(self, jti: str):
+        """{voter_id, strategy, issued} of a live, unspent token, else None"""
+        with self._lock:
+            row = self._db.execute("SELECT voter_id, strategy, issued FROM sessions WHERE jti = ? AND expires_at > ?",
+                                   (jti, time.time())).fetchone()
+        return dict(row) if row is not None else None
+
+    def spend(self, jti: str) -> bool:
+        """Mark the token used; False if it was already spent or expired"""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM sessions WHERE jti = ? AND expires_at > ?",
+                                    (jti, time.time())).rowcount == 1
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
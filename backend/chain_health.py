@@ -0,0 +1,158 @@
+"""
+Chain health monitor and circuit breaker for the vote path
+A background probe measures eth_blockNumber latency against the node every few seconds;
+probe results and the vote path's own RPC outcomes feed a circuit breaker. While the breaker
+is open, cast_vote stops talking to the chain (fail fast or store-and-forward) instead of
+every request discovering the outage through its own timeouts. After a cooldown the next
+successful probe closes the breaker again (half-open: only the probe is let through).
+"""
+
+import threading
+import time
+from collections import deque
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, error_rate: float = 0.5, window: int = 20,
+                 min_samples: int = 5, cooldown: float = 10, slow_ms: float = 3000):
+        self.failure_threshold = failure_threshold  # Consecutive failures that open it
+        self.error_rate = error_rate  # ...or this failure fraction over the last `window` calls
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.slow_ms = slow_ms  # Calls slower than this count as failures
+        self._window = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive = 0
+        self.opened_at = None
+        self.last_error = None
+        self.trips = 0
+
+    def _open(self, now):
+        if self._state != OPEN:
+            self.trips += 1
+            print(f"⚠️ [Chain] Circuit breaker OPEN ({self.last_error})")
+        self._state = OPEN
+        self.opened_at = now
+
+    def _refresh(self, now):
+        if self._state == OPEN and now - self.opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+
+    def record(self, ok: bool, latency_ms: float = None, error: str = None):
+        now = time.monotonic()
+        if ok and latency_ms is not None and latency_ms > self.slow_ms:
+            ok, error = False, f"slow response ({latency_ms:.0f} ms)"
+        with self._lock:
+            self._refresh(now)
+            self._window.append(ok)
+            if ok:
+                self._consecutive = 0
+                if self._state == HALF_OPEN:
+                    self._state = CLOSED
+                    self._window.clear()
+                    print("✅ [Chain] Circuit breaker closed")
+                return
+            self._consecutive += 1
+            self.last_error = error
+            failures = self._window.count(False)
+            if (self._state == HALF_OPEN
+                    or self._consecutive >= self.failure_threshold
+                    or (len(self._window) >= self.min_samples and failures / len(self._window) >= self.error_rate)):
+                self._open(now)
+
+    def allow(self) -> bool:
+        """Whether the vote path may use the chain (only when closed; half-open is probe-only)"""
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state == CLOSED
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker may close again"""
+        with self._lock:
+            if self._state != OPEN: return 1
+            return max(1, int(self.cooldown - (time.monotonic() - self.opened_at)) + 1)
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            n = len(self._window)
+            return {
+                "state": state,
+                "error_rate": round(self._window.count(False) / n, 2) if n else 0.0,
+                "consecutive_failures": self._consecutive,
+                "trips": self.trips,
+                "last_error": self.last_error,
+                "open_for_s": round(time.monotonic() - self.opened_at, 1) if state != CLOSED and self.opened_at else 0,
+            }
+
+
+class ChainHealthMonitor:
+    def __init__(self, w3, breaker: CircuitBreaker, interval: float = 2, timeout: float = 2, window: int = 100):
+        self.w3 = w3
+        self.breaker = breaker
+        self.interval = interval
+        self.timeout = timeout
+        self.latencies = deque(maxlen=window)
+        self.block_height = None
+        self.block_changed_at = None
+        self.last_probe_at = None
+        self.probes = 0
+        self.probe_failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chain-health", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def probe(self):
+        start = time.perf_counter()
+        self.probes += 1
+        self.last_probe_at = time.time()
+        try:
+            result = self.w3.batch.request([("eth_blockNumber", [])], timeout=self.timeout)[0]
+            if isinstance(result, Exception):
+                raise result
+            height = int(result, 16)
+        except Exception as e:
+            self.probe_failures += 1
+            self.breaker.record(False, error=f"probe: {e}")
+            return
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.latencies.append(latency_ms)
+        if height != self.block_height:
+            self.block_height = height
+            self.block_changed_at = time.time()
+        self.breaker.record(True, latency_ms)
+
+    def stats(self) -> dict:
+        s = sorted(self.latencies)
+        pct = lambda q: round(s[min(len(s) - 1, int(q * len(s)))], 1) if s else None
+        return {
+            **self.breaker.stats(),
+            "block_height": self.block_height,
+            "seconds_since_new_block": round(time.time() - self.block_changed_at, 1) if self.block_changed_at else None,
+            "rpc_latency_ms": {"last": round(self.latencies[-1], 1) if s else None, "p50": pct(0.5), "p95": pct(0.95)},
+            "probes": self.probes,
+            "probe_failures": self.probe_failures,
+        }
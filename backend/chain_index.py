@@ -0,0 +1,238 @@
+"""
+Local index of the voting contract's events
+Follows VoteCast and CandidateAdded logs with eth_getLogs over block ranges and stores them
+in SQLite, keyed by voter hash (VoteCast indexes voterId, so the topic is keccak256(voterId)),
+tx hash and block. A per-contract checkpoint lets the indexer resume where it stopped, and
+voter -> tx lookups become one indexed query instead of a scan of every block.
+"""
+
+import threading
+import time
+
+from sqlite_store import SQLiteStore
+
+from web3 import Web3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    contract TEXT NOT NULL,
+    voter_key TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    vote_hash TEXT,
+    timestamp INTEGER,
+    tx_hash TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (contract, voter_key)
+);
+CREATE INDEX IF NOT EXISTS votes_tx_idx ON votes(tx_hash);
+CREATE INDEX IF NOT EXISTS votes_block_idx ON votes(contract, block_number);
+CREATE TABLE IF NOT EXISTS candidates (
+    contract TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    name TEXT,
+    uuid TEXT,
+    tx_hash TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    PRIMARY KEY (contract, candidate_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    contract TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def voter_key(voter_id: str) -> str:
+    """Topic of an indexed string: keccak256 of its UTF-8 bytes"""
+    return Web3.to_hex(Web3.keccak(text=voter_id))
+
+
+def event_topic(contract, name: str) -> str:
+    abi = next(e for e in contract.abi if e.get("type") == "event" and e["name"] == name)
+    signature = f"{name}({','.join(i['type'] for i in abi['inputs'])})"
+    return Web3.to_hex(Web3.keccak(text=signature))
+
+
+def deployment_block(w3, address: str) -> int:
+    """First block at which `address` has code (binary search over eth_getCode at past blocks)"""
+    lo, hi = 0, w3.eth.block_number
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if w3.eth.get_code(address, mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+class ChainEventStore(SQLiteStore):
+    def __init__(self, path: str):
+        super().__init__(path, SCHEMA)
+
+    def checkpoint(self, contract: str):
+        with self._lock:
+            row = self._db.execute("SELECT last_block FROM checkpoints WHERE contract = ?", (contract,)).fetchone()
+        return row[0] if row else None
+
+    def store(self, contract: str, votes, candidates, last_block: int):
+        """Rows of one block range plus the checkpoint, atomically"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(contract, v["voter_key"], v["candidate_id"], v["vote_hash"], v["timestamp"],
+                  v["tx_hash"], v["block_number"], v["log_index"]) for v in votes])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO candidates VALUES (?, ?, ?, ?, ?, ?)",
+                [(contract, c["candidate_id"], c["name"], c["uuid"], c["tx_hash"], c["block_number"])
+                 for c in candidates])
+            self._db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)", (contract, last_block, time.time()))
+
+    def vote_for(self, contract: str, voter_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM votes WHERE contract = ? AND voter_key = ?",
+                                   (contract, voter_key(voter_id))).fetchone()
+        return dict(row) if row else None
+
+    def vote_by_tx(self, tx_hash: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM votes WHERE tx_hash = ?", (tx_hash.lower(),)).fetchone()
+        return dict(row) if row else None
+
+    def candidates(self, contract: str):
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM candidates WHERE contract = ? ORDER BY candidate_id",
+                                    (contract,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def tallies(self, contract: str) -> dict:
+        """candidate_id -> votes indexed so far"""
+        with self._lock:
+            rows = self._db.execute("SELECT candidate_id, COUNT(*) FROM votes WHERE contract = ? GROUP BY candidate_id",
+                                    (contract,)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def stats(self, contract: str = None) -> dict:
+        with self._lock:
+            where, args = ("WHERE contract = ?", (contract,)) if contract else ("", ())
+            votes = self._db.execute(f"SELECT COUNT(*) FROM votes {where}", args).fetchone()[0]
+            candidates = self._db.execute(f"SELECT COUNT(*) FROM candidates {where}", args).fetchone()[0]
+        return {"votes": votes, "candidates": candidates,
+                "last_block": self.checkpoint(contract) if contract else None}
+
+
+class ChainIndexer:
+    """
+    Pulls the contract's logs in `chunk`-block eth_getLogs ranges from the checkpoint up to the
+    head and stores them; a refused range is retried at half the size.
+    """
+
+    def __init__(self, w3, contract, store: ChainEventStore, chunk: int = 2000, start_block: int = 0):
+        self.w3 = w3
+        self.store = store
+        self.chunk = self.max_chunk = chunk
+        self.start_block = start_block
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ranges = 0
+        self.logs = 0
+        self.errors = 0
+        self.retarget(contract)
+
+    def retarget(self, contract, start_block: int = None):
+        """Follow another deployment (reset_election); its checkpoint is tracked separately"""
+        with self._sync_lock:
+            self.contract = contract
+            self.address = contract.address
+            self.vote_topic = event_topic(contract, "VoteCast")
+            self.candidate_topic = event_topic(contract, "CandidateAdded")
+            if start_block is not None:
+                self.start_block = start_block
+
+    def _decode(self, logs):
+        votes, candidates = [], []
+        for log in logs:
+            topic = Web3.to_hex(log["topics"][0])
+            tx_hash = Web3.to_hex(log["transactionHash"]).lower()
+            if topic == self.vote_topic:
+                ev = self.contract.events.VoteCast().process_log(log)
+                votes.append({
+                    "voter_key": Web3.to_hex(log["topics"][1]),
+                    "candidate_id": ev["args"]["candidateId"],
+                    "vote_hash": ev["args"]["voteHash"],
+                    "timestamp": ev["args"]["timestamp"],
+                    "tx_hash": tx_hash,
+                    "block_number": log["blockNumber"],
+                    "log_index": log["logIndex"],
+                })
+            elif topic == self.candidate_topic:
+                ev = self.contract.events.CandidateAdded().process_log(log)
+                candidates.append({
+                    "candidate_id": ev["args"]["candidateId"],
+                    "name": ev["args"]["name"],
+                    "uuid": ev["args"]["uuid"],
+                    "tx_hash": tx_hash,
+                    "block_number": log["blockNumber"],
+                })
+        return votes, candidates
+
+    def sync(self, to_block: int = None) -> int:
+        """Index up to `to_block` (default: head); returns the number of logs stored"""
+        with self._sync_lock:
+            head = self.w3.eth.block_number if to_block is None else to_block
+            last = self.store.checkpoint(self.address)
+            start = self.start_block if last is None else last + 1
+            stored = 0
+            while start <= head:
+                end = min(head, start + self.chunk - 1)
+                try:
+                    logs = self.w3.eth.get_logs({
+                        "address": self.address,
+                        "fromBlock": start,
+                        "toBlock": end,
+                        "topics": [[self.vote_topic, self.candidate_topic]],
+                    })
+                except Exception:
+                    if end == start:
+                        raise
+                    self.chunk = max(1, (end - start + 1) // 2)  # Range refused as too large (or a blip)
+                    continue
+                votes, candidates = self._decode(logs)
+                self.store.store(self.address, votes, candidates, end)
+                self.ranges += 1
+                stored += len(logs)
+                start = end + 1
+                self.chunk = min(self.max_chunk, self.chunk * 2)  # Grow back after a refused range
+            self.logs += stored
+            return stored
+
+    def start(self, poll_interval: float = 2.0):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._follow, args=(poll_interval,), name="chain-indexer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _follow(self, poll_interval):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ [Indexer] Sync error: {e}")
+            self._stop.wait(poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "contract": self.address,
+            "chunk": self.chunk,
+            "ranges": self.ranges,
+            "logs": self.logs,
+            "errors": self.errors,
+            **self.store.stats(self.address),
+        }
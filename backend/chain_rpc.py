@@ -0,0 +1,123 @@
+"""
+Web3 provider layer: pooled keep-alive HTTP session, timeouts and JSON-RPC batching
+Every Web3 built here shares one requests.Session (connections are reused instead of
+re-opened per call) with an explicit timeout. web3 6.x cannot batch, so BatchRPC posts
+JSON-RPC arrays on the same session: N contract reads cost one HTTP round trip.
+"""
+
+import itertools
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from hexbytes import HexBytes
+
+
+class RpcError(RuntimeError):
+    def __init__(self, error: dict):
+        self.code = error.get("code")
+        super().__init__(error.get("message", str(error)))
+
+
+def make_session(pool_size: int = 20) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def make_web3(url: str, timeout: float = 10, pool_size: int = 20, session: requests.Session = None):
+    """Web3 over a pooled keep-alive session; the BatchRPC for the same node is at `w3.batch`"""
+    session = session or make_session(pool_size)
+    w3 = Web3(Web3.HTTPProvider(url, request_kwargs={"timeout": timeout}, session=session))
+    w3.batch = BatchRPC(w3, url, session, timeout)
+    return w3
+
+
+def function_abi(contract, name: str) -> dict:
+    return next(e for e in contract.abi if e.get("type") == "function" and e["name"] == name)
+
+
+class BatchRPC:
+    def __init__(self, w3, url: str, session: requests.Session, timeout: float = 10, max_batch: int = 200):
+        self.w3 = w3
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.http_requests = 0
+        self.calls = 0
+
+    def request(self, calls, timeout: float = None):
+        """
+        [(method, params)] -> results in the same order. A failed entry is returned as an
+        RpcError instance (not raised) so one bad read does not sink the rest of the batch.
+        """
+        results = []
+        for i in range(0, len(calls), self.max_batch):
+            chunk = calls[i:i + self.max_batch]
+            with self._lock:
+                ids = [next(self._ids) for _ in chunk]
+            payload = [{"jsonrpc": "2.0", "id": rid, "method": m, "params": p} for rid, (m, p) in zip(ids, chunk)]
+            resp = self.session.post(self.url, json=payload, timeout=timeout or self.timeout)
+            resp.raise_for_status()
+            body = resp.json()
+            if isinstance(body, dict):  # Node rejected the whole batch
+                raise RpcError(body.get("error") or {"message": str(body)})
+            by_id = {item.get("id"): item for item in body}
+            for rid in ids:
+                item = by_id.get(rid, {"error": {"message": "missing response"}})
+                results.append(RpcError(item["error"]) if "error" in item else item.get("result"))
+            self.http_requests += 1
+            self.calls += len(chunk)
+        return results
+
+    def call_many(self, contract, fn_name: str, args_list, block="latest"):
+        """eth_call `fn_name(*args)` for every args tuple in one batch; decoded outputs (or RpcError)"""
+        abi = function_abi(contract, fn_name)
+        types = [o["type"] for o in abi["outputs"]]
+        calls = [("eth_call", [{"to": contract.address, "data": contract.encodeABI(fn_name=fn_name, args=list(args))},
+                               block]) for args in args_list]
+        out = []
+        for raw in self.request(calls):
+            if isinstance(raw, RpcError):
+                out.append(raw)
+                continue
+            values = self.w3.codec.decode(types, HexBytes(raw))
+            out.append(values[0] if len(values) == 1 else tuple(values))
+        return out
+
+    def receipts(self, tx_hashes):
+        """eth_getTransactionReceipt for many hashes (None where not mined yet)"""
+        return self.request([("eth_getTransactionReceipt", [Web3.to_hex(h)]) for h in tx_hashes])
+
+    def wait_receipts(self, tx_hashes, timeout: float = 120, poll_interval: float = 0.2):
+        """
+        Poll the receipts of many transactions together (one batch per round) until all are
+        mined; returns {tx_hash hex: raw receipt dict}. Raises TimeoutError with the rest pending.
+        """
+        pending = [Web3.to_hex(h) for h in tx_hashes]
+        done = {}
+        deadline = time.monotonic() + timeout
+        while pending:
+            for h, receipt in zip(pending, self.receipts(pending)):
+                if receipt and not isinstance(receipt, RpcError):
+                    done[h] = receipt
+            pending = [h for h in pending if h not in done]
+            if not pending: break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{len(pending)} transactions not mined after {timeout}s")
+            time.sleep(poll_interval)
+        return done
+
+    def stats(self) -> dict:
+        return {
+            "http_requests": self.http_requests,
+            "calls": self.calls,
+            "calls_per_request": round(self.calls / self.http_requests, 1) if self.http_requests else 0.0,
+        }
@@ -0,0 +1,129 @@
+"""
+Accuracy / latency comparison: default stack vs. ONNX Runtime backend
+    Phone detection (process_frame): ultralytics YOLOv8n vs. ONNX export, on a folder of frames
+    Face verification (biometric_verification): DeepFace VGG-Face vs. ONNX embedding, on image pairs
+
+Usage (from backend/):
+    python compare_backends.py --frames samples/frames
+    python compare_backends.py --pairs samples/pairs.csv      # columns: img1,img2[,same]
+    python compare_backends.py --frames samples/frames --yolo-onnx models/yolov8n.int8.onnx
+"""
+
+import argparse
+import csv
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config.settings import ONNX_YOLO_PATH, ONNX_FACE_PATH, ONNX_FACE_THRESHOLD, ONNX_THREADS
+from onnx_backend import OnnxPhoneDetector, OnnxFaceEmbedder, cosine_distance
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - start) * 1000
+
+
+def latency_line(label, samples):
+    s = np.array(samples)
+    return f"{label:<12} mean {s.mean():7.1f} ms   p50 {np.percentile(s, 50):7.1f} ms   p95 {np.percentile(s, 95):7.1f} ms"
+
+
+def compare_phone(frames_dir, onnx_path):
+    from ultralytics import YOLO
+    yolo = YOLO("yolov8n.pt")
+    onnx = OnnxPhoneDetector(onnx_path, threads=ONNX_THREADS)
+
+    def yolo_phone(frame):
+        # Same rule as detect_phone() in app.py
+        res = yolo(frame, verbose=False)
+        return any(int(b.cls) == 67 and b.conf > 0.5 for b in res[0].boxes)
+
+    paths = sorted(p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(frames_dir, f"*.{ext}")))
+    if not paths:
+        print(f"No images in {frames_dir}")
+        return
+    agree, t_ref, t_onnx, disagreements = 0, [], [], []
+    for p in paths:
+        frame = cv2.imread(p)
+        if frame is None: continue
+        ref, tr = timed(yolo_phone, frame)
+        new, tn = timed(onnx.detect_phone, frame)
+        t_ref.append(tr)
+        t_onnx.append(tn)
+        if ref == new:
+            agree += 1
+        else:
+            disagreements.append((os.path.basename(p), ref, new))
+
+    print(f"\n--- Phone detection ({len(t_ref)} frames, {os.path.basename(onnx_path)}) ---")
+    print(f"Agreement: {agree}/{len(t_ref)} ({100 * agree / max(1, len(t_ref)):.1f}%)")
+    print(latency_line("ultralytics", t_ref[1:] or t_ref))
+    print(latency_line("onnx", t_onnx[1:] or t_onnx))
+    for name, ref, new in disagreements[:20]:
+        print(f"   {name}: ultralytics={ref} onnx={new}")
+
+
+def compare_faces(pairs_csv, onnx_path, threshold):
+    from deepface import DeepFace
+    embedder = OnnxFaceEmbedder(onnx_path, threads=ONNX_THREADS)
+
+    rows = []
+    with open(pairs_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            rows.append(row)
+    base = os.path.dirname(os.path.abspath(pairs_csv))
+
+    agree, correct_ref, correct_onnx, labelled = 0, 0, 0, 0
+    t_ref, t_onnx, d_ref, d_onnx = [], [], [], []
+    for row in rows:
+        img1 = cv2.imread(os.path.join(base, row["img1"]))
+        img2 = cv2.imread(os.path.join(base, row["img2"]))
+        if img1 is None or img2 is None: continue
+
+        ref, tr = timed(lambda a, b: DeepFace.verify(a, b, model_name='VGG-Face',
+                                                     enforce_detection=False, silent=True), img1, img2)
+        dist, tn = timed(lambda a, b: cosine_distance(embedder.embed(a), embedder.embed(b)), img1, img2)
+        new_verified = dist <= threshold
+
+        t_ref.append(tr)
+        t_onnx.append(tn)
+        d_ref.append(ref["distance"])
+        d_onnx.append(dist)
+        agree += int(ref["verified"] == new_verified)
+        if row.get("same") not in (None, ""):
+            same = row["same"].strip().lower() in ("1", "true", "yes")
+            labelled += 1
+            correct_ref += int(ref["verified"] == same)
+            correct_onnx += int(new_verified == same)
+
+    n = len(t_ref)
+    print(f"\n--- Face verification ({n} pairs, {os.path.basename(onnx_path)}, threshold {threshold}) ---")
+    print(f"Decision agreement with DeepFace: {agree}/{n} ({100 * agree / max(1, n):.1f}%)")
+    if n > 1:
+        print(f"Distance correlation: {np.corrcoef(d_ref, d_onnx)[0, 1]:.4f}")
+    if labelled:
+        print(f"Accuracy vs labels: deepface {correct_ref}/{labelled}, onnx {correct_onnx}/{labelled}")
+    print(latency_line("deepface", t_ref[1:] or t_ref))
+    print(latency_line("onnx", t_onnx[1:] or t_onnx))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare default and ONNX inference backends")
+    parser.add_argument("--frames", help="Folder of camera frames for phone detection")
+    parser.add_argument("--pairs", help="CSV of image pairs (img1,img2[,same]) for face verification")
+    parser.add_argument("--yolo-onnx", default=ONNX_YOLO_PATH)
+    parser.add_argument("--face-onnx", default=ONNX_FACE_PATH)
+    parser.add_argument("--threshold", type=float, default=ONNX_FACE_THRESHOLD)
+    args = parser.parse_args()
+
+    if not args.frames and not args.pairs:
+        parser.error("give --frames and/or --pairs")
+    if args.frames:
+        compare_phone(args.frames, args.yolo_onnx)
+    if args.pairs:
+        compare_faces(args.pairs, args.face_onnx, args.threshold)
@@ -12,3 +12,114 @@ DB_NAME = "election_db"
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-election-key-2026")
 API_KEY = os.getenv("API_KEY", "admin-api-key")
+
+# Liveness sessions (/api/process-frame)
+LIVENESS_SESSION_TTL = int(os.getenv("LIVENESS_SESSION_TTL", "120"))  # Seconds of inactivity
+LIVENESS_MAX_SESSIONS = int(os.getenv("LIVENESS_MAX_SESSIONS", "200"))
+LIVENESS_TRACKING_MESHES = int(os.getenv("LIVENESS_TRACKING_MESHES", "16"))  # Pooled tracking FaceMeshes; sessions beyond it run untracked
+LIVENESS_YOLO_EVERY = int(os.getenv("LIVENESS_YOLO_EVERY", "5"))  # Run phone detection every Nth frame
+LIVENESS_SMILE_EVERY = int(os.getenv("LIVENESS_SMILE_EVERY", "3"))  # DeepFace confirms a smile candidate at most every Nth frame
+
+# Inference backend: "default" (ultralytics + DeepFace/TensorFlow) or "onnx" (ONNX Runtime, CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "default").lower()
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "models"))
+ONNX_YOLO_PATH = os.getenv("ONNX_YOLO_PATH", os.path.join(MODELS_DIR, "yolov8n.onnx"))
+ONNX_FACE_PATH = os.getenv("ONNX_FACE_PATH", os.path.join(MODELS_DIR, "vgg_face.int8.onnx"))
+ONNX_FACE_THRESHOLD = float(os.getenv("ONNX_FACE_THRESHOLD", "0.40"))  # Cosine distance (DeepFace VGG-Face default)
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = let ONNX Runtime decide
+
+# Biometric verification cascade (see biometric_cascade.py)
+BIOMETRIC_CASCADE = [s.strip() for s in os.getenv("BIOMETRIC_CASCADE", "embedding,dlib,geometric,histogram").split(",") if s.strip()]
+BIOMETRIC_ADAPTIVE_ORDER = os.getenv("BIOMETRIC_ADAPTIVE_ORDER", "1") == "1"
+BIOMETRIC_MIN_SAMPLES = int(os.getenv("BIOMETRIC_MIN_SAMPLES", "30"))
+BIOMETRIC_MAX_OVERTURN = float(os.getenv("BIOMETRIC_MAX_OVERTURN", "0.01"))
+BIOMETRIC_EXPLORE_RATE = float(os.getenv("BIOMETRIC_EXPLORE_RATE", "0.05"))
+# Embedding distance treated as a confident reject before any statistics exist (unset: none)
+BIOMETRIC_EMBEDDING_REJECT_PRIOR = float(os.environ["BIOMETRIC_EMBEDDING_REJECT_PRIOR"]) if os.getenv("BIOMETRIC_EMBEDDING_REJECT_PRIOR") else None
+
+# Reference photo cache (see photo_cache.py)
+PHOTO_CACHE_MAX_MB = int(os.getenv("PHOTO_CACHE_MAX_MB", "256"))  # RAM tier budget
+PHOTO_CACHE_DIR = os.getenv("PHOTO_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "photo_cache"))  # Disk tier ('' disables)
+PHOTO_CACHE_MAX_DIM = int(os.getenv("PHOTO_CACHE_MAX_DIM", "480"))  # Longest side kept (verification resizes to this anyway)
+PHOTO_PREFETCH_BATCH = int(os.getenv("PHOTO_PREFETCH_BATCH", "50"))
+BOOTH_LOCATION = os.getenv("BOOTH_LOCATION", "")  # Voters of this location are prefetched on startup
+
+# Inference concurrency: detector instances per pool and threads running CPU inference
+DETECTOR_POOL_SIZE = int(os.getenv("DETECTOR_POOL_SIZE", "0")) or (os.cpu_count() or 1)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or DETECTOR_POOL_SIZE
+
+# ID-card encodings from /api/upload-id, kept per booth session token
+ID_SESSION_TTL = int(os.getenv("ID_SESSION_TTL", "600"))
+ID_SESSION_MAX_SESSIONS = int(os.getenv("ID_SESSION_MAX_SESSIONS", "500"))
+
+# Decode size of uploaded images (longest side; JPEGs are decoded reduced, see frame_prep.py)
+LIVENESS_FRAME_MAX_DIM = int(os.getenv("LIVENESS_FRAME_MAX_DIM", "640"))
+VERIFY_FRAME_MAX_DIM = int(os.getenv("VERIFY_FRAME_MAX_DIM", "480"))
+ID_FRAME_MAX_DIM = int(os.getenv("ID_FRAME_MAX_DIM", "1280"))  # ID photos are small, keep detail
+
+# Landmark smile score (face_geometry.smile_score); DeepFace emotion only confirms candidates
+SMILE_SCORE_THRESHOLD = float(os.getenv("SMILE_SCORE_THRESHOLD", "0.46"))
+SMILE_BASELINE_GAIN = float(os.getenv("SMILE_BASELINE_GAIN", "1.12"))  # vs. the session's neutral mouth
+
+# Frame-change gating for liveness sessions: mean gray difference (0-255) of a 32x32 thumbnail
+# of the face ROI below which the previous result is returned without inference (0 disables)
+FRAME_CHANGE_THRESHOLD = float(os.getenv("FRAME_CHANGE_THRESHOLD", "2.5"))
+FRAME_SKIP_MAX = int(os.getenv("FRAME_SKIP_MAX", "5"))  # Analyze at least every (N+1)th frame
+
+# Biometric session tokens issued by /api/biometric-verification and redeemed by /api/cast-vote
+BIOMETRIC_SESSION_TTL = int(os.getenv("BIOMETRIC_SESSION_TTL", "300"))
+BIOMETRIC_SESSION_MAX = int(os.getenv("BIOMETRIC_SESSION_MAX", "5000"))
+BIOMETRIC_SESSION_DB = os.getenv("BIOMETRIC_SESSION_DB", os.path.join(os.path.dirname(os.path.dirname(__file__)), "biometric_sessions.sqlite3"))
+REQUIRE_BIOMETRIC_TOKEN = os.getenv("REQUIRE_BIOMETRIC_TOKEN", "0") == "1"  # Reject votes without a token
+
+# Bulk voter roll import (roll_import.py, /api/import-roll)
+ROLL_IMPORT_BATCH = int(os.getenv("ROLL_IMPORT_BATCH", "1000"))
+ROLL_IMPORT_WORKERS = int(os.getenv("ROLL_IMPORT_WORKERS", "0")) or (os.cpu_count() or 1)  # Hashing processes
+ROLL_PINS_DIR = os.path.expanduser(os.getenv("ROLL_PINS_DIR", "~/election_roll_pins"))  # Generated PINs (0600), outside the repo
+
+# Password hashing pool (password_hashing.py): bcrypt off the event loop, bounded queue
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))  # Waiting hashes before 503
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Minimum cost; startup calibration may only raise it
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))  # Startup calibration target (0 disables)
+
+# Perceptual-hash duplicate screen of registration photos (photo_hash.py)
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "6"))  # Hamming bits (of 64) counted as the same photo
+PHASH_INDEX_CHUNKS = int(os.getenv("PHASH_INDEX_CHUNKS", "4"))  # Must divide 64; probes per lookup grow as radius // chunks
+PHASH_REJECT_DUPLICATES = os.getenv("PHASH_REJECT_DUPLICATES", "0") == "1"  # Otherwise flag and audit only
+
+# Registration photo jobs (photo_jobs.py): local SQLite queue drained by a background worker
+PHOTO_JOBS_DB = os.getenv("PHOTO_JOBS_DB", os.path.join(os.path.dirname(os.path.dirname(__file__)), "photo_jobs.sqlite3"))
+PHOTO_JOB_BATCH = int(os.getenv("PHOTO_JOB_BATCH", "16"))
+PHOTO_JOB_MAX_ATTEMPTS = int(os.getenv("PHOTO_JOB_MAX_ATTEMPTS", "5"))
+PHOTO_JOB_RETRY_DELAY = float(os.getenv("PHOTO_JOB_RETRY_DELAY", "10"))  # Seconds, doubled per attempt
+PHOTO_JOB_POLL = float(os.getenv("PHOTO_JOB_POLL", "2"))
+
+# Contract event index (chain_index.py): SQLite store fed by eth_getLogs ranges
+CHAIN_INDEX_DB = os.getenv("CHAIN_INDEX_DB", os.path.join(os.path.dirname(os.path.dirname(__file__)), "chain_index.sqlite3"))
+CHAIN_INDEX_CHUNK = int(os.getenv("CHAIN_INDEX_CHUNK", "2000"))  # Blocks per eth_getLogs request
+CHAIN_INDEX_POLL = float(os.getenv("CHAIN_INDEX_POLL", "2"))
+
+# Blockchain node and provider (chain_rpc.py)
+GANACHE_URL = os.getenv("GANACHE_URL", "http://127.0.0.1:7545")
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))  # Seconds per HTTP request
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))  # Keep-alive connections to the node
+CONTRACT_ADDRESS_POLL = float(os.getenv("CONTRACT_ADDRESS_POLL", "2"))  # Workers re-read contract_address.txt (reset_election)
+
+# Shared receipt watcher (receipt_watcher.py)
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "0.25"))  # Head checks; receipts fetched once per new block
+RECEIPT_TIMEOUT = float(os.getenv("RECEIPT_TIMEOUT", "120"))
+
+# Chain health probe and vote-path circuit breaker (chain_health.py, vote_outbox.py)
+CHAIN_PROBE_INTERVAL = float(os.getenv("CHAIN_PROBE_INTERVAL", "2"))  # Seconds between eth_blockNumber probes
+CHAIN_PROBE_TIMEOUT = float(os.getenv("CHAIN_PROBE_TIMEOUT", "2"))
+CHAIN_BREAKER_FAILURES = int(os.getenv("CHAIN_BREAKER_FAILURES", "3"))  # Consecutive failures that open the breaker
+CHAIN_BREAKER_ERROR_RATE = float(os.getenv("CHAIN_BREAKER_ERROR_RATE", "0.5"))  # ...or this failure fraction
+CHAIN_BREAKER_WINDOW = int(os.getenv("CHAIN_BREAKER_WINDOW", "20"))  # ...over the last N chain calls
+CHAIN_BREAKER_COOLDOWN = float(os.getenv("CHAIN_BREAKER_COOLDOWN", "10"))  # Seconds open before a probe may close it
+CHAIN_SLOW_MS = float(os.getenv("CHAIN_SLOW_MS", "3000"))  # Slower chain calls count as failures
+CHAIN_BREAKER_MODE = os.getenv("CHAIN_BREAKER_MODE", "fail_fast")  # "fail_fast" (503) or "queue" (store-and-forward)
+VOTE_OUTBOX_DB = os.getenv("VOTE_OUTBOX_DB", os.path.join(os.path.dirname(os.path.dirname(__file__)), "vote_outbox.sqlite3"))
+
+# Multi-worker deployments (serve.py): the process holding this lock runs the singleton background workers
+BACKGROUND_LOCK_FILE = os.getenv("BACKGROUND_LOCK_FILE", os.path.join(os.path.dirname(os.path.dirname(__file__)), "background.lock"))
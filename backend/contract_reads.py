@@ -0,0 +1,87 @@
+"""
+Batched reads of candidate and voter state
+Uses the contract's batched views (getCandidates, hasVotedMany, getVoteHashes) when the
+deployed contract has them, otherwise falls back to one JSON-RPC batch of the per-item getters
+(see chain_rpc.BatchRPC). Either way N states cost one round trip per `chunk` items, not N.
+"""
+
+import re
+
+from eth_utils import function_abi_to_4byte_selector
+
+from chain_rpc import RpcError
+
+PUSH4 = b"\x63"  # The dispatcher compares calldata against each selector pushed with PUSH4
+_deployed_code = {}  # contract address -> runtime bytecode
+_SOURCE_FUNCTION = re.compile(r"function\s+(\w+)\s*\([^)]*\)[^{;]*\b(?:public|external)\b")
+
+
+def missing_from_artifact(abi, source: str):
+    """Public functions declared in the Solidity source but absent from the compiled ABI"""
+    compiled = {e.get("name") for e in abi if e.get("type") == "function"}
+    return [name for name in _SOURCE_FUNCTION.findall(source) if name not in compiled]
+
+
+def has_function(contract, name: str) -> bool:
+    """
+    In the ABI and in the deployed bytecode. The artifact can list a view that the deployed
+    contract lacks (stale artifact, or a contract deployed before the view was added).
+    """
+    abi = next((e for e in contract.abi if e.get("type") == "function" and e.get("name") == name), None)
+    if abi is None:
+        return False
+    code = _deployed_code.get(contract.address)
+    if code is None:
+        code = _deployed_code[contract.address] = bytes(contract.w3.eth.get_code(contract.address))
+    return PUSH4 + function_abi_to_4byte_selector(abi) in code
+
+
+def _raise_first(values):
+    for v in values:
+        if isinstance(v, RpcError):
+            raise v
+    return values
+
+
+class ContractReader:
+    def __init__(self, w3, contract, chunk: int = 500):
+        self.w3 = w3
+        self.contract = contract
+        self.chunk = chunk
+
+    def _chunks(self, items):
+        for i in range(0, len(items), self.chunk):
+            yield items[i:i + self.chunk]
+
+    def candidates(self):
+        """[{id, name, uuid, voteCount}] in candidate id order"""
+        if has_function(self.contract, "getCandidates"):
+            rows = self.contract.functions.getCandidates().call()
+        else:
+            count = self.contract.functions.candidatesCount().call()
+            rows = _raise_first(self.w3.batch.call_many(self.contract, "candidates", [(i,) for i in range(1, count + 1)]))
+        return [{"id": r[0], "name": r[1], "uuid": r[2], "voteCount": r[3]} for r in rows]
+
+    def candidate_ids(self, uuids):
+        """uuid -> on-chain candidate id (0 when not added)"""
+        uuids = list(uuids)
+        ids = _raise_first(self.w3.batch.call_many(self.contract, "candidateByUUID", [(u,) for u in uuids]))
+        return dict(zip(uuids, ids))
+
+    def _many(self, voter_ids, batched_view, getter):
+        voter_ids = list(voter_ids)
+        out = []
+        for chunk in self._chunks(voter_ids):
+            if has_function(self.contract, batched_view):
+                out.extend(getattr(self.contract.functions, batched_view)(chunk).call())
+            else:
+                out.extend(_raise_first(self.w3.batch.call_many(self.contract, getter, [(v,) for v in chunk])))
+        return dict(zip(voter_ids, out))
+
+    def has_voted_many(self, voter_ids):
+        """voter_id -> bool"""
+        return self._many(voter_ids, "hasVotedMany", "hasVoted")
+
+    def vote_hashes(self, voter_ids):
+        """voter_id -> vote hash ('' when the voter has not voted)"""
+        return self._many(voter_ids, "getVoteHashes", "getVoteHash")
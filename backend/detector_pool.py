@@ -0,0 +1,131 @@
+"""
+Pool of detector instances checked out per task
+MediaPipe FaceMesh graphs and OpenCV cascade classifiers keep per-call state and must not
+be used by two threads at once. Each inference task takes its own instance from the pool,
+so throughput scales with the inference threads instead of serializing on one global.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class DetectorPool:
+    """
+    Up to `size` instances built lazily by `factory()`. An instance whose task raised is
+    closed and dropped instead of returned, and a fresh one is built on the next checkout.
+    """
+
+    def __init__(self, factory, size: int = None, name: str = "detector"):
+        self.factory = factory
+        self.size = size or os.cpu_count() or 1
+        self.name = name
+        self._idle = []  # Stack: reuse warm instances first
+        self._created = 0
+        self._cond = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_ms = 0.0
+        self.rebuilds = 0
+
+    def _create(self):
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _take(self, timeout):
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    detector = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    detector = None
+                    break
+                waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No {self.name} free after {timeout}s ({self.size} in use)")
+                self._cond.wait(remaining)
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_ms += (time.perf_counter() - start) * 1000
+        return detector if detector is not None else self._create()
+
+    def _release(self, detector):
+        with self._cond:
+            self._idle.append(detector)
+            self._cond.notify()
+
+    def _discard(self, detector, rebuild: bool = True):
+        close = getattr(detector, "close", None)
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
+        with self._cond:
+            self._created -= 1
+            self.rebuilds += int(rebuild)
+            self._cond.notify()  # A waiter may build the replacement
+
+    @contextmanager
+    def acquire(self, timeout: float = None):
+        detector = self._take(timeout)
+        try:
+            yield detector
+        except BaseException:
+            self._discard(detector)
+            raise
+        else:
+            self._release(detector)
+
+    def checkout(self, timeout: float = None):
+        """Take an instance for longer than one task (e.g. a liveness session); give it back with checkin()"""
+        return self._take(timeout)
+
+    def checkin(self, detector, discard: bool = False):
+        if discard:
+            self._discard(detector)
+        else:
+            self._release(detector)
+
+    def prewarm(self, count: int = 1):
+        """Build `count` instances up front (also validates the factory)"""
+        for _ in range(count):
+            with self._cond:
+                if self._created >= self.size: break
+                self._created += 1
+            self._release(self._create())
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for detector in idle:
+            self._discard(detector, rebuild=False)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "mean_wait_ms": round(self.wait_ms / self.waits, 2) if self.waits else 0.0,
+                "rebuilds": self.rebuilds,
+            }
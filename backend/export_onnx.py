@@ -0,0 +1,60 @@
+"""
+Export the phone detector and face embedding models to ONNX for INFERENCE_BACKEND=onnx
+Writes into MODELS_DIR (backend/models by default):
+    yolov8n.onnx            YOLOv8n (fp32; add --quantize-yolo for int8)
+    vgg_face.onnx           VGG-Face embedding (fp32)
+    vgg_face.int8.onnx      VGG-Face with INT8 dynamic quantization (default ONNX_FACE_PATH)
+
+Needs the full stack once: ultralytics, deepface + tf-keras, tf2onnx, onnxruntime.
+Dynamic quantization mainly shrinks VGG-Face's dense layers; YOLO is conv-heavy, so int8
+dynamic quantization gains little there and is opt-in. Check both with compare_backends.py.
+"""
+
+import argparse
+import os
+import shutil
+
+from config.settings import MODELS_DIR
+from onnx_backend import quantize_model
+
+
+def export_yolo(out_dir, quantize=False):
+    from ultralytics import YOLO
+    print("Exporting YOLOv8n...")
+    exported = YOLO("yolov8n.pt").export(format="onnx", imgsz=640, opset=12, simplify=True)
+    dst = os.path.join(out_dir, "yolov8n.onnx")
+    shutil.move(exported, dst)
+    if quantize:
+        q = os.path.join(out_dir, "yolov8n.int8.onnx")
+        quantize_model(dst, q)
+        print(f"✅ {q}")
+    print(f"✅ {dst}")
+
+
+def export_vgg_face(out_dir):
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+    print("Exporting VGG-Face...")
+    model = DeepFace.build_model("VGG-Face")
+    spec = (tf.TensorSpec((None, 224, 224, 3), tf.float32, name="input"),)
+    dst = os.path.join(out_dir, "vgg_face.onnx")
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=dst)
+    print(f"✅ {dst}")
+    q = os.path.join(out_dir, "vgg_face.int8.onnx")
+    quantize_model(dst, q)
+    print(f"✅ {q}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export models to ONNX")
+    parser.add_argument("--out", default=MODELS_DIR)
+    parser.add_argument("--only", choices=["yolo", "face"], default=None)
+    parser.add_argument("--quantize-yolo", action="store_true")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.only in (None, "yolo"):
+        export_yolo(args.out, args.quantize_yolo)
+    if args.only in (None, "face"):
+        export_vgg_face(args.out)
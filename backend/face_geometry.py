@@ -0,0 +1,101 @@
+"""
+Vectorized face geometry on MediaPipe FaceMesh landmarks
+Landmarks are converted once per frame into an (N, 3) float32 array of normalized
+(x, y, z) coordinates; every feature below works on that array with NumPy indexing.
+"""
+
+import numpy as np
+
+# Geometric identity vector: eyes, nose tip, mouth corners, chin
+GEOMETRIC_POINTS = np.array([33, 263, 1, 61, 291, 199, 152])
+_PAIR_I, _PAIR_J = np.triu_indices(len(GEOMETRIC_POINTS), k=1)
+
+# Eye contours in EAR order (p1..p6): left eye, right eye
+EYE_POINTS = np.array([
+    [362, 385, 387, 263, 373, 380],
+    [33, 160, 158, 133, 153, 144],
+])
+
+# Mouth corners, inner lip centre (upper, lower) and cheek edges for the face width
+MOUTH_POINTS = np.array([61, 291, 13, 14, 234, 454])
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """MediaPipe landmark list -> (N, 3) float32 array of normalized x, y, z"""
+    n = len(landmarks)
+    flat = np.fromiter(
+        (v for l in landmarks for v in (l.x, l.y, l.z)),
+        dtype=np.float32,
+        count=n * 3,
+    )
+    return flat.reshape(n, 3)
+
+
+def to_pixels(pts: np.ndarray, w: int, h: int) -> np.ndarray:
+    """(N, 3) normalized landmarks -> (N, 2) pixel coordinates"""
+    return pts[:, :2] * np.array([w, h], dtype=np.float32)
+
+
+def get_geometric_vector(pts: np.ndarray, w: int, h: int):
+    """All pairwise distances between the key points, normalized by eye distance"""
+    p = to_pixels(pts[GEOMETRIC_POINTS], w, h)
+    dist = np.linalg.norm(p[:, None, :] - p[None, :, :], axis=-1)
+    scale = dist[0, 1]
+    if scale == 0: return None
+    return (dist[_PAIR_I, _PAIR_J] / scale).astype(np.float64)
+
+
+def eye_aspect_ratio(pts: np.ndarray, w: int, h: int) -> float:
+    """Mean eye aspect ratio of both eyes (drops sharply during a blink)"""
+    p = to_pixels(pts[EYE_POINTS.ravel()], w, h).reshape(2, 6, 2)
+    v1 = np.linalg.norm(p[:, 1] - p[:, 5], axis=-1)
+    v2 = np.linalg.norm(p[:, 2] - p[:, 4], axis=-1)
+    hor = np.linalg.norm(p[:, 0] - p[:, 3], axis=-1)
+    return float(np.mean((v1 + v2) / (2.0 * hor)))
+
+
+def smile_score(pts: np.ndarray, w: int, h: int) -> float:
+    """
+    Mouth width relative to face width, raised when the corners sit above the lip
+    centre. Around 0.40 for a neutral mouth; a smile widens and lifts the corners.
+    """
+    p = to_pixels(pts[MOUTH_POINTS], w, h)
+    mouth_w = np.linalg.norm(p[0] - p[1])
+    face_w = np.linalg.norm(p[4] - p[5])
+    if face_w == 0 or mouth_w == 0: return 0.0
+    lift = ((p[2, 1] + p[3, 1]) / 2 - (p[0, 1] + p[1, 1]) / 2) / mouth_w
+    return float(mouth_w / face_w + 0.5 * max(0.0, lift))
+
+
+def check_eyebrow(pts: np.ndarray) -> bool:
+    """Eyebrow raise: eyebrow-to-eye gap relative to face height"""
+    y = pts[:, 1]
+    eyebrow_y = (y[65] + y[159]) / 2
+    dist = abs(y[145] - eyebrow_y)
+    face_h = abs(y[152] - y[10])
+    return bool(dist / face_h > 0.05)
+
+
+def check_head_pose(pts: np.ndarray, w: int, h: int) -> bool:
+    """Frontal check: nose-to-eye distances should be similar on both sides"""
+    p = to_pixels(pts[[1, 33, 263]], w, h)
+    dist_l, dist_r = np.linalg.norm(p[1:] - p[0], axis=-1)
+    yaw_ratio = min(dist_l, dist_r) / max(dist_l, dist_r)
+    return bool(yaw_ratio > 0.5)
+
+
+def check_landmark_consistency(pts: np.ndarray) -> bool:
+    """Eyes above the nose, nose above the upper lip"""
+    y = pts[:, 1]
+    return bool(y[33] < y[1] and y[263] < y[1] and y[1] < y[13])
+
+
+def face_box(pts: np.ndarray, w: int, h: int, pad: int = 20):
+    """Bounding box (x, y, w, h) of the landmarks in pixels, padded and clamped"""
+    xs = (pts[:, 0] * w).astype(np.int32)
+    ys = (pts[:, 1] * h).astype(np.int32)
+    x_min = max(0, min(w, int(xs.min())) - pad)
+    y_min = max(0, min(h, int(ys.min())) - pad)
+    x_max = min(w, max(0, int(xs.max())) + pad)
+    y_max = min(h, max(0, int(ys.max())) + pad)
+    return x_min, y_min, x_max - x_min, y_max - y_min
@@ -0,0 +1,127 @@
+"""
+Shared frame preparation for uploaded images
+Decodes a JPEG straight at (close to) the size the checkers need, using libjpeg's DCT
+scaling through cv2.IMREAD_REDUCED_COLOR_{2,4,8}, then exposes the gray, RGB and
+downscaled views of the frame. Each view is computed once on first use and shared by
+every checker that reads it.
+"""
+
+from functools import cached_property
+
+import cv2
+import numpy as np
+
+# SOFn markers carrying the frame size (C4 = DHT, C8 = JPG extension, CC = DAC are not frames)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def jpeg_size(data: bytes):
+    """(width, height) from the JPEG header without decoding, None if not a JPEG"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # No length field
+            i += 2
+            continue
+        length = (data[i + 2] << 8) | data[i + 3]
+        if marker in SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+
+def reduced_decode_flag(width: int, height: int, max_dim: int):
+    """Largest libjpeg scale-down that still leaves the longest side >= max_dim"""
+    longest = max(width, height)
+    for factor, flag in REDUCED_FLAGS:
+        if longest // factor >= max_dim:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_frame(data: bytes, max_dim: int = None):
+    """BGR image with its longest side at most `max_dim` (None: full size)"""
+    flag = cv2.IMREAD_COLOR
+    if max_dim:
+        size = jpeg_size(data)
+        if size:
+            flag = reduced_decode_flag(size[0], size[1], max_dim)
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if img is None or not max_dim:
+        return img
+    return fit_max_dim(img, max_dim)
+
+
+def fit_max_dim(img, max_dim: int):
+    """Downscale (never upscale) so the longest side is at most `max_dim`"""
+    h, w = img.shape[:2]
+    if max(h, w) > max_dim:
+        scale = max_dim / max(h, w)
+        img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return img
+
+
+class PreparedFrame:
+    """A BGR frame plus lazily computed, cached views (no view is computed twice)"""
+
+    def __init__(self, bgr):
+        self.bgr = bgr
+
+    @classmethod
+    def decode(cls, data: bytes, max_dim: int = None):
+        img = decode_frame(data, max_dim)
+        return cls(img) if img is not None else None
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @cached_property
+    def gray(self):
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+
+    @cached_property
+    def rgb(self):
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+
+    @cached_property
+    def small(self):
+        """Half-size BGR (dlib encodings)"""
+        return cv2.resize(self.bgr, (0, 0), fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+
+    @cached_property
+    def small_rgb(self):
+        return cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB)
+
+    def crop(self, x: int, y: int, w: int, h: int):
+        """Frame over a window of this one; the BGR pixels are a view, not a copy"""
+        return PreparedFrame(self.bgr[y:y + h, x:x + w])
+
+
+def frame_thumbnail(gray, box=None, size: int = 32):
+    """Tiny float32 gray thumbnail of the frame (or of the (x, y, w, h) box) for change checks"""
+    if box is not None:
+        x, y, w, h = box
+        gray = gray[y:y + h, x:x + w]
+    if gray.size == 0:
+        return None
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def frame_difference(a, b) -> float:
+    """Mean absolute gray-level difference (0-255) between two thumbnails"""
+    return float(np.mean(np.abs(a - b)))
+
+
+def as_prepared(img):
+    return img if isinstance(img, PreparedFrame) else PreparedFrame(img)
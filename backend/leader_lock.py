@@ -0,0 +1,29 @@
+"""
+Pick one process to run the singleton background workers
+With serve.py, or any launcher that runs several workers, every worker runs startup_event.
+The chain indexer, photo job worker, vote forwarder and election scheduler must run only
+once. The first worker to take an exclusive flock on the lock file runs them. The kernel
+releases the lock when that process exits, and a respawned worker can then take it over.
+"""
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, single-process deployments only
+    fcntl = None
+
+_held = None
+
+
+def acquire(path: str) -> bool:
+    """True if this process holds (or just took) the background-worker lock"""
+    global _held
+    if _held is not None or fcntl is None:
+        return True
+    f = open(path, "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _held = f
+    return True
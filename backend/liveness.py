@@ -0,0 +1,197 @@
+"""
+Per-session liveness tracking for /api/process-frame
+Keeps the last face ROI and landmarks of each camera session so FaceMesh can run in
+tracking mode on a crop, staggers the expensive detectors (YOLO, DeepFace smile) and
+accumulates challenge evidence across frames until every challenge has passed.
+"""
+
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+from frame_prep import frame_difference
+from session_store import TTLStore
+
+# Challenges a voter has to pass at least once during the session
+CHALLENGES = ("blink_detected", "smile_detected", "eyebrow_movement", "head_pose_good")
+
+# ROI handling: the crop is the last face box grown by ROI_GROW on each side, and is only
+# re-centred once the face gets closer than ROI_MARGIN to its edge. Keeping the crop
+# stable between frames is what lets MediaPipe's tracker reuse the previous landmarks.
+ROI_GROW = 0.5
+ROI_MARGIN = 0.1
+
+
+class LivenessSession:
+    """Rolling state of one camera session"""
+
+    def __init__(self, token: str, face_mesh=None, release_face_mesh=None):
+        self.token = token
+        self.face_mesh = face_mesh  # Tracking (video) mode FaceMesh checked out for this session
+        self.release_face_mesh = release_face_mesh  # Gives it back to its pool
+        self.lock = threading.Lock()  # Held while a frame of this session is processed
+        self.closed = False
+        self.created = time.time()
+        self.frame_count = 0
+        self.roi = None  # (x, y, w, h) crop window in frame pixels
+        self.landmarks = None  # (N, 3) frame-normalized landmarks of the last face
+        self.evidence = {c: False for c in CHALLENGES}
+        self.phone_detected = False
+        self.last_yolo_frame = None
+        self.last_smile_frame = None
+        self.smile_baseline = None  # Lowest landmark smile score seen (neutral mouth)
+        self.emotion_runs = 0
+        self.completed = False
+        self.last_result = None
+        self.thumb = None  # Thumbnail of the last analyzed frame (frame-change gating)
+        self.skips_in_row = 0
+        self.frames_skipped = 0
+
+    def due(self, last_frame, every: int) -> bool:
+        """True when a detector last run at `last_frame` should run again"""
+        return last_frame is None or self.frame_count - last_frame >= every
+
+    def observe_smile(self, score: float):
+        if self.smile_baseline is None or score < self.smile_baseline:
+            self.smile_baseline = score
+
+    def unchanged(self, thumb, threshold: float, max_skips: int) -> bool:
+        """True if `thumb` is within `threshold` of the last analyzed frame"""
+        if thumb is None or self.thumb is None or self.last_result is None:
+            return False
+        if self.skips_in_row >= max_skips or thumb.shape != self.thumb.shape:
+            return False
+        return frame_difference(thumb, self.thumb) < threshold
+
+    def skip(self) -> dict:
+        """Result for an unchanged frame: the last one, without running any model"""
+        self.skips_in_row += 1
+        self.frames_skipped += 1
+        return dict(self.last_result, frame_skipped=True, frames_skipped=self.frames_skipped)
+
+    def update_roi(self, box, frame_shape):
+        """Re-centre the crop window if the face box (x, y, w, h) is near its edge"""
+        fh, fw = frame_shape[:2]
+        x, y, w, h = box
+        if self.roi is not None:
+            rx, ry, rw, rh = self.roi
+            mx, my = rw * ROI_MARGIN, rh * ROI_MARGIN
+            if x >= rx + mx and y >= ry + my and x + w <= rx + rw - mx and y + h <= ry + rh - my:
+                return
+        gx, gy = int(w * ROI_GROW), int(h * ROI_GROW)
+        x0, y0 = max(0, x - gx), max(0, y - gy)
+        x1, y1 = min(fw, x + w + gx), min(fh, y + h + gy)
+        self.roi = (x0, y0, x1 - x0, y1 - y0)
+
+    def lose_face(self):
+        """Fall back to a full-frame search on the next frame"""
+        self.roi = None
+        self.landmarks = None
+
+    def record(self, results: dict):
+        """Merge the per-frame flags into the session evidence"""
+        for c in CHALLENGES:
+            if results.get(c):
+                self.evidence[c] = True
+        self.completed = all(self.evidence.values()) and not self.phone_detected
+        results["challenges"] = dict(self.evidence)
+        results["liveness_complete"] = self.completed
+        results["frames_processed"] = self.frame_count
+        results["emotion_model_runs"] = self.emotion_runs
+        results["frames_skipped"] = self.frames_skipped
+        self.skips_in_row = 0
+        self.last_result = results
+        return results
+
+    @contextmanager
+    def frame(self):
+        """Hold the session for one frame; a close() requested meanwhile completes on exit"""
+        with self.lock:
+            try:
+                yield self
+            finally:
+                if self.closed:
+                    self._release()
+
+    def close(self):
+        """Release the FaceMesh now, or when the frame being processed finishes"""
+        self.closed = True  # Set before trying the lock, so a running frame sees it on exit
+        if self.lock.acquire(blocking=False):
+            try:
+                self._release()
+            finally:
+                self.lock.release()
+
+    def _release(self):
+        mesh, self.face_mesh = self.face_mesh, None
+        if mesh is None:
+            return
+        try:
+            if self.release_face_mesh:
+                self.release_face_mesh(mesh)
+            else:
+                mesh.close()
+        except Exception:
+            pass
+
+
+class SignalStats:
+    """Process-wide counters of how often the cheap signals needed the expensive model"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {
+            "face_frames": 0, "smile_candidates": 0, "emotion_runs": 0, "emotion_confirmed": 0,
+            "session_frames": 0, "frames_skipped": 0,
+        }
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def report(self) -> dict:
+        with self._lock:
+            c = dict(self.counts)
+        frames = c["face_frames"]
+        c["emotion_fraction"] = round(c["emotion_runs"] / frames, 4) if frames else None
+        c["confirm_rate"] = round(c["emotion_confirmed"] / c["emotion_runs"], 4) if c["emotion_runs"] else None
+        c["skip_ratio"] = round(c["frames_skipped"] / c["session_frames"], 4) if c["session_frames"] else None
+        return c
+
+
+class LivenessTracker:
+    """
+    Session token -> LivenessSession, expiring idle sessions.
+    Tracking FaceMeshes come from a bounded DetectorPool (`face_mesh_pool()` returns it once
+    MediaPipe has loaded), so memory grows with the pool size, not with LIVENESS_MAX_SESSIONS.
+    When every tracker is taken, a session runs on the shared static-image pool per frame.
+    """
+
+    def __init__(self, maxsize: int = 200, ttl: float = 120, face_mesh_pool=None):
+        self.face_mesh_pool = face_mesh_pool
+        self.sessions = TTLStore(maxsize=maxsize, ttl=ttl, on_evict=lambda _, s: s.close())
+        self.untracked = 0  # Sessions started without a tracking FaceMesh (pool exhausted)
+
+    def start(self) -> LivenessSession:
+        token = secrets.token_urlsafe(16)
+        face_mesh, release = None, None
+        pool = self.face_mesh_pool() if self.face_mesh_pool else None
+        if pool is not None:
+            try:
+                face_mesh, release = pool.checkout(timeout=0), pool.checkin
+            except Exception as e:
+                self.untracked += 1
+                print(f"Liveness session without tracking FaceMesh: {e}")
+        session = LivenessSession(token, face_mesh, release)
+        self.sessions.set(token, session)
+        return session
+
+    def get(self, token: str):
+        return self.sessions.get(token)
+
+    def end(self, token: str):
+        self.sessions.pop(token)
+
+    def __len__(self):
+        return len(self.sessions)
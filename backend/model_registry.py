@@ -0,0 +1,133 @@
+"""
+Background model loading
+Models are registered with a loader function and loaded in parallel on a thread pool,
+so importing the app (and serving vote / DB endpoints) never waits on ML weights.
+Endpoints that need a model await it explicitly; /ready reports per-model status.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelNotReady(Exception):
+    """Raised when a model is still loading after the caller's timeout"""
+
+
+class _Entry:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.status = PENDING
+        self.value = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.future = None
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def register(self, name: str, loader):
+        """`loader()` returns the model object; exceptions mark the model as failed"""
+        self._entries[name] = _Entry(name, loader)
+
+    def _load(self, entry):
+        entry.started = time.time()
+        entry.status = LOADING
+        try:
+            entry.value = entry.loader()
+            entry.status = READY
+            print(f"✅ [Models] {entry.name} ready ({time.time() - entry.started:.1f}s)")
+        except Exception as e:
+            entry.error = str(e)
+            entry.status = FAILED
+            print(f"⚠️  [Models] {entry.name} failed: {e}")
+        finally:
+            entry.finished = time.time()
+        return entry.value
+
+    def start(self, names=None):
+        """Submit every model (or just `names`) that is not loaded yet; returns immediately"""
+        with self._lock:
+            pending = [
+                e for e in self._entries.values()
+                if e.future is None and e.status == PENDING and (names is None or e.name in names)
+            ]
+            if not pending:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, len(self._entries)), thread_name_prefix="model-loader"
+                )
+            for entry in pending:
+                entry.future = self._executor.submit(self._load, entry)
+
+    def load_all(self, names=None, timeout: float = None) -> dict:
+        """Blocking variant of start(): load everything (or `names`) and return status()"""
+        self.start(names)
+        wait_futures([e.future for e in self._entries.values() if e.future], timeout=timeout)
+        return self.status()
+
+    def shutdown(self):
+        """Stop the loader threads (required before os.fork())"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def names(self):
+        return list(self._entries)
+
+    def get(self, name: str):
+        """Loaded model or None (never blocks)"""
+        entry = self._entries.get(name)
+        return entry.value if entry and entry.status == READY else None
+
+    def is_settled(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is None or entry.status in (READY, FAILED)
+
+    async def wait(self, *names, timeout: float = 60):
+        """
+        Wait until the named models have finished loading (ready or failed).
+        Failed models are not an error here: callers keep their existing fallbacks.
+        """
+        self.start()
+        futures = [
+            asyncio.wrap_future(self._entries[n].future)
+            for n in names
+            if n in self._entries and not self.is_settled(n)
+        ]
+        if not futures:
+            return
+        done, pending = await asyncio.wait(futures, timeout=timeout)
+        if pending:
+            loading = [n for n in names if not self.is_settled(n)]
+            raise ModelNotReady(f"Models still loading: {', '.join(loading)}")
+
+    def status(self) -> dict:
+        now = time.time()
+        report = {}
+        for name, e in self._entries.items():
+            item = {"status": e.status}
+            if e.started:
+                item["seconds"] = round((e.finished or now) - e.started, 2)
+            if e.error:
+                item["error"] = e.error
+            report[name] = item
+        return report
+
+    @property
+    def ready(self) -> bool:
+        return all(e.status in (READY, FAILED) for e in self._entries.values())
@@ -38,6 +38,7 @@ class VoteCast(BaseModel):
     userId: str = Field(..., min_length=5, max_length=20)
     partyName: str = Field(..., min_length=1, max_length=100)
     boothId: str = Field(default="BOOTH_001", max_length=50)
+    biometricToken: Optional[str] = None  # From /api/biometric-verification
 
 class PartyCreate(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
@@ -65,3 +66,15 @@ class SettingsUpdate(BaseModel):
     pass2: Optional[str] = None
     pass3: Optional[str] = None
     pass4: Optional[str] = None
+
+class PhotoPrefetch(BaseModel):
+    location: Optional[str] = None  # Booth location from voter_locations.json
+    voterIds: Optional[list] = None
+
+class RollImport(BaseModel):
+    file: str = "voter_list_final.csv"  # Name of a CSV in the repo's csv/ folder
+    resume: bool = False
+    rounds: Optional[int] = Field(None, ge=4, le=16)  # bcrypt cost (default: the calibrated BCRYPT_ROUNDS)
+
+class VoterIdBatch(BaseModel):
+    voterIds: list = Field(..., min_length=1, max_length=10000)
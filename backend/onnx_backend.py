@@ -0,0 +1,116 @@
+"""
+ONNX Runtime CPU inference backend
+Runs the YOLOv8n phone detector and the VGG-Face embedding model from exported ONNX
+graphs (see export_onnx.py) instead of the ultralytics / TensorFlow stacks.
+Selected with INFERENCE_BACKEND=onnx; onnxruntime is an optional dependency.
+"""
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+PHONE_CLASS_ID = 67  # COCO "cell phone"
+
+
+def create_session(path: str, threads: int = 0):
+    if ort is None:
+        raise RuntimeError("onnxruntime not installed. Install: pip install onnxruntime")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"ONNX model not found: {path} (run export_onnx.py)")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def letterbox(img, size: int, pad_value: int = 114):
+    """Resize keeping aspect ratio and pad to a size x size square"""
+    h, w = img.shape[:2]
+    scale = size / max(h, w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    resized = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    out = np.full((size, size, 3), pad_value, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    out[top:top + nh, left:left + nw] = resized
+    return out
+
+
+class OnnxPhoneDetector:
+    """YOLOv8 exported with `format="onnx"`: output (1, 4 + classes, anchors)"""
+
+    def __init__(self, path: str, threads: int = 0, conf: float = 0.5):
+        self.session = create_session(path, threads)
+        self.input_name = self.session.get_inputs()[0].name
+        shape = self.session.get_inputs()[0].shape
+        self.size = shape[2] if isinstance(shape[2], int) else 640
+        self.conf = conf
+
+    def class_scores(self, frame, class_id: int = PHONE_CLASS_ID):
+        img = letterbox(frame, self.size)
+        blob = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+        out = self.session.run(None, {self.input_name: blob})[0]
+        return out[0, 4 + class_id]
+
+    def detect_phone(self, frame) -> bool:
+        # Any anchor above the confidence threshold; no NMS needed for a yes/no answer
+        return bool(self.class_scores(frame).max() > self.conf)
+
+
+class OnnxFaceEmbedder:
+    """
+    VGG-Face embedding, preprocessed like DeepFace: largest Haar face (full image if
+    none), aspect-preserving resize with black padding to 224x224, BGR scaled to [0, 1].
+    A CascadeClassifier must not be shared between threads, so each inference thread
+    builds its own on first use.
+    """
+
+    def __init__(self, path: str, threads: int = 0):
+        self.session = create_session(path, threads)
+        self.input_name = self.session.get_inputs()[0].name
+        shape = self.session.get_inputs()[0].shape
+        # Keras export is NHWC (1, 224, 224, 3)
+        self.size = shape[1] if isinstance(shape[1], int) else 224
+        self._local = threading.local()
+
+    @property
+    def face_cascade(self):
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = self._local.cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+        return cascade
+
+    def crop_face(self, img):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        if len(faces) > 0:
+            x, y, w, h = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)[0]
+            return img[y:y + h, x:x + w]
+        return img
+
+    def embed(self, img) -> np.ndarray:
+        face = letterbox(self.crop_face(img), self.size, pad_value=0)
+        blob = face[None].astype(np.float32) / 255.0
+        return self.session.run(None, {self.input_name: blob})[0][0]
+
+
+def cosine_distance(a, b) -> float:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return float(1.0 - np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def quantize_model(src: str, dst: str):
+    """INT8 dynamic quantization (weights int8, activations quantized at runtime)"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    return dst
@@ -0,0 +1,110 @@
+"""
+Bounded password hashing pool
+bcrypt (cost 12 is ~250 ms of CPU) runs on a small thread pool instead of the event loop;
+pyca/bcrypt releases the GIL while hashing, so threads scale across cores. Requests beyond
+`max_queue` waiting hashes are refused (PasswordQueueFull -> 503) instead of piling up.
+The cost factor can be calibrated at startup to a target latency on this machine.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from security import hash_password, verify_password
+
+MIN_ROUNDS = 10  # Never calibrate below this, whatever the hardware
+
+
+class PasswordQueueFull(RuntimeError):
+    pass
+
+
+def measure_rounds(rounds: int, samples: int = 3) -> float:
+    """Best-of-n milliseconds for one bcrypt hash at `rounds`"""
+    best = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        ms = (time.perf_counter() - start) * 1000
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = MIN_ROUNDS, max_rounds: int = 15):
+    """
+    Highest cost whose hash time stays within `target_ms` (each round doubles the work).
+    Returns (rounds, measured ms at that cost).
+    """
+    base = min_rounds
+    base_ms = measure_rounds(base)
+    rounds = base
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - base) <= target_ms:
+        rounds += 1
+    return rounds, base_ms * 2 ** (rounds - base)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int = 64, rounds: int = 12, window: int = 500):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.counts = {"hashed": 0, "verified": 0, "rejected": 0}
+        self.wait_ms = deque(maxlen=window)  # Time queued before a worker picked the job
+        self.run_ms = deque(maxlen=window)
+
+    def _timed(self, fn, submitted, *args):
+        started = time.perf_counter()
+        self.wait_ms.append((started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            self.run_ms.append((time.perf_counter() - started) * 1000)
+
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.counts["rejected"] += 1
+            raise PasswordQueueFull(f"{self.in_flight} password operations pending")
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._timed, fn, time.perf_counter(), *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._submit(hash_password, password, self.rounds)
+        self.counts["hashed"] += 1
+        return hashed
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        ok = await self._submit(verify_password, plain_password, hashed_password)
+        self.counts["verified"] += 1
+        return ok
+
+    def calibrate(self, target_ms: float, min_rounds: int = MIN_ROUNDS, max_rounds: int = 15):
+        self.rounds, ms = calibrate_rounds(target_ms, min_rounds, max(max_rounds, min_rounds))
+        print(f"✅ bcrypt cost calibrated: {self.rounds} rounds (~{ms:.0f} ms per hash, target {target_ms:.0f} ms)")
+        return self.rounds
+
+    @staticmethod
+    def _summary(samples):
+        if not samples: return {"mean": 0.0, "p95": 0.0}
+        s = sorted(samples)
+        return {"mean": round(sum(s) / len(s), 1), "p95": round(s[min(len(s) - 1, int(0.95 * len(s)))], 1)}
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            **self.counts,
+            "queue_wait_ms": self._summary(list(self.wait_ms)),
+            "hash_ms": self._summary(list(self.run_ms)),
+        }
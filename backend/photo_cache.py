@@ -0,0 +1,218 @@
+"""
+Two-tier cache for voters' reference photos
+RAM tier: decoded BGR images pre-resized to the verification size, LRU under a byte budget.
+Disk tier: the same pre-resized images as compressed JPEG under PHOTO_CACHE_DIR, surviving
+restarts. A prefetcher warms both tiers for the voters of a booth before polls open, so
+verification on a hit never downloads `users.photo_base64`.
+
+Workers forked by serve.py each have their own RAM tier but share the disk tier. A RAM entry
+remembers the disk file it matches (inode, mtime) and is dropped once that file is replaced
+or removed, so invalidate() or a new photo written by one worker reaches every worker.
+Without a disk tier there is nothing shared to check against; serve.py then sets
+max_bytes = 0 and every lookup misses.
+"""
+
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+from frame_prep import decode_frame, fit_max_dim
+
+
+def decode_photo_base64(photo_b64: str):
+    """Data-URL or bare base64 -> encoded image bytes"""
+    if "," in photo_b64:
+        photo_b64 = photo_b64.split(",")[1]
+    return base64.b64decode(photo_b64)
+
+
+class ReferencePhotoCache:
+    def __init__(self, max_bytes: int, disk_dir: str = None, max_dim: int = 480, jpeg_quality: int = 92):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_dim = max_dim
+        self.jpeg_quality = jpeg_quality
+        self._ram = OrderedDict()  # voter_id -> (pre-resized BGR ndarray, disk signature)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits_ram = 0
+        self.hits_disk = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- RAM tier ---
+    def _put_ram(self, voter_id, img, signature):
+        with self._lock:
+            self._drop_ram(voter_id)
+            if self.max_bytes <= 0:
+                return
+            self._ram[voter_id] = (img, signature)
+            self._bytes += img.nbytes
+            while self._bytes > self.max_bytes and len(self._ram) > 1:
+                _, (evicted, _) = self._ram.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _drop_ram(self, voter_id):
+        """Callers hold self._lock"""
+        old = self._ram.pop(voter_id, None)
+        if old is not None:
+            self._bytes -= old[0].nbytes
+
+    def _ram_entry(self, voter_id):
+        """RAM image if it still matches the disk tier (callers hold self._lock)"""
+        entry = self._ram.get(voter_id)
+        if entry is None:
+            return None
+        img, signature = entry
+        if self.disk_dir and self._disk_signature(voter_id) != signature:
+            self._drop_ram(voter_id)  # Replaced or invalidated by another worker
+            return None
+        return img
+
+    # --- Disk tier ---
+    def _disk_path(self, voter_id):
+        name = hashlib.sha256(voter_id.encode()).hexdigest()[:32]
+        return os.path.join(self.disk_dir, f"{name}.jpg")
+
+    def _disk_signature(self, voter_id):
+        """(inode, mtime) of the disk entry, None if there is none; os.replace changes both"""
+        if not self.disk_dir: return None
+        try:
+            st = os.stat(self._disk_path(voter_id))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _write_disk(self, voter_id, img) -> bool:
+        if not self.disk_dir: return False
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok: return False
+        path = self._disk_path(voter_id)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.tobytes())
+        os.replace(tmp, path)
+        return True
+
+    def _read_disk(self, voter_id):
+        """(image, signature), or (None, None) on a miss"""
+        signature = self._disk_signature(voter_id)
+        if signature is None: return None, None
+        return cv2.imread(self._disk_path(voter_id), cv2.IMREAD_COLOR), signature
+
+    # --- Public API ---
+    def get(self, voter_id):
+        """Pre-resized BGR reference image, or None on a miss in both tiers"""
+        with self._lock:
+            img = self._ram_entry(voter_id)
+            if img is not None:
+                self._ram.move_to_end(voter_id)
+                self.hits_ram += 1
+                return img
+        img, signature = self._read_disk(voter_id)
+        if img is None:
+            self.misses += 1
+            return None
+        self.hits_disk += 1
+        self._put_ram(voter_id, img, signature)
+        return img
+
+    def put_encoded(self, voter_id, photo_bytes: bytes):
+        """Decode an uploaded/stored photo once, keep the pre-resized image in both tiers"""
+        img = decode_frame(photo_bytes, self.max_dim)  # Reduced-resolution JPEG decode
+        if img is None:
+            return None
+        return self.put_image(voter_id, img)
+
+    def put_image(self, voter_id, img):
+        img = fit_max_dim(img, self.max_dim)
+        try:
+            written = self._write_disk(voter_id, img)
+        except OSError as e:
+            print(f"Photo cache disk write failed: {e}")
+            written = False
+        if not written:
+            self._remove_disk(voter_id)  # An older photo on disk must not outlive this one
+        self._put_ram(voter_id, img, self._disk_signature(voter_id))
+        return img
+
+    def promote(self, voter_id) -> bool:
+        """Make sure the entry is in RAM (loading it from disk); not counted as a lookup"""
+        with self._lock:
+            if self._ram_entry(voter_id) is not None: return True
+        img, signature = self._read_disk(voter_id)
+        if img is None: return False
+        self._put_ram(voter_id, img, signature)
+        return True
+
+    def contains(self, voter_id) -> bool:
+        with self._lock:
+            if self._ram_entry(voter_id) is not None: return True
+        return self._disk_signature(voter_id) is not None
+
+    def _remove_disk(self, voter_id):
+        if not self.disk_dir: return
+        try:
+            os.remove(self._disk_path(voter_id))
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, voter_id):
+        """Drop the entry here; other workers drop theirs when they find the disk file gone"""
+        with self._lock:
+            self._drop_ram(voter_id)
+        self._remove_disk(voter_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits_ram + self.hits_disk + self.misses
+            return {
+                "entries": len(self._ram),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits_ram": self.hits_ram,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round((self.hits_ram + self.hits_disk) / lookups, 3) if lookups else None,
+            }
+
+
+def prefetch(cache: ReferencePhotoCache, voter_ids, fetch_photos, batch_size: int = 50, progress=None):
+    """
+    Warm both tiers for `voter_ids`. Disk entries are promoted to RAM; missing ones are
+    downloaded with `fetch_photos(batch) -> [{"voter_id", "photo_base64"}]` in batches.
+    """
+    to_fetch = []
+    warmed = 0
+    for vid in voter_ids:
+        if cache.promote(vid):
+            warmed += 1
+        else:
+            to_fetch.append(vid)
+
+    fetched = failed = 0
+    for i in range(0, len(to_fetch), batch_size):
+        batch = to_fetch[i:i + batch_size]
+        try:
+            rows = fetch_photos(batch)
+        except Exception as e:
+            print(f"Prefetch batch failed: {e}")
+            failed += len(batch)
+            continue
+        for row in rows:
+            photo = row.get("photo_base64")
+            if not photo: continue
+            try:
+                if cache.put_encoded(row["voter_id"], decode_photo_base64(photo)) is not None:
+                    fetched += 1
+            except Exception:
+                failed += 1
+        if progress:
+            progress(min(i + batch_size, len(to_fetch)), len(to_fetch))
+
+    return {"requested": len(voter_ids), "already_cached": warmed, "fetched": fetched, "failed": failed}
@@ -0,0 +1,122 @@
+"""
+Perceptual hashes of registration photos and a multi-index Hamming lookup
+dHash (64-bit gradient signature of a 9x8 gray thumbnail) survives re-encoding, resizing and
+small exposure changes, unlike the SHA-256 of the base64 string. The index splits every hash
+into `chunks` substrings with one table each: by pigeonhole, a hash within `radius` bits of the
+query matches it in at least one chunk within `radius // chunks` bits, so only the buckets of
+those few chunk variants are probed instead of scanning every registered photo.
+"""
+
+import threading
+from collections import defaultdict
+from itertools import combinations
+
+import cv2
+
+from frame_prep import decode_frame
+
+HASH_BITS = 64
+
+
+def dhash(img, size: int = 8) -> int:
+    """64-bit difference hash of a BGR or gray image (bit set where a pixel is brighter than its right neighbour)"""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(img, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    code = 0
+    for bit in bits:
+        code = (code << 1) | int(bit)
+    return code
+
+
+def dhash_bytes(data: bytes):
+    """dHash of an encoded image (decoded at thumbnail scale), None if it does not decode"""
+    img = decode_frame(data, 64)
+    return dhash(img) if img is not None else None
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_hex(code: int) -> str:
+    return f"{code:016x}"
+
+
+def from_hex(text: str) -> int:
+    return int(text, 16)
+
+
+class HammingIndex:
+    def __init__(self, bits: int = HASH_BITS, chunks: int = 4):
+        if bits % chunks:
+            raise ValueError(f"{bits} bits do not split into {chunks} chunks")
+        self.chunks = chunks
+        self.chunk_bits = bits // chunks
+        self._mask = (1 << self.chunk_bits) - 1
+        self._tables = [defaultdict(set) for _ in range(chunks)]
+        self._codes = {}  # key -> code
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.candidates = 0
+
+    def _split(self, code):
+        return [(code >> (i * self.chunk_bits)) & self._mask for i in range(self.chunks)]
+
+    def _variants(self, chunk, distance):
+        """Every chunk value within `distance` flipped bits of `chunk`"""
+        yield chunk
+        for d in range(1, distance + 1):
+            for positions in combinations(range(self.chunk_bits), d):
+                v = chunk
+                for p in positions:
+                    v ^= 1 << p
+                yield v
+
+    def _remove_locked(self, key):
+        code = self._codes.pop(key, None)
+        if code is None: return
+        for table, part in zip(self._tables, self._split(code)):
+            bucket = table[part]
+            bucket.discard(key)
+            if not bucket:
+                del table[part]
+
+    def add(self, key, code: int):
+        with self._lock:
+            self._remove_locked(key)
+            self._codes[key] = code
+            for table, part in zip(self._tables, self._split(code)):
+                table[part].add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def search(self, code: int, radius: int):
+        """[(key, distance)] of every stored hash within `radius` bits, closest first"""
+        per_chunk = radius // self.chunks
+        with self._lock:
+            found = set()
+            for table, part in zip(self._tables, self._split(code)):
+                for v in self._variants(part, per_chunk):
+                    bucket = table.get(v)
+                    if bucket:
+                        found |= bucket
+            self.searches += 1
+            self.candidates += len(found)
+            matches = [(key, hamming(code, self._codes[key])) for key in found]
+        return sorted((m for m in matches if m[1] <= radius), key=lambda m: m[1])
+
+    def __len__(self):
+        return len(self._codes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._codes),
+                "chunks": self.chunks,
+                "searches": self.searches,
+                "mean_candidates": round(self.candidates / self.searches, 2) if self.searches else 0.0,
+            }
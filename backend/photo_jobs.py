@@ -0,0 +1,215 @@
+"""
+Persistent queue for registration-time photo processing
+register_voter only enqueues the uploaded photo (one SQLite insert); a background worker
+claims jobs in batches, derives the biometric artefacts (normalized reference image,
+embedding, perceptual hash) and stores them with the job's completion in one transaction.
+Failed jobs are retried with exponential backoff; jobs left running by a crash are
+re-queued on startup. The raw photo is dropped from the queue once its job is done.
+"""
+
+import threading
+import time
+
+from sqlite_store import SQLiteStore
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    voter_id TEXT NOT NULL,
+    payload BLOB,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs(status, run_after);
+CREATE TABLE IF NOT EXISTS artefacts (
+    voter_id TEXT PRIMARY KEY,
+    embedding BLOB,
+    embedding_kind TEXT,
+    phash TEXT,
+    face_found INTEGER,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class PhotoJobQueue(SQLiteStore):
+    def __init__(self, path: str, max_attempts: int = 5, retry_delay: float = 10):
+        super().__init__(path, SCHEMA, isolation_level=None)  # Transactions are explicit (_tx)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def _tx(self, statements):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._db)
+                self._db.execute("COMMIT")
+                return result
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, voter_id: str, payload: bytes) -> int:
+        """Queue a photo; a still-pending job for the same voter is superseded"""
+        now = time.time()
+        def run(db):
+            db.execute("DELETE FROM jobs WHERE voter_id = ? AND status = ?", (voter_id, PENDING))
+            cur = db.execute(
+                "INSERT INTO jobs (voter_id, payload, run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (voter_id, payload, now, now, now))
+            return cur.lastrowid
+        return self._tx(run)
+
+    def recover(self) -> int:
+        """Re-queue jobs a crashed worker left running"""
+        def run(db):
+            return db.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                              (PENDING, time.time(), RUNNING)).rowcount
+        return self._tx(run)
+
+    def claim(self, limit: int):
+        """Mark up to `limit` due jobs running and return them (oldest first)"""
+        now = time.time()
+        def run(db):
+            rows = db.execute(
+                "SELECT id, voter_id, payload, attempts FROM jobs WHERE status = ? AND run_after <= ? ORDER BY id LIMIT ?",
+                (PENDING, now, limit)).fetchall()
+            if rows:
+                db.executemany("UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                               [(RUNNING, now, r["id"]) for r in rows])
+            return [dict(r, attempts=r["attempts"] + 1) for r in rows]
+        return self._tx(run)
+
+    def complete(self, job, artefact: dict):
+        now = time.time()
+        def run(db):
+            db.execute(
+                "INSERT OR REPLACE INTO artefacts (voter_id, embedding, embedding_kind, phash, face_found, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job["voter_id"], artefact.get("embedding"), artefact.get("embedding_kind"),
+                 artefact.get("phash"), int(bool(artefact.get("face_found"))), now))
+            db.execute("UPDATE jobs SET status = ?, payload = NULL, last_error = NULL, updated_at = ? WHERE id = ?",
+                       (DONE, now, job["id"]))
+        self._tx(run)
+
+    def fail(self, job, error: str):
+        """Back off and retry, or give up after max_attempts (payload kept for retry_failed)"""
+        now = time.time()
+        give_up = job["attempts"] >= self.max_attempts
+        run_after = now + self.retry_delay * 2 ** (job["attempts"] - 1)
+        def run(db):
+            db.execute("UPDATE jobs SET status = ?, last_error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                       (FAILED if give_up else PENDING, error[:500], run_after, now, job["id"]))
+        self._tx(run)
+        return not give_up
+
+    def retry_failed(self) -> int:
+        def run(db):
+            return db.execute("UPDATE jobs SET status = ?, attempts = 0, run_after = ?, updated_at = ? WHERE status = ?",
+                              (PENDING, time.time(), time.time(), FAILED)).rowcount
+        return self._tx(run)
+
+    def artefact(self, voter_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM artefacts WHERE voter_id = ?", (voter_id,)).fetchone()
+        return dict(row) if row else None
+
+    def progress(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self._db.execute("SELECT MIN(created_at) FROM jobs WHERE status IN (?, ?)",
+                                      (PENDING, RUNNING)).fetchone()[0]
+            errors = self._db.execute(
+                "SELECT voter_id, attempts, last_error FROM jobs WHERE last_error IS NOT NULL ORDER BY updated_at DESC LIMIT 5"
+            ).fetchall()
+            artefacts = self._db.execute("SELECT COUNT(*) FROM artefacts").fetchone()[0]
+        total = sum(counts.values())
+        return {
+            **{s: counts.get(s, 0) for s in (PENDING, RUNNING, DONE, FAILED)},
+            "total": total,
+            "percent_done": round(100 * counts.get(DONE, 0) / total, 1) if total else 100.0,
+            "oldest_waiting_s": round(time.time() - oldest, 1) if oldest else 0,
+            "artefacts": artefacts,
+            "recent_errors": [dict(e) for e in errors],
+        }
+
+
+class PhotoJobWorker:
+    """
+    Background thread draining the queue in batches with `process(job) -> artefact dict`.
+    Waits while `ready()` is false (models still loading).
+    """
+
+    def __init__(self, queue: PhotoJobQueue, process, batch_size: int = 16, poll_interval: float = 2.0, ready=None):
+        self.queue = queue
+        self.process = process
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.ready = ready or (lambda: True)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.batches = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.busy_s = 0.0
+
+    def start(self):
+        if self._thread is None:
+            recovered = self.queue.recover()
+            if recovered:
+                print(f"Photo jobs: re-queued {recovered} interrupted jobs")
+            self._thread = threading.Thread(target=self._run, name="photo-jobs", daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """New work was queued; skip the rest of the poll interval"""
+        self._wake.set()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            jobs = self.queue.claim(self.batch_size) if self.ready() else []
+            if not jobs:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self.run_batch(jobs)
+
+    def run_batch(self, jobs):
+        start = time.perf_counter()
+        for job in jobs:
+            try:
+                artefact = self.process(job)
+                self.queue.complete(job, artefact)
+                self.processed += 1
+            except Exception as e:
+                if self.queue.fail(job, f"{type(e).__name__}: {e}"):
+                    self.retried += 1
+                else:
+                    self.failed += 1
+                    print(f"Photo job for {job['voter_id']} failed permanently: {e}")
+        self.batches += 1
+        self.busy_s += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "batches": self.batches,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "mean_ms_per_job": round(1000 * self.busy_s / self.processed, 1) if self.processed else 0.0,
+        }
@@ -0,0 +1,147 @@
+"""
+Shared transaction receipt watcher
+One background thread watches the chain head and, once per new block, fetches the receipts
+of every pending transaction in a single JSON-RPC batch, resolving the future each waiter
+holds. N concurrent votes cost one eth_blockNumber per poll plus one batch per block, instead
+of N independent wait_for_transaction_receipt polling loops.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from web3 import Web3
+
+from chain_rpc import RpcError
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+def parse_receipt(raw: dict) -> dict:
+    """Raw JSON receipt with the numeric fields callers compare as ints"""
+    receipt = dict(raw)
+    for key in ("status", "blockNumber", "gasUsed", "transactionIndex"):
+        if isinstance(receipt.get(key), str):
+            receipt[key] = int(receipt[key], 16)
+    return receipt
+
+
+class ReceiptWatcher:
+    def __init__(self, w3, poll_interval: float = 0.25, window: int = 1000):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self._pending = {}  # tx hash hex -> (Future, watch start)
+        self._lock = threading.Lock()
+        self._new = threading.Event()  # Hashes added since the last receipt batch
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_block = None
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latencies = deque(maxlen=window)
+        self.resolved = 0
+        self.timeouts = 0
+        self.batches = 0
+        self.errors = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="receipt-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def watch(self, tx_hash) -> Future:
+        """Future resolved with the parsed receipt once the transaction is mined"""
+        key = Web3.to_hex(tx_hash)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = (Future(), time.perf_counter())
+        self._new.set()
+        return entry[0]
+
+    async def wait(self, tx_hash, timeout: float = 120) -> dict:
+        future = self.watch(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.forget(tx_hash)
+            self.timeouts += 1
+            raise TimeoutError(f"Transaction {Web3.to_hex(tx_hash)} not mined after {timeout}s")
+
+    def wait_sync(self, tx_hash, timeout: float = 120) -> dict:
+        """Blocking wait() for worker threads"""
+        try:
+            return self.watch(tx_hash).result(timeout)
+        except FutureTimeout:
+            self.forget(tx_hash)
+            self.timeouts += 1
+            raise TimeoutError(f"Transaction {Web3.to_hex(tx_hash)} not mined after {timeout}s")
+
+    def forget(self, tx_hash):
+        """Stop watching a transaction whose waiter gave up"""
+        with self._lock:
+            self._pending.pop(Web3.to_hex(tx_hash), None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._poll()
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ [Receipts] Poll error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _poll(self):
+        with self._lock:
+            if not self._pending:
+                self._new.clear()
+                return
+        block = self.w3.eth.block_number
+        # A new block may have mined pending txs; new hashes may be in an already-seen block
+        if block == self.last_block and not self._new.is_set():
+            return
+        self.last_block = block
+        self._new.clear()
+        with self._lock:
+            keys = list(self._pending)
+        results = self.w3.batch.receipts(keys)
+        self.batches += 1
+        now = time.perf_counter()
+        for key, raw in zip(keys, results):
+            if not raw or isinstance(raw, RpcError):
+                continue
+            with self._lock:
+                entry = self._pending.pop(key, None)
+            if entry is None:
+                continue
+            future, started = entry
+            latency_ms = (now - started) * 1000
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            self.latencies.append(latency_ms)
+            self.resolved += 1
+            if not future.done():
+                future.set_result(parse_receipt(raw))
+
+    def stats(self) -> dict:
+        s = sorted(self.latencies)
+        pct = lambda q: round(s[min(len(s) - 1, int(q * len(s)))], 1) if s else 0.0
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "last_block": self.last_block,
+            "resolved": self.resolved,
+            "timeouts": self.timeouts,
+            "receipt_batches": self.batches,
+            "errors": self.errors,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99)},
+            "latency_histogram": dict(zip(labels, self.buckets)),
+        }
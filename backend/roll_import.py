@@ -0,0 +1,339 @@
+"""
+Bulk voter roll import
+Streams an EPIC CSV (EPIC_Number, Voter_Name, Father_Name[, Password][, Location]) into
+Supabase in large batches instead of one /api/register-voter call per voter:
+    users                 username = voter_id = EPIC, bcrypt-hashed initial password
+    electoral_roll        EPIC, voter name, father name
+    voter_locations.json  EPIC -> polling location
+Passwords are hashed in a process pool while the previous batches are being written.
+Malformed EPICs go to a rejects file; duplicates (in the file or already in `users`) are
+skipped before hashing. Progress is checkpointed, so an interrupted run continues with
+--resume.
+
+Without a Password column each new voter gets a random 6-digit PIN, written to --pins-out
+(only for voters actually inserted) for distribution with the voter slips. The PIN file is
+created readable by its owner only; keep it outside the repository.
+
+Usage (from backend/):
+    python roll_import.py ../csv/voter_list_final.csv --pins-out ~/roll_pins/pins.csv
+    python roll_import.py roll.csv --pins-out ~/roll_pins/pins.csv --resume --batch 5000 --workers 16
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import secrets
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+EPIC_RE = re.compile(r"^[A-Z]{3}[0-9]{7}$")
+INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\ufeff"), None)
+
+# Same assignment as generate_location_map.py (blocks of 35 voters), wrapping around
+# instead of piling every voter past the last block into the last location
+LOCATIONS = [
+    "Adyar", "Anna Nagar", "T. Nagar", "Velachery", "Mylapore",
+    "Saidapet", "Guindy", "Egmore", "Kodambakkam", "Royapettah", "Tambaram"
+]
+LOCATION_BLOCK = 35
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCATIONS_PATH = os.path.join(BACKEND_DIR, "voter_locations.json")
+
+
+def normalize_epic(value):
+    return (value or "").translate(INVISIBLE).strip().upper()
+
+
+def clean_name(value):
+    # The roll export prefixes names with invisible joiners and " : "
+    return (value or "").translate(INVISIBLE).strip().lstrip(":").strip()
+
+
+def default_location(index):
+    return LOCATIONS[(index // LOCATION_BLOCK) % len(LOCATIONS)]
+
+
+def assign_location(locations, row):
+    """A Location column wins; otherwise an existing assignment is kept"""
+    if row["location"]:
+        locations[row["epic"]] = row["location"]
+    else:
+        locations.setdefault(row["epic"], default_location(row["index"]))
+
+
+def open_private(path, mode):
+    """Text file readable and writable by its owner only (0600), created if missing"""
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if mode == "a" else os.O_TRUNC)
+    fd = os.open(path, flags, 0o600)
+    os.chmod(path, 0o600)  # An existing file keeps its mode through os.open
+    return os.fdopen(fd, mode, newline="")
+
+
+def read_roll(path):
+    """Yields (row index, row) with stripped headers; streams, never loads the file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+        for i, row in enumerate(reader):
+            yield i, row
+
+
+def hash_batch(items, rounds):
+    """Process pool worker: [(epic, password)] -> {epic: bcrypt hash}"""
+    from security import hash_password
+    return {epic: hash_password(password, rounds) for epic, password in items}
+
+
+def write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class RollImporter:
+    def __init__(self, supabase, path, batch_size=1000, workers=None, rounds=12,
+                 pins_out=None, checkpoint_path=None, rejects_path=None,
+                 locations_path=LOCATIONS_PATH, checkpoint_every=10):
+        self.supabase = supabase
+        self.path = path
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.rounds = rounds
+        self.pins_out = pins_out
+        self.checkpoint_path = checkpoint_path or f"{path}.import.json"
+        self.rejects_path = rejects_path or f"{path}.rejects.csv"
+        self.locations_path = locations_path
+        self.checkpoint_every = checkpoint_every
+        self.stats = {
+            "state": "pending", "rows": 0, "imported": 0, "duplicates": 0, "invalid": 0,
+            "batches": 0, "elapsed": 0.0, "rows_per_s": 0.0, "hashes_per_s": 0.0, "error": None,
+        }
+        self._hashed = 0
+        self._start = None
+        self._rows_done = 0  # Rows of the file fully committed (checkpoint position)
+
+    # --- Checkpoints ---
+    def _file_id(self):
+        st = os.stat(self.path)
+        return {"path": os.path.abspath(self.path), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as f:
+            cp = json.load(f)
+        if cp.get("file") != self._file_id():
+            raise RuntimeError(f"Checkpoint {self.checkpoint_path} belongs to a different version of the roll")
+        for key in ("rows", "imported", "duplicates", "invalid", "batches"):
+            self.stats[key] = cp["stats"].get(key, 0)
+        return cp["rows_done"]
+
+    def _save_checkpoint(self, locations):
+        # Locations first: a checkpoint never points past data that was not saved
+        write_json_atomic(self.locations_path, locations)
+        write_json_atomic(self.checkpoint_path, {
+            "file": self._file_id(), "rows_done": self._rows_done, "stats": self.stats,
+            "saved_at": time.time(),
+        })
+
+    # --- Pipeline ---
+    def _batches(self, start_row, seen):
+        """
+        Valid, in-file-unique rows in batches of batch_size, as (last row index, rows, counts,
+        rejects). Counts and rejects are applied when the batch commits, so a checkpoint
+        never includes rows that were read but not yet written.
+        """
+        has_password = has_location = None
+        batch, rejects = [], []
+        counts = {"rows": 0, "invalid": 0, "duplicates": 0}
+        last = start_row - 1
+        for i, row in read_roll(self.path):
+            if has_password is None:
+                has_password = "Password" in row
+                has_location = "Location" in row
+                if not has_password and not self.pins_out:
+                    raise RuntimeError("The roll has no Password column: pass pins_out for the generated PINs")
+            epic = normalize_epic(row.get("EPIC_Number"))
+            if i < start_row:
+                seen.add(epic)  # Rebuild the dedupe set for the part already imported
+                continue
+            last = i
+            counts["rows"] += 1
+            if not EPIC_RE.match(epic):
+                counts["invalid"] += 1
+                rejects.append([i, row.get("EPIC_Number", ""), "malformed EPIC"])
+            elif epic in seen:
+                counts["duplicates"] += 1
+            else:
+                seen.add(epic)
+                batch.append({
+                    "epic": epic,
+                    "name": clean_name(row.get("Voter_Name")),
+                    "father": clean_name(row.get("Father_Name")) or None,
+                    "password": row["Password"] if has_password else f"{secrets.randbelow(10 ** 6):06d}",
+                    "generated": not has_password,
+                    "location": (row.get("Location") or "").strip() if has_location else None,
+                    "index": i,
+                })
+            if len(batch) >= self.batch_size:
+                yield last, batch, counts, rejects
+                batch, rejects = [], []
+                counts = {"rows": 0, "invalid": 0, "duplicates": 0}
+        yield last, batch, counts, rejects
+
+    def _existing(self, epics):
+        res = self.supabase.table("users").select("voter_id").in_("voter_id", epics).execute()
+        return {r["voter_id"] for r in res.data or []}
+
+    def _commit(self, rows, hashes, locations, pins):
+        users = [{"username": r["epic"], "password": hashes[r["epic"]], "voter_id": r["epic"], "role": "voter"}
+                 for r in rows]
+        res = self.supabase.table("users").upsert(users, on_conflict="voter_id", ignore_duplicates=True).execute()
+        inserted = {u["voter_id"] for u in res.data or []}
+
+        roll = [{"epic_number": r["epic"], "voter_name": r["name"] or r["epic"], "father_name": r["father"]}
+                for r in rows]
+        try:
+            self.supabase.table("electoral_roll").upsert(roll, on_conflict="epic_number", ignore_duplicates=True).execute()
+        except Exception as e:
+            print(f"electoral_roll batch skipped: {e}")  # Table is optional (security_schema.sql)
+
+        for r in rows:
+            if r["epic"] not in inserted:
+                continue
+            assign_location(locations, r)
+            if r["generated"] and pins:
+                pins.writerow([r["epic"], r["password"]])
+        self.stats["imported"] += len(inserted)
+        self.stats["duplicates"] += len(rows) - len(inserted)
+
+    def _report(self, progress):
+        self.stats["elapsed"] = round(time.time() - self._start, 1)
+        if self.stats["elapsed"] > 0:
+            self.stats["rows_per_s"] = round(self.stats["rows"] / self.stats["elapsed"], 1)
+            self.stats["hashes_per_s"] = round(self._hashed / self.stats["elapsed"], 1)
+        if progress:
+            progress(dict(self.stats))
+
+    def run(self, resume=False, progress=None):
+        self._start = time.time()
+        self.stats["state"] = "running"
+        start_row = self._load_checkpoint() if resume else 0
+        self._rows_done = start_row
+        locations = {}
+        if os.path.exists(self.locations_path):
+            with open(self.locations_path, encoding="utf-8") as f:
+                locations = json.load(f)
+
+        mode = "a" if resume else "w"
+        # Workers are spawned, not forked: the API process holds model threads and sockets
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        pins_file = open_private(self.pins_out, mode) if self.pins_out else None
+        try:
+            with open(self.rejects_path, mode, newline="") as rejects_file:
+                rejects = csv.writer(rejects_file)
+                pins = csv.writer(pins_file) if pins_file else None
+                # (last row index, rows, counts, rejects, hash future or None), committed in file order
+                inflight = deque()
+
+                def commit_oldest():
+                    last, rows, counts, rejected, future = inflight.popleft()
+                    if rows:
+                        hashes = future.result()
+                        self._hashed += len(hashes)
+                        self._commit(rows, hashes, locations, pins)
+                    for key, n in counts.items():
+                        self.stats[key] += n
+                    rejects.writerows(rejected)
+                    self._rows_done = last + 1
+                    self.stats["batches"] += 1
+                    if pins_file: pins_file.flush()
+                    rejects_file.flush()
+                    if self.stats["batches"] % self.checkpoint_every == 0:
+                        self._save_checkpoint(locations)
+                    self._report(progress)
+
+                for last, rows, counts, rejected in self._batches(start_row, set()):
+                    future = None
+                    if rows:
+                        # Voters already in `users` are skipped before paying for bcrypt
+                        existing = self._existing([r["epic"] for r in rows])
+                        counts["duplicates"] += len(existing)
+                        for r in rows:
+                            # Also covers voters inserted after the last checkpoint of a crashed run
+                            if r["epic"] in existing:
+                                assign_location(locations, r)
+                        rows = [r for r in rows if r["epic"] not in existing]
+                    if rows:
+                        items = [(r["epic"], r["password"]) for r in rows]
+                        # Split across workers so one batch keeps every core busy
+                        step = max(1, -(-len(items) // self.workers))
+                        future = _merge([pool.submit(hash_batch, items[k:k + step], self.rounds)
+                                         for k in range(0, len(items), step)])
+                    inflight.append((last, rows, counts, rejected, future))
+                    while len(inflight) > 2:  # Hash the next batches while this one is written
+                        commit_oldest()
+                while inflight:
+                    commit_oldest()
+
+            self._save_checkpoint(locations)
+            self.stats["state"] = "done"
+        except Exception as e:
+            self.stats["state"] = "failed"
+            self.stats["error"] = str(e)
+            raise
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            if pins_file: pins_file.close()
+            self._report(progress)
+        return dict(self.stats)
+
+
+class _merge:
+    """Futures of one batch's hash chunks, read as a single result"""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    def result(self):
+        merged = {}
+        for f in self.futures:
+            merged.update(f.result())
+        return merged
+
+
+def print_progress(stats):
+    print(f"[Import] {stats['rows']} rows | {stats['imported']} imported | {stats['duplicates']} duplicates | "
+          f"{stats['invalid']} invalid | {stats['rows_per_s']} rows/s | {stats['hashes_per_s']} hashes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import an EPIC voter roll CSV")
+    parser.add_argument("csv", help="Roll CSV (EPIC_Number, Voter_Name, Father_Name[, Password][, Location])")
+    parser.add_argument("--pins-out", help="Where generated initial PINs are written (needed without Password column)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, help="bcrypt cost factor (default: BCRYPT_ROUNDS)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <csv>.import.json)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+    from security import create_audit_log
+    from config.settings import BCRYPT_ROUNDS
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    importer = RollImporter(client, args.csv, batch_size=args.batch, workers=args.workers,
+                            rounds=args.rounds or BCRYPT_ROUNDS, pins_out=os.path.expanduser(args.pins_out) if args.pins_out else None, checkpoint_path=args.checkpoint)
+    summary = importer.run(resume=args.resume, progress=print_progress)
+    create_audit_log(client, action="BULK_VOTER_IMPORT", user_id="ADMIN",
+                     details={"file": os.path.basename(args.csv), **summary})
+    print(f"✅ Import finished: {json.dumps(summary)}")
@@ -18,3 +18,6 @@ CREATE TABLE IF NOT EXISTS invalid_votes (
 
 -- Update existing parties with UUIDs
 UPDATE parties SET uuid = uuid_generate_v4() WHERE uuid IS NULL;
+
+-- Perceptual hash (64-bit dHash, hex) of the registration photo for the duplicate screen
+ALTER TABLE biometric_tokens ADD COLUMN IF NOT EXISTS perceptual_hash TEXT;
@@ -4,11 +4,12 @@ Includes: bcrypt password hashing, JWT tokens, rate limiting, audit logging
 """
 
 import bcrypt
+import hmac
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 import os
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 # JWT configuration
@@ -19,9 +20,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 15
 # HTTP Bearer for JWT
 security = HTTPBearer()
 
-def hash_password(password: str) -> str:
+# Shared secret for admin-only API endpoints (X-Admin-Key header); unset disables them
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+def hash_password(password: str, rounds: int = 12) -> str:
     """Hash password using bcrypt with cost factor 12"""
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -69,6 +73,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     return payload
 
+async def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """
+    Admin-only endpoint dependency
+    Usage: dependencies=[Depends(require_admin_key)]
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin API disabled (ADMIN_API_KEY not set)")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
+
 def hash_biometric_photo(photo_base64: str) -> str:
     """
     Create one-way hash of biometric photo for tokenization
@@ -0,0 +1,204 @@
+"""
+Preload-and-fork launcher
+Loads the heavy models once in a parent process, then forks uvicorn workers that share
+the weights copy-on-write instead of each worker carrying its own multi-GB copy.
+Reports per-worker unique (USS) and proportional (PSS) memory so the saving is visible.
+
+Usage (from backend/):
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 4 --preload yolo,deepface,face_recognition
+
+Linux only (os.fork, /proc/<pid>/smaps_rollup).
+
+Fork safety: MediaPipe graphs own native worker threads, which do not survive fork(),
+so MediaPipe is loaded inside each worker by default (its weights are only a few MB).
+TensorFlow is not officially fork-safe either; if workers hang on their first
+verification, drop "deepface" from --preload to load it per worker instead.
+Importing app opens no SQLite connections and starts no threads. The local stores connect
+on first use in each worker (sqlite_store.py), and executors only spawn threads when work is
+submitted. The chain indexer, photo job worker, vote forwarder and scheduler run in one
+worker only, whichever takes BACKGROUND_LOCK_FILE first (leader_lock.py).
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+DEFAULT_PRELOAD = "yolo,deepface,face_recognition"
+
+
+def read_memory(pid):
+    """RSS / PSS / USS of a process in KB from /proc (smaps_rollup, falls back to smaps)"""
+    fields = {}
+    for name in ("smaps_rollup", "smaps"):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                        key = parts[0][:-1]
+                        fields[key] = fields.get(key, 0) + int(parts[1])
+            break
+        except OSError:
+            continue
+    if not fields:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def memory_report(parent_pid, workers):
+    print("\n--- [Serve] Memory per process (MB) ---")
+    print(f"{'process':<16}{'pid':>8}{'RSS':>10}{'PSS':>10}{'USS':>10}{'shared':>10}")
+    total_pss = 0
+    for label, pid in [("parent", parent_pid)] + [(f"worker-{i}", p) for i, p in enumerate(workers)]:
+        mem = read_memory(pid)
+        if mem is None:
+            print(f"{label:<16}{pid:>8}{'n/a':>10}")
+            continue
+        total_pss += mem["pss"]
+        print(f"{label:<16}{pid:>8}{mem['rss'] / 1024:>10.1f}{mem['pss'] / 1024:>10.1f}"
+              f"{mem['uss'] / 1024:>10.1f}{mem['shared'] / 1024:>10.1f}")
+    print(f"Total PSS (actual footprint): {total_pss / 1024:.1f} MB\n")
+
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level):
+    # Fresh signal handlers: uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preload models, then fork uvicorn workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload", default=DEFAULT_PRELOAD,
+                        help="Comma-separated models to load before forking ('' for none)")
+    parser.add_argument("--report-interval", type=int, default=60,
+                        help="Seconds between memory reports (SIGUSR1 prints one on demand)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork(); use `uvicorn app:app` on this platform")
+
+    import app as app_module
+    registry = app_module.model_registry
+
+    preload = [n for n in args.preload.split(",") if n.strip()]
+    unknown = [n for n in preload if n not in registry.names()]
+    if unknown:
+        sys.exit(f"Unknown models in --preload: {unknown} (known: {registry.names()})")
+
+    print(f"--- [Serve] Preloading {preload or 'nothing'} in parent {os.getpid()} ---")
+    start = time.time()
+    status = registry.load_all(names=preload)
+    registry.shutdown()  # No loader threads may be alive across fork()
+    for name, item in status.items():
+        print(f"   {name}: {item['status']}")
+    print(f"✅ [Serve] Preload finished in {time.time() - start:.1f}s")
+
+    cache = app_module.reference_photo_cache
+    if args.workers > 1 and not cache.disk_dir:
+        # Workers could not see each other's invalidations (photo_cache.py)
+        cache.max_bytes = 0
+        print("⚠️  [Serve] PHOTO_CACHE_DIR is disabled: reference photo RAM cache turned off for multiple workers")
+
+    extra = [t.name for t in threading.enumerate() if t is not threading.main_thread()]
+    if extra:
+        print(f"⚠️  [Serve] Threads alive before fork (they will not exist in the workers): {extra}")
+
+    sock = bind_socket(args.host, args.port)
+
+    # Move everything allocated so far out of the GC's reach, so collections in the
+    # workers don't touch (and un-share) the parent's object pages.
+    gc.collect()
+    gc.freeze()
+
+    workers = []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(app_module.app, sock, args.log_level)
+            finally:
+                os._exit(0)
+        return pid
+
+    for _ in range(args.workers):
+        workers.append(spawn())
+    print(f"✅ [Serve] {len(workers)} workers on http://{args.host}:{args.port}: {workers}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    report_now = False
+
+    def request_report(signum, frame):
+        nonlocal report_now
+        report_now = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGUSR1, request_report)
+
+    last_report = time.time()
+    while workers:
+        try:
+            pid, code = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            idx = workers.index(pid) if pid in workers else None
+            if idx is not None:
+                if stopping:
+                    workers.pop(idx)
+                else:
+                    print(f"⚠️  [Serve] Worker {pid} exited ({code}), restarting")
+                    workers[idx] = spawn()
+            continue
+
+        if report_now or (args.report_interval and time.time() - last_report >= args.report_interval):
+            memory_report(os.getpid(), workers)
+            report_now = False
+            last_report = time.time()
+        time.sleep(0.5)
+
+    print("--- [Serve] All workers stopped ---")
+
+
+if __name__ == "__main__":
+    main()
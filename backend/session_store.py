@@ -0,0 +1,93 @@
+"""
+Short-lived in-memory state keyed by session token
+Used for liveness sessions and other per-client state that must not live in globals
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLStore:
+    """
+    Bounded mapping whose entries expire `ttl` seconds after their last access.
+    The least recently used entry is evicted once `maxsize` is reached.
+    `on_evict(key, value)` is called for expired, evicted and popped entries.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _evict(self, key, value):
+        if self.on_evict:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                print(f"TTLStore eviction error: {e}")
+
+    def _expire(self, now):
+        expired = []
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at <= now:
+                del self._data[key]
+                expired.append((key, value))
+        return expired
+
+    def get(self, key, default=None, touch: bool = True):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                expired = [(key, value)]
+                value = default
+            else:
+                expired = []
+                if touch:
+                    self._data[key] = (now + self.ttl, value)
+                    self._data.move_to_end(key)
+        for k, v in expired:
+            self._evict(k, v)
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + (ttl if ttl is not None else self.ttl), value)
+            self._data.move_to_end(key)
+            evicted = self._expire(now)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+        for k, v in evicted:
+            self._evict(k, v)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        if item is None:
+            return default
+        self._evict(key, item[1])
+        return item[1]
+
+    def purge(self):
+        """Drop expired entries (called opportunistically on writes)"""
+        with self._lock:
+            expired = self._expire(time.monotonic())
+        for k, v in expired:
+            self._evict(k, v)
+        return len(expired)
+
+    def __contains__(self, key):
+        return self.get(key, touch=False) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
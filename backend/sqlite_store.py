@@ -0,0 +1,45 @@
+"""
+Shared connection handling for the local SQLite stores (chain index, photo jobs, vote outbox)
+Each process has one lock-guarded connection that its threads share. The connection is opened
+on first use, not at import. It is also dropped in a forked child: serve.py imports app and
+then forks workers, and an SQLite handle must never be used on both sides of a fork().
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    def __init__(self, path: str, schema: str, **connect_kwargs):
+        self.path = path
+        self._schema = schema
+        self._connect_kwargs = connect_kwargs
+        self._conn = None
+        self._inherited = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Kept referenced, never closed: closing would act on the parent's handle
+        self._inherited = self._conn
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """This process's connection (callers hold self._lock)"""
+        if self._conn is None:
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, **self._connect_kwargs)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self._schema)
+            self._conn = db
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
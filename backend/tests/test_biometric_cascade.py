@@ -0,0 +1,59 @@
+from biometric_cascade import ACCEPT, REJECT, BiometricCascade, Outcome, Strategy
+
+
+def fixed(verdict, distance=None):
+    return lambda live, stored: Outcome(verdict, distance)
+
+
+def test_reject_prior_applies_until_enough_samples():
+    strategy = Strategy("weak", fixed(REJECT, 0.9), reject_prior=0.8)
+    cascade = BiometricCascade([strategy], min_samples=5)
+    assert cascade.reject_cutoff(strategy) == 0.8
+    cascade.stats["weak"].rejects.extend((0.5 + i / 100, False) for i in range(5))
+    assert cascade.reject_cutoff(strategy) == 0.5  # Lowest distance, none overturned
+
+
+def test_cutoff_stays_above_overturned_rejects():
+    strategy = Strategy("s", fixed(REJECT, 0.9))
+    cascade = BiometricCascade([strategy], min_samples=3, max_overturn=0.0)
+    rejects = cascade.stats["s"].rejects
+    rejects.extend([(0.9, False), (0.8, False), (0.7, False), (0.6, True), (0.5, False)])
+    assert cascade.reject_cutoff(strategy) == 0.7
+    rejects.append((0.95, True))  # Even the farthest reject was overturned once
+    assert cascade.reject_cutoff(strategy) is None
+
+
+def test_confident_reject_stops_the_cascade(monkeypatch):
+    monkeypatch.setattr("biometric_cascade.random.random", lambda: 1.0)  # Never explore
+    calls = []
+
+    def later(live, stored):
+        calls.append("later")
+        return Outcome(ACCEPT, 0.1)
+
+    first = Strategy("first", fixed(REJECT, 0.9), reject_prior=0.8)
+    cascade = BiometricCascade([first, Strategy("later", later)], adaptive=False)
+    outcome, name, trace = cascade.run(None, None)
+    assert (outcome.verdict, name, calls) == (REJECT, "first", [])
+    assert trace[0]["confident"] is True
+
+
+def test_unsure_reject_falls_through_and_is_recorded_as_overturned(monkeypatch):
+    monkeypatch.setattr("biometric_cascade.random.random", lambda: 1.0)
+    first = Strategy("first", fixed(REJECT, 0.5), tier=1, reject_prior=0.8)
+    second = Strategy("second", fixed(ACCEPT, 0.1), tier=0)
+    cascade = BiometricCascade([first, second], adaptive=False)
+    outcome, name, _ = cascade.run(None, None)
+    assert (outcome.verdict, name) == (ACCEPT, "second")
+    assert list(cascade.stats["first"].rejects) == [(0.5, True)]
+
+
+def test_plan_orders_by_cost_within_tier_once_sampled():
+    slow = Strategy("slow", fixed(ACCEPT))
+    fast = Strategy("fast", fixed(ACCEPT))
+    cascade = BiometricCascade([slow, fast], min_samples=2)
+    assert [s.name for s in cascade.plan()] == ["slow", "fast"]
+    for _ in range(2):
+        cascade.stats["slow"].record(ACCEPT, 100)
+        cascade.stats["fast"].record(ACCEPT, 10)
+    assert [s.name for s in cascade.plan()] == ["fast", "slow"]
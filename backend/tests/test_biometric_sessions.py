@@ -0,0 +1,39 @@
+import pytest
+
+from biometric_sessions import BiometricSessionStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.sqlite3")
+
+
+def test_token_issued_in_one_worker_is_redeemable_in_another(path):
+    issuer, redeemer = BiometricSessionStore(path), BiometricSessionStore(path)
+    issuer.issue("jti-1", "V1", "dlib")
+    assert redeemer.get("jti-1")["voter_id"] == "V1"
+    assert redeemer.spend("jti-1")
+    assert issuer.get("jti-1") is None
+
+
+def test_token_is_spent_once(path):
+    store = BiometricSessionStore(path)
+    store.issue("jti-1", "V1", "dlib")
+    assert store.spend("jti-1")
+    assert not BiometricSessionStore(path).spend("jti-1")
+
+
+def test_expired_token_is_rejected(path):
+    store = BiometricSessionStore(path, ttl=-1)
+    store.issue("jti-1", "V1", "dlib")
+    assert store.get("jti-1") is None
+    assert not store.spend("jti-1")
+
+
+def test_oldest_tokens_dropped_at_maxsize(path):
+    store = BiometricSessionStore(path, maxsize=2)
+    for i in range(3):
+        store.issue(f"jti-{i}", f"V{i}", "dlib")
+    assert store.get("jti-0") is None
+    assert store.get("jti-2") is not None
+    assert len(store) == 2
@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("web3")
+
+from candidate_sync import sync_candidates
+
+
+class Call:
+    def __init__(self, contract, args):
+        self.contract, self.args = contract, args
+
+    def estimate_gas(self, tx):
+        return 100_000
+
+    def transact(self, tx):
+        name = self.args[0]
+        assert "nonce" not in tx  # Assigned by the node, shared with every other admin send
+        self.contract.sent.append((name, tx["gas"]))
+        if name in self.contract.refuse:
+            raise ValueError(f"cannot send {name}")
+        return bytes([len(self.contract.sent)]) * 32
+
+
+class Functions:
+    def __init__(self, contract):
+        self.contract = contract
+
+    def addCandidate(self, *args):
+        return Call(self.contract, args)
+
+
+class FakeContract:
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.sent = []
+        self.functions = Functions(self)
+
+
+class FakeBatch:
+    def __init__(self, on_chain, reverted=()):
+        self.on_chain = on_chain
+        self.reverted = set(reverted)
+
+    def call_many(self, contract, fn_name, args_list):
+        assert fn_name == "candidateByUUID"
+        return [self.on_chain.get(args[0], 0) for args in args_list]
+
+    def wait_receipts(self, tx_hashes, timeout):
+        return {h: {"status": "0x0" if h in self.reverted else "0x1"} for h in tx_hashes}
+
+
+class FakeWeb3:
+    def __init__(self, batch):
+        self.batch = batch
+
+    @staticmethod
+    def to_hex(value):
+        return "0x" + value.hex()
+
+
+PARTIES = [{"name": n, "uuid": f"u-{n}"} for n in ("A", "B", "C", "D")]
+
+
+def test_only_missing_candidates_are_sent_in_order():
+    contract = FakeContract()
+    result = sync_candidates(FakeWeb3(FakeBatch({"u-A": 1, "u-C": 2})), contract, PARTIES, "0xadmin")
+    assert result["already"] == 2
+    assert result["added"] == ["B", "D"] and result["failed"] == []
+    assert contract.sent == [("B", 120_000), ("D", 120_000)]
+
+
+def test_nothing_missing_sends_nothing():
+    contract = FakeContract()
+    on_chain = {p["uuid"]: i + 1 for i, p in enumerate(PARTIES)}
+    result = sync_candidates(FakeWeb3(FakeBatch(on_chain)), contract, PARTIES, "0xadmin")
+    assert (result["already"], result["added"], contract.sent) == (4, [], [])
+
+
+def test_failed_send_is_reported_and_the_rest_still_sent():
+    contract = FakeContract(refuse={"B"})
+    result = sync_candidates(FakeWeb3(FakeBatch({})), contract, PARTIES, "0xadmin")
+    assert result["added"] == ["A", "C", "D"]
+    assert result["failed"] == [{"name": "B", "error": "cannot send B"}]
+    assert [name for name, _ in contract.sent] == ["A", "B", "C", "D"]
+
+
+def test_reverted_receipt_is_a_failure():
+    contract = FakeContract()
+    reverted = "0x" + (bytes([2]) * 32).hex()  # Second transaction sent (C)
+    result = sync_candidates(FakeWeb3(FakeBatch({"u-A": 1}, reverted={reverted})), contract, PARTIES, "0xadmin")
+    assert result["added"] == ["B", "D"]
+    assert result["failed"] == [{"name": "C", "error": f"reverted ({reverted})"}]
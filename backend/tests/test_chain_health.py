@@ -0,0 +1,108 @@
+import pytest
+
+import chain_health
+from chain_health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(chain_health.time, "monotonic", clock)
+    return clock
+
+
+def test_consecutive_failures_open_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, min_samples=100)
+    breaker.record(False, error="e1")
+    breaker.record(False, error="e2")
+    assert breaker.allow()
+    breaker.record(False, error="e3")
+    assert breaker.state == OPEN and not breaker.allow()
+    assert breaker.stats()["last_error"] == "e3"
+    assert breaker.trips == 1
+
+
+def test_success_resets_the_consecutive_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, min_samples=100)
+    for ok in (False, False, True, False, False):
+        breaker.record(ok)
+    assert breaker.state == CLOSED
+
+
+def test_error_rate_over_window_opens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=100, error_rate=0.5, window=10, min_samples=4)
+    for ok in (True, False, True, False):
+        breaker.record(ok)
+    assert breaker.state == OPEN
+
+
+def test_slow_success_counts_as_failure(clock):
+    breaker = CircuitBreaker(failure_threshold=1, slow_ms=100)
+    breaker.record(True, latency_ms=50)
+    assert breaker.state == CLOSED
+    breaker.record(True, latency_ms=500)
+    assert breaker.state == OPEN
+    assert "slow" in breaker.stats()["last_error"]
+
+
+def test_cooldown_then_half_open_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record(False)
+    assert breaker.retry_after() == 11
+    clock.now += 5
+    assert breaker.state == OPEN and breaker.retry_after() == 6
+    clock.now += 5
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Half-open lets only the probe through
+    breaker.record(True, latency_ms=10)
+    assert breaker.state == CLOSED and breaker.allow()
+    assert breaker.stats()["error_rate"] == 0.0
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record(False)
+    clock.now += 10
+    breaker.record(False, error="still down")
+    assert breaker.state == OPEN
+    assert breaker.trips == 2  # A failed probe re-trips it
+    assert breaker.retry_after() == 11
+
+
+class FakeBatch:
+    def __init__(self, results):
+        self.results = results
+
+    def request(self, calls, timeout=None):
+        result = self.results.pop(0)
+        if isinstance(result, Exception) and not isinstance(result, RuntimeError):
+            raise result
+        return [result]
+
+
+class FakeWeb3:
+    def __init__(self, results):
+        self.batch = FakeBatch(results)
+
+
+def test_monitor_probe_tracks_height_and_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    monitor = chain_health.ChainHealthMonitor(
+        FakeWeb3(["0x10", ConnectionError("refused"), RuntimeError("rpc error"), "0x11"]), breaker)
+    monitor.probe()
+    assert monitor.block_height == 16
+    monitor.probe()
+    monitor.probe()
+    assert breaker.state == OPEN
+    assert monitor.stats()["probe_failures"] == 2
+    clock.now += breaker.cooldown
+    monitor.probe()
+    assert breaker.state == CLOSED and monitor.block_height == 17
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("web3")
+
+from chain_index import ChainEventStore, deployment_block, voter_key
+
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+def vote(voter_id, candidate_id, tx, block, log_index=0):
+    return {"voter_key": voter_key(voter_id), "candidate_id": candidate_id, "vote_hash": f"hash-{voter_id}",
+            "timestamp": 1700000000, "tx_hash": tx, "block_number": block, "log_index": log_index}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChainEventStore(str(tmp_path / "index.sqlite3"))
+
+
+def test_store_and_lookup(store):
+    assert store.checkpoint(CONTRACT) is None
+    store.store(CONTRACT, [vote("V1", 1, "0xaa", 5), vote("V2", 2, "0xbb", 6), vote("V3", 1, "0xcc", 6, 1)],
+                [{"candidate_id": 1, "name": "A", "uuid": "u1", "tx_hash": "0x01", "block_number": 2},
+                 {"candidate_id": 2, "name": "B", "uuid": "u2", "tx_hash": "0x02", "block_number": 3}], 10)
+    assert store.checkpoint(CONTRACT) == 10
+    assert store.vote_for(CONTRACT, "V2")["tx_hash"] == "0xbb"
+    assert store.vote_for(CONTRACT, "V9") is None
+    assert store.vote_for("0xother", "V1") is None
+    assert store.vote_by_tx("0xAA")["candidate_id"] == 1
+    assert store.tallies(CONTRACT) == {1: 2, 2: 1}
+    assert [c["name"] for c in store.candidates(CONTRACT)] == ["A", "B"]
+    assert store.stats(CONTRACT) == {"votes": 3, "candidates": 2, "last_block": 10}
+
+
+def test_reindexing_a_range_is_idempotent(store):
+    rows = [vote("V1", 1, "0xaa", 5)]
+    store.store(CONTRACT, rows, [], 5)
+    store.store(CONTRACT, rows, [], 8)
+    assert store.stats(CONTRACT)["votes"] == 1
+    assert store.checkpoint(CONTRACT) == 8
+
+
+def test_deployment_block_finds_first_block_with_code():
+    class Eth:
+        block_number = 1000
+
+        def get_code(self, address, block):
+            return b"\x60\x80" if block >= 613 else b""
+
+    assert deployment_block(SimpleNamespace(eth=Eth()), CONTRACT) == 613
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("web3")
+
+from chain_rpc import BatchRPC, RpcError
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Answers each JSON-RPC array in reverse order, with an error for method 'bad'"""
+
+    def __init__(self, whole_batch_error=None):
+        self.posts = []
+        self.whole_batch_error = whole_batch_error
+
+    def post(self, url, json, timeout):
+        self.posts.append((len(json), timeout))
+        if self.whole_batch_error:
+            return FakeResponse({"jsonrpc": "2.0", "id": None, "error": self.whole_batch_error})
+        out = []
+        for call in reversed(json):
+            if call["method"] == "bad":
+                out.append({"id": call["id"], "error": {"code": -32000, "message": "execution reverted"}})
+            else:
+                out.append({"id": call["id"], "result": call["params"][0]})
+        return FakeResponse(out)
+
+
+def test_results_follow_call_order_and_errors_are_returned():
+    session = FakeSession()
+    rpc = BatchRPC(None, "http://node", session, timeout=5)
+    results = rpc.request([("echo", [1]), ("bad", [2]), ("echo", [3])])
+    assert results[0] == 1 and results[2] == 3
+    assert isinstance(results[1], RpcError) and results[1].code == -32000
+    assert session.posts == [(3, 5)]
+
+
+def test_large_batches_are_chunked_and_timeout_overrides():
+    session = FakeSession()
+    rpc = BatchRPC(None, "http://node", session, timeout=5, max_batch=4)
+    results = rpc.request([("echo", [i]) for i in range(10)], timeout=1)
+    assert results == list(range(10))
+    assert session.posts == [(4, 1), (4, 1), (2, 1)]
+    assert rpc.stats() == {"http_requests": 3, "calls": 10, "calls_per_request": 3.3}
+
+
+def test_rejected_batch_raises():
+    rpc = BatchRPC(None, "http://node", FakeSession(whole_batch_error={"code": -32600, "message": "batch too large"}))
+    with pytest.raises(RpcError, match="batch too large"):
+        rpc.request([("echo", [1])])
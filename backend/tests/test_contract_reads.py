@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from eth_utils import function_abi_to_4byte_selector
+
+import contract_reads
+from chain_rpc import RpcError
+from contract_reads import PUSH4, ContractReader, has_function, missing_from_artifact
+
+
+def fn_abi(name, inputs=("string",)):
+    return {"type": "function", "name": name, "inputs": [{"name": "", "type": t} for t in inputs]}
+
+
+ABI = [
+    fn_abi("candidatesCount", ()), fn_abi("candidates", ("uint256",)), fn_abi("getCandidates", ()),
+    fn_abi("hasVoted"), fn_abi("hasVotedMany", ("string[]",)),
+]
+
+
+class Contract:
+    def __init__(self, deployed, calls):
+        self.abi = ABI
+        self.address = f"0x{len(deployed):040x}"
+        code = b"\x60\x80" + b"".join(PUSH4 + function_abi_to_4byte_selector(fn_abi(n, i)) for n, i in deployed)
+        self.w3 = SimpleNamespace(eth=SimpleNamespace(get_code=lambda address: code))
+        views = {
+            "candidatesCount": lambda: 2,
+            "getCandidates": lambda: [(1, "A", "u1", 5), (2, "B", "u2", 0)],
+            "hasVotedMany": lambda ids: [v.startswith("x") for v in ids],
+        }
+        self.functions = SimpleNamespace(**{
+            name: (lambda f, name: lambda *a: SimpleNamespace(call=lambda: (calls.append(name), f(*a))[1]))(f, name)
+            for name, f in views.items()
+        })
+
+
+class Batch:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def call_many(self, contract, name, args):
+        self.calls.append((name, args))
+        return [self.results[name](*a) for a in args]
+
+
+@pytest.fixture(autouse=True)
+def clear_code_cache():
+    contract_reads._deployed_code.clear()
+
+
+def reader(deployed, batch_results=None):
+    calls = []
+    contract = Contract(deployed, calls)
+    batch = Batch(batch_results or {})
+    return ContractReader(SimpleNamespace(batch=batch), contract, chunk=2), calls, batch
+
+
+def test_view_missing_from_deployed_bytecode_is_not_used():
+    contract = Contract([("candidatesCount", ())], [])
+    assert has_function(contract, "candidatesCount")
+    assert not has_function(contract, "getCandidates")  # In the ABI, not in the bytecode
+    assert not has_function(contract, "getVoteHashes")  # Not even in the ABI
+
+
+def test_candidates_use_the_batched_view_when_deployed():
+    r, calls, batch = reader([("getCandidates", ())])
+    assert [c["name"] for c in r.candidates()] == ["A", "B"]
+    assert calls == ["getCandidates"] and batch.calls == []
+
+
+def test_candidates_fall_back_to_one_rpc_batch():
+    r, calls, batch = reader([], {"candidates": lambda i: (i, f"C{i}", f"u{i}", 0)})
+    assert [c["id"] for c in r.candidates()] == [1, 2]
+    assert calls == ["candidatesCount"]
+    assert batch.calls == [("candidates", [(1,), (2,)])]
+
+
+def test_voter_reads_are_chunked_and_fall_back_per_chunk():
+    r, calls, batch = reader([("hasVotedMany", ("string[]",))])
+    assert r.has_voted_many(["x1", "y2", "x3"]) == {"x1": True, "y2": False, "x3": True}
+    assert calls == ["hasVotedMany", "hasVotedMany"]
+
+    r, calls, batch = reader([], {"hasVoted": lambda v: v == "y2"})
+    assert r.has_voted_many(["x1", "y2", "x3"]) == {"x1": False, "y2": True, "x3": False}
+    assert [n for n, _ in batch.calls] == ["hasVoted", "hasVoted"]
+
+
+def test_rpc_error_inside_a_batch_is_raised():
+    r, _, _ = reader([], {"hasVoted": lambda v: RpcError({"code": 3, "message": "execution reverted"})})
+    with pytest.raises(RpcError):
+        r.has_voted_many(["x1"])
+
+
+def test_stale_artifact_is_detected():
+    source = """
+        function addCandidate(string memory _name) public onlyAdmin { }
+        function getCandidates() external view returns (Candidate[] memory) { }
+        function _internal() private { }
+    """
+    abi = [fn_abi("addCandidate"), {"type": "event", "name": "getCandidates"}]
+    assert missing_from_artifact(abi, source) == ["getCandidates"]
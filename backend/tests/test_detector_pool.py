@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from detector_pool import DetectorPool, PoolTimeout
+
+
+class Detector:
+    created = 0
+
+    def __init__(self):
+        Detector.created += 1
+        self.id = Detector.created
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool():
+    Detector.created = 0
+    return DetectorPool(Detector, size=2, name="test")
+
+
+def test_instances_are_built_lazily_and_reused(pool):
+    with pool.acquire() as a:
+        pass
+    with pool.acquire() as b:
+        assert b is a
+    assert pool.stats()["created"] == 1
+
+
+def test_concurrent_tasks_never_share_an_instance(pool):
+    in_use, clashes, lock = set(), [], threading.Lock()
+
+    def task():
+        for _ in range(50):
+            with pool.acquire() as d:
+                with lock:
+                    if d.id in in_use:
+                        clashes.append(d.id)
+                    in_use.add(d.id)
+                with lock:
+                    in_use.discard(d.id)
+
+    threads = [threading.Thread(target=task) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert clashes == []
+    assert pool.stats()["created"] <= 2
+
+
+def test_checkout_times_out_when_every_instance_is_taken(pool):
+    pool.checkout(), pool.checkout()
+    with pytest.raises(PoolTimeout):
+        pool.checkout(timeout=0)
+
+
+def test_failed_task_discards_and_rebuilds_its_instance(pool):
+    with pytest.raises(ValueError):
+        with pool.acquire() as broken:
+            raise ValueError("graph error")
+    assert broken.closed
+    with pool.acquire() as fresh:
+        assert fresh is not broken
+    assert pool.stats()["rebuilds"] == 1
+
+
+def test_checkin_wakes_a_waiter(pool):
+    a, _ = pool.checkout(), pool.checkout()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout(timeout=5)))
+    waiter.start()
+    pool.checkin(a)
+    waiter.join()
+    assert got == [a]
+    assert pool.stats()["waits"] == 1
+
+
+def test_factory_error_frees_the_slot():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("model file missing")
+        return Detector()
+
+    pool = DetectorPool(flaky, size=1)
+    with pytest.raises(RuntimeError):
+        pool.checkout(timeout=0)
+    assert pool.checkout(timeout=0) is not None
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from face_geometry import (
+    EYE_POINTS, GEOMETRIC_POINTS, MOUTH_POINTS, eye_aspect_ratio, face_box, get_geometric_vector,
+    landmarks_to_array, smile_score,
+)
+
+W, H = 640, 480
+
+
+@pytest.fixture
+def pts():
+    rng = np.random.default_rng(7)
+    return rng.uniform(0.2, 0.8, size=(478, 3)).astype(np.float32)
+
+
+def test_landmark_list_becomes_an_n_by_3_array():
+    marks = [SimpleNamespace(x=i * 0.1, y=i * 0.2, z=-i * 0.01) for i in range(5)]
+    arr = landmarks_to_array(marks)
+    assert arr.shape == (5, 3) and arr.dtype == np.float32
+    assert np.allclose(arr[3], [0.3, 0.6, -0.03])
+
+
+def test_geometric_vector_matches_pairwise_loop(pts):
+    p = [(pts[i, 0] * W, pts[i, 1] * H) for i in GEOMETRIC_POINTS]
+    scale = np.hypot(p[0][0] - p[1][0], p[0][1] - p[1][1])
+    expected = [np.hypot(p[i][0] - p[j][0], p[i][1] - p[j][1]) / scale
+                for i in range(len(p)) for j in range(i + 1, len(p))]
+    assert np.allclose(get_geometric_vector(pts, W, H), expected, rtol=1e-5)
+
+
+def test_geometric_vector_is_scale_invariant(pts):
+    shrunk = pts.copy()
+    shrunk[:, :2] = 0.5 + (pts[:, :2] - 0.5) * 0.5
+    assert np.allclose(get_geometric_vector(pts, W, H), get_geometric_vector(shrunk, W, H), rtol=1e-4)
+
+
+def test_coincident_eyes_give_no_vector(pts):
+    pts[GEOMETRIC_POINTS[1]] = pts[GEOMETRIC_POINTS[0]]
+    assert get_geometric_vector(pts, W, H) is None
+
+
+def test_eye_aspect_ratio_matches_per_eye_formula(pts):
+    def ear(idx):
+        p = [np.array([pts[i, 0] * W, pts[i, 1] * H]) for i in idx]
+        return (np.linalg.norm(p[1] - p[5]) + np.linalg.norm(p[2] - p[4])) / (2 * np.linalg.norm(p[0] - p[3]))
+
+    expected = (ear(EYE_POINTS[0]) + ear(EYE_POINTS[1])) / 2
+    assert eye_aspect_ratio(pts, W, H) == pytest.approx(expected, rel=1e-5)
+
+
+def test_face_box_is_padded_and_clamped():
+    pts = np.array([[0.01, 0.5, 0], [0.5, 0.99, 0]], dtype=np.float32)
+    x, y, w, h = face_box(pts, W, H, pad=20)
+    assert (x, y) == (0, 220)
+    assert x + w <= W and y + h <= H
+
+
+def mouth(half_width=0.06, corner_y=0.70):
+    """Landmarks with a mouth of the given half width; lip centre at y=0.70, face 0.3-0.7 wide"""
+    pts = np.zeros((478, 3), dtype=np.float32)
+    left, right, upper, lower, cheek_l, cheek_r = MOUTH_POINTS
+    pts[left] = (0.5 - half_width, corner_y, 0)
+    pts[right] = (0.5 + half_width, corner_y, 0)
+    pts[upper] = (0.5, 0.69, 0)
+    pts[lower] = (0.5, 0.71, 0)
+    pts[cheek_l] = (0.3, 0.5, 0)
+    pts[cheek_r] = (0.7, 0.5, 0)
+    return pts
+
+
+def test_wider_mouth_scores_higher():
+    assert smile_score(mouth(0.08), W, H) > smile_score(mouth(0.06), W, H)
+
+
+def test_lifted_corners_score_higher():
+    assert smile_score(mouth(corner_y=0.68), W, H) > smile_score(mouth(corner_y=0.70), W, H)
+    assert smile_score(mouth(corner_y=0.72), W, H) == pytest.approx(smile_score(mouth(), W, H))  # No penalty
+
+
+def test_degenerate_face_scores_zero():
+    pts = mouth()
+    pts[MOUTH_POINTS[5]] = pts[MOUTH_POINTS[4]]
+    assert smile_score(pts, W, H) == 0.0
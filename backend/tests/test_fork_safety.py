@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import leader_lock
+from sqlite_store import SQLiteStore
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork()")
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT);"
+
+
+def in_child(fn) -> str:
+    """Run fn() in a forked child and return what it printed to the pipe"""
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            out = str(fn())
+        except BaseException as e:
+            out = f"error: {e!r}"
+        os.write(w, out.encode())
+        os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        out = f.read()
+    os.waitpid(pid, 0)
+    return out
+
+
+def test_store_opens_lazily(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.sqlite3"), SCHEMA)
+    assert store._conn is None
+    with store._lock, store._db:
+        store._db.execute("INSERT INTO kv VALUES ('a', '1')")
+    assert store._conn is not None
+
+
+def test_forked_child_opens_its_own_connection(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.sqlite3"), SCHEMA)
+    with store._lock, store._db:
+        store._db.execute("INSERT INTO kv VALUES ('a', '1')")
+    parent_conn = store._conn
+
+    def child():
+        assert store._conn is None  # The parent's handle is not reused
+        with store._lock, store._db:
+            store._db.execute("INSERT INTO kv VALUES ('b', '2')")
+        return store._conn is not parent_conn
+
+    assert in_child(child) == "True"
+    with store._lock:
+        assert store._db is parent_conn
+        rows = store._db.execute("SELECT k FROM kv ORDER BY k").fetchall()
+    assert [r["k"] for r in rows] == ["a", "b"]
+
+
+def test_only_one_process_takes_the_background_lock(tmp_path, monkeypatch):
+    path = str(tmp_path / "background.lock")
+    monkeypatch.setattr(leader_lock, "_held", None)
+    assert in_child(lambda: leader_lock.acquire(path)) == "True"  # Lock released when the child exits
+    assert leader_lock.acquire(path)
+    assert leader_lock.acquire(path)  # Idempotent in the holder
+
+    def other_worker():
+        leader_lock._held = None  # A fresh process, not the holder
+        return leader_lock.acquire(path)
+
+    assert in_child(other_worker) == "False"
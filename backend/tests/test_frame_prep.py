@@ -0,0 +1,31 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from frame_prep import decode_frame, jpeg_size, reduced_decode_flag
+
+
+def encode(width, height, **params):
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    flags = [cv2.IMWRITE_JPEG_PROGRESSIVE, 1] if params.get("progressive") else []
+    return cv2.imencode(".jpg", img, flags)[1].tobytes()
+
+
+@pytest.mark.parametrize("progressive", [False, True])
+def test_jpeg_size_reads_the_frame_header(progressive):
+    assert jpeg_size(encode(641, 479, progressive=progressive)) == (641, 479)
+
+
+def test_jpeg_size_rejects_non_jpeg():
+    png = cv2.imencode(".png", np.zeros((4, 4, 3), dtype=np.uint8))[1].tobytes()
+    assert jpeg_size(png) is None
+    assert jpeg_size(b"\xff\xd8") is None
+
+
+def test_reduced_decode_keeps_longest_side_at_least_max_dim():
+    assert reduced_decode_flag(4000, 3000, 480) == cv2.IMREAD_REDUCED_COLOR_8
+    assert reduced_decode_flag(1920, 1080, 640) == cv2.IMREAD_REDUCED_COLOR_2
+    assert reduced_decode_flag(640, 480, 640) == cv2.IMREAD_COLOR
+    img = decode_frame(encode(1920, 1080), 640)
+    assert max(img.shape[:2]) == 640
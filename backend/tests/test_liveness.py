@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+
+from detector_pool import DetectorPool
+from liveness import CHALLENGES, LivenessSession, LivenessTracker
+
+FRAME = (480, 640, 3)
+
+
+class Mesh:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_first_face_sets_a_grown_crop_clamped_to_the_frame():
+    session = LivenessSession("t")
+    session.update_roi((20, 100, 200, 200), FRAME)
+    assert session.roi == (0, 0, 320, 400)
+
+
+def test_crop_stays_while_the_face_moves_inside_it():
+    session = LivenessSession("t")
+    session.update_roi((200, 150, 100, 100), FRAME)
+    roi = session.roi
+    session.update_roi((210, 160, 100, 100), FRAME)
+    assert session.roi == roi
+
+
+def test_crop_recentres_when_the_face_nears_its_edge():
+    session = LivenessSession("t")
+    session.update_roi((200, 150, 100, 100), FRAME)
+    session.update_roi((240, 150, 100, 100), FRAME)
+    assert session.roi == (190, 100, 200, 200)
+
+
+def test_lost_face_falls_back_to_full_frame():
+    session = LivenessSession("t")
+    session.update_roi((200, 150, 100, 100), FRAME)
+    session.landmarks = object()
+    session.lose_face()
+    assert session.roi is None and session.landmarks is None
+
+
+def test_detectors_run_every_n_frames():
+    session = LivenessSession("t")
+    assert session.due(None, 5)
+    session.frame_count = 14
+    assert not session.due(10, 5)
+    assert session.due(9, 5)
+
+
+def test_evidence_accumulates_across_frames_until_complete():
+    session = LivenessSession("t")
+    for c in CHALLENGES[:-1]:
+        result = session.record({c: True})
+        assert not result["liveness_complete"]
+    result = session.record({CHALLENGES[-1]: True})
+    assert result["liveness_complete"]
+    assert all(result["challenges"].values())
+
+
+def test_phone_in_view_blocks_completion():
+    session = LivenessSession("t")
+    session.phone_detected = True
+    assert not session.record({c: True for c in CHALLENGES})["liveness_complete"]
+
+
+def test_close_during_a_frame_releases_the_mesh_when_the_frame_ends():
+    released = []
+    session = LivenessSession("t", Mesh(), released.append)
+    with session.frame():
+        session.close()
+        assert released == [] and session.face_mesh is not None
+    assert len(released) == 1 and session.face_mesh is None
+
+
+def test_close_while_idle_releases_once():
+    released = []
+    session = LivenessSession("t", Mesh(), released.append)
+    session.close()
+    session.close()
+    assert len(released) == 1
+
+
+def test_sessions_check_out_tracking_meshes_until_the_pool_is_empty():
+    pool = DetectorPool(Mesh, size=2, name="tracking")
+    tracker = LivenessTracker(face_mesh_pool=lambda: pool)
+    a, b, c = tracker.start(), tracker.start(), tracker.start()
+    assert a.face_mesh is not None and b.face_mesh is not None
+    assert c.face_mesh is None and tracker.untracked == 1
+    tracker.end(a.token)
+    assert tracker.get(a.token) is None
+    assert tracker.start().face_mesh is not None  # a's mesh went back to the pool
+
+
+def test_expired_session_returns_its_mesh():
+    pool = DetectorPool(Mesh, size=1, name="tracking")
+    tracker = LivenessTracker(ttl=-1, face_mesh_pool=lambda: pool)
+    session = tracker.start()
+    assert tracker.get(session.token) is None
+    assert pool.stats()["idle"] == 1
+
+
+def test_concurrent_frames_of_one_session_are_serialized():
+    session = LivenessSession("t")
+    inside, overlaps = [], []
+
+    def frame():
+        with session.frame():
+            inside.append(1)
+            overlaps.append(len(inside))
+            threading.Event().wait(0.01)
+            inside.pop()
+
+    threads = [threading.Thread(target=frame) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(overlaps) == 1
+
+
+def gated_session():
+    session = LivenessSession("t")
+    session.thumb = np.full((32, 32), 100, dtype=np.float32)
+    session.record({"blink_detected": True})
+    return session
+
+
+def test_nothing_is_skipped_before_a_frame_was_analyzed():
+    session = LivenessSession("t")
+    assert not session.unchanged(np.zeros((32, 32), dtype=np.float32), threshold=5, max_skips=3)
+
+
+def test_near_identical_frame_is_skipped_with_the_last_result():
+    session = gated_session()
+    thumb = np.full((32, 32), 102, dtype=np.float32)
+    assert session.unchanged(thumb, threshold=5, max_skips=3)
+    assert not session.unchanged(thumb + 10, threshold=5, max_skips=3)
+    result = session.skip()
+    assert result["frame_skipped"] and result["challenges"]["blink_detected"]
+    assert result["frames_skipped"] == session.frames_skipped == 1
+    assert "frame_skipped" not in session.last_result
+
+
+def test_skips_in_a_row_are_capped():
+    session = gated_session()
+    thumb = session.thumb.copy()
+    for _ in range(2):
+        assert session.unchanged(thumb, threshold=5, max_skips=2)
+        session.skip()
+    assert not session.unchanged(thumb, threshold=5, max_skips=2)  # Forces a real analysis
+    session.record({})
+    assert session.unchanged(thumb, threshold=5, max_skips=2)
+    assert session.frames_skipped == 2
+
+
+def test_thumbnail_shape_change_is_never_skipped():
+    session = gated_session()
+    assert not session.unchanged(np.full((16, 16), 100, dtype=np.float32), threshold=5, max_skips=3)
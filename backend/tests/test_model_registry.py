@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+
+from model_registry import ModelNotReady, ModelRegistry
+
+
+def test_models_load_in_parallel():
+    registry = ModelRegistry()
+    barrier = threading.Barrier(3, timeout=5)  # Deadlocks unless all three load at once
+    for name in ("a", "b", "c"):
+        registry.register(name, lambda n=name: (barrier.wait(), n)[1])
+    status = registry.load_all(timeout=10)
+    assert {n: s["status"] for n, s in status.items()} == {"a": "ready", "b": "ready", "c": "ready"}
+    assert registry.get("b") == "b"
+    registry.shutdown()
+
+
+def test_failed_model_is_settled_but_not_ready():
+    registry = ModelRegistry()
+    registry.register("ok", lambda: 1)
+    registry.register("broken", lambda: 1 / 0)
+    status = registry.load_all(timeout=10)
+    assert status["broken"]["status"] == "failed" and "division" in status["broken"]["error"]
+    assert registry.get("broken") is None
+    assert registry.ready  # /ready only waits for loading to finish
+    registry.shutdown()
+
+
+def test_get_never_blocks_on_a_loading_model():
+    registry = ModelRegistry()
+    release = threading.Event()
+    registry.register("slow", lambda: release.wait(5) and "model")
+    registry.start()
+    assert registry.get("slow") is None and not registry.ready
+    release.set()
+    registry.load_all(timeout=10)
+    assert registry.get("slow") == "model"
+    registry.shutdown()
+
+
+def test_wait_raises_when_still_loading_after_timeout():
+    registry = ModelRegistry()
+    release = threading.Event()
+    registry.register("slow", lambda: release.wait(5))
+
+    async def main():
+        with pytest.raises(ModelNotReady):
+            await registry.wait("slow", timeout=0.05)
+        release.set()
+        await registry.wait("slow", timeout=5)
+
+    asyncio.run(main())
+    assert registry.status()["slow"]["status"] == "ready"
+    registry.shutdown()
+
+
+def test_shutdown_leaves_no_loader_threads():
+    registry = ModelRegistry()
+    registry.register("m", lambda: 1)
+    registry.load_all(timeout=10)
+    registry.shutdown()
+    assert not [t for t in threading.enumerate() if t.name.startswith("model-loader")]
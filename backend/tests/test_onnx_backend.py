@@ -0,0 +1,82 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import onnx_backend
+from onnx_backend import OnnxFaceEmbedder, OnnxPhoneDetector, cosine_distance, letterbox
+
+
+class FakeSession:
+    def __init__(self, shape, output):
+        self.shape = shape
+        self.output = output
+        self.fed = None
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="images", shape=self.shape)]
+
+    def run(self, outputs, feed):
+        self.fed = feed["images"]
+        return [self.output]
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def install(shape, output):
+        session = FakeSession(shape, output)
+        monkeypatch.setattr(onnx_backend, "create_session", lambda path, threads=0: session)
+        return session
+    return install
+
+
+def test_missing_onnxruntime_is_reported(monkeypatch):
+    monkeypatch.setattr(onnx_backend, "ort", None)
+    with pytest.raises(RuntimeError, match="onnxruntime"):
+        onnx_backend.create_session("model.onnx")
+
+
+def test_letterbox_keeps_aspect_and_pads():
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+    out = letterbox(img, 64, pad_value=0)
+    assert out.shape == (64, 64, 3)
+    assert out[0, 32].sum() == 0 and out[32, 32].min() == 255  # Padded top, image in the middle
+    assert (out[:, :, 0] == 255).sum() == 64 * 32
+
+
+def test_phone_detector_reads_the_phone_class_row(fake_session):
+    scores = np.zeros((1, 84, 10), dtype=np.float32)
+    scores[0, 4 + onnx_backend.PHONE_CLASS_ID, 3] = 0.7
+    session = fake_session([1, 3, 320, 320], scores)
+    detector = OnnxPhoneDetector("yolo.onnx", conf=0.5)
+    assert detector.detect_phone(np.zeros((240, 320, 3), dtype=np.uint8))
+    assert session.fed.shape == (1, 3, 320, 320) and session.fed.dtype == np.float32
+    detector.conf = 0.8
+    assert not detector.detect_phone(np.zeros((240, 320, 3), dtype=np.uint8))
+
+
+def test_face_embedder_feeds_nhwc_and_returns_the_vector(fake_session):
+    session = fake_session([1, 224, 224, 3], np.arange(8, dtype=np.float32)[None])
+    embedder = OnnxFaceEmbedder("face.onnx")
+    vec = embedder.embed(np.full((120, 90, 3), 128, dtype=np.uint8))
+    assert session.fed.shape == (1, 224, 224, 3) and session.fed.max() <= 1.0
+    assert vec.tolist() == list(range(8))
+
+
+def test_each_thread_gets_its_own_cascade(fake_session):
+    fake_session([1, 224, 224, 3], np.zeros((1, 8), dtype=np.float32))
+    embedder = OnnxFaceEmbedder("face.onnx")
+    main = embedder.face_cascade
+    assert embedder.face_cascade is main
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(embedder.face_cascade))
+    t.start()
+    t.join()
+    assert seen[0] is not main
+
+
+def test_cosine_distance():
+    assert cosine_distance([1, 0], [1, 0]) == pytest.approx(0.0)
+    assert cosine_distance([1, 0], [0, 1]) == pytest.approx(1.0)
+    assert cosine_distance([1, 2], [-1, -2]) == pytest.approx(2.0)
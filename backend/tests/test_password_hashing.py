@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from password_hashing import PasswordHasher, PasswordQueueFull, calibrate_rounds
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, rounds=4)
+
+    async def main():
+        hashed = await hasher.hash("123456")
+        return hashed, await hasher.verify("123456", hashed), await hasher.verify("654321", hashed)
+
+    hashed, ok, wrong = asyncio.run(main())
+    assert hashed.startswith("$2b$04$") and ok and not wrong
+    stats = hasher.stats()
+    assert (stats["hashed"], stats["verified"], stats["in_flight"]) == (1, 2, 0)
+
+
+def test_requests_beyond_the_queue_are_refused():
+    hasher = PasswordHasher(workers=1, max_queue=1, rounds=4)
+    release = threading.Event()
+
+    async def main():
+        held = [asyncio.ensure_future(hasher._submit(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["queued"] == 1
+        with pytest.raises(PasswordQueueFull):
+            await hasher.hash("123456")
+        release.set()
+        await asyncio.gather(*held)
+        await hasher.hash("123456")  # Room again once the backlog drains
+
+    asyncio.run(main())
+    assert hasher.counts["rejected"] == 1 and hasher.in_flight == 0
+
+
+def test_calibration_never_goes_below_the_floor():
+    rounds, ms = calibrate_rounds(target_ms=0, min_rounds=4, max_rounds=12)
+    assert rounds == 4 and ms > 0
+    hasher = PasswordHasher(workers=1)
+    assert hasher.calibrate(target_ms=10_000, min_rounds=5, max_rounds=4) == 5  # max below min
+
+
+def test_calibration_stops_at_the_ceiling():
+    rounds, _ = calibrate_rounds(target_ms=10_000, min_rounds=4, max_rounds=6)
+    assert rounds == 6
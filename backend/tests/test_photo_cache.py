@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from photo_cache import ReferencePhotoCache
+
+
+def photo(value):
+    return np.full((60, 80, 3), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two workers' caches: separate RAM tiers, one shared disk tier"""
+    disk = str(tmp_path / "photos")
+    return ReferencePhotoCache(10 * 2**20, disk), ReferencePhotoCache(10 * 2**20, disk)
+
+
+def test_disk_hit_is_promoted_to_ram(workers):
+    a, b = workers
+    a.put_image("V1", photo(10))
+    assert b.get("V1") is not None
+    assert b.get("V1") is not None
+    assert (b.hits_disk, b.hits_ram) == (1, 1)
+
+
+def test_invalidate_in_one_worker_reaches_the_other(workers):
+    a, b = workers
+    a.put_image("V1", photo(10))
+    assert b.get("V1") is not None  # Now in b's RAM tier
+    a.invalidate("V1")
+    assert b.get("V1") is None
+    assert not b.contains("V1")
+
+
+def test_new_photo_from_one_worker_replaces_the_others_ram_entry(workers):
+    a, b = workers
+    a.put_image("V1", photo(10))
+    b.get("V1")
+    a.put_image("V1", photo(200))
+    assert abs(int(b.get("V1").mean()) - 200) <= 2  # JPEG round trip
+
+
+def test_zero_budget_keeps_nothing_in_ram(tmp_path):
+    cache = ReferencePhotoCache(0)
+    cache.put_image("V1", photo(10))
+    assert cache.get("V1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_ram_budget_evicts_least_recently_used(tmp_path):
+    img = photo(10)
+    cache = ReferencePhotoCache(max_bytes=2 * img.nbytes)
+    for voter in ("V1", "V2", "V3"):
+        cache.put_image(voter, img)
+    assert cache.get("V1") is None
+    assert cache.get("V3") is not None
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from photo_hash import HammingIndex, from_hex, hamming, to_hex
+
+
+def flip(code, bits):
+    for b in bits:
+        code ^= 1 << b
+    return code
+
+
+def test_hex_round_trip():
+    code = 0x0123456789ABCDEF
+    assert to_hex(code) == "0123456789abcdef"
+    assert from_hex(to_hex(code)) == code
+    assert to_hex(5) == "0000000000000005"
+
+
+def test_chunks_must_divide_bits():
+    with pytest.raises(ValueError):
+        HammingIndex(bits=64, chunks=5)
+
+
+@pytest.mark.parametrize("chunks, radius", [(4, 3), (4, 6), (8, 10), (2, 4)])
+def test_search_matches_brute_force(chunks, radius):
+    rng = random.Random(chunks * 100 + radius)
+    index = HammingIndex(chunks=chunks)
+    codes = {}
+    for i in range(300):
+        base = rng.getrandbits(64)
+        codes[f"r{i}"] = base
+        # Near-duplicates at every distance up to the radius and just past it
+        for d in range(radius + 2):
+            codes[f"r{i}d{d}"] = flip(base, rng.sample(range(64), d))
+    for key, code in codes.items():
+        index.add(key, code)
+
+    for probe in rng.sample(sorted(codes), 50):
+        query = codes[probe]
+        expected = sorted((k, hamming(query, c)) for k, c in codes.items() if hamming(query, c) <= radius)
+        found = index.search(query, radius)
+        assert sorted(found) == expected
+        assert [d for _, d in found] == sorted(d for _, d in found)  # Closest first
+
+
+def test_add_replaces_and_remove_forgets():
+    index = HammingIndex()
+    index.add("V1", 0)
+    index.add("V1", (1 << 64) - 1)  # Re-registration replaces the old hash
+    assert index.search(0, 6) == []
+    assert index.search((1 << 64) - 1, 0) == [("V1", 0)]
+    index.remove("V1")
+    index.remove("V1")
+    assert len(index) == 0
+    assert index.stats()["entries"] == 0
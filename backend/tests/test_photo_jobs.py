@@ -0,0 +1,53 @@
+import pytest
+
+import photo_jobs
+from photo_jobs import PhotoJobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return PhotoJobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, retry_delay=10)
+
+
+def test_enqueue_supersedes_pending_job_of_same_voter(queue):
+    queue.enqueue("V1", b"old")
+    queue.enqueue("V1", b"new")
+    jobs = queue.claim(10)
+    assert [(j["voter_id"], j["payload"]) for j in jobs] == [("V1", b"new")]
+
+
+def test_claim_marks_running_and_complete_stores_artefact(queue):
+    queue.enqueue("V1", b"a")
+    queue.enqueue("V2", b"b")
+    first = queue.claim(1)
+    assert [j["voter_id"] for j in first] == ["V1"] and first[0]["attempts"] == 1
+    assert queue.progress()["running"] == 1
+    queue.complete(first[0], {"embedding": b"\x01", "embedding_kind": "geometric", "phash": "00ff", "face_found": True})
+    artefact = queue.artefact("V1")
+    assert (artefact["phash"], artefact["face_found"]) == ("00ff", 1)
+    progress = queue.progress()
+    assert (progress["done"], progress["pending"], progress["artefacts"]) == (1, 1, 1)
+
+
+def test_fail_backs_off_then_gives_up(queue, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(photo_jobs.time, "time", lambda: now[0])
+    queue.enqueue("V1", b"a")
+    for attempt in (1, 2):
+        job = queue.claim(1)[0]
+        assert job["attempts"] == attempt
+        assert queue.fail(job, "no face")
+        assert queue.claim(1) == []  # Not due yet
+        now[0] += 10 * 2 ** (attempt - 1)
+    job = queue.claim(1)[0]
+    assert not queue.fail(job, "no face")  # Third attempt was the last
+    assert queue.progress()["failed"] == 1
+    assert queue.retry_failed() == 1
+    assert queue.claim(1)[0]["attempts"] == 1
+
+
+def test_recover_requeues_running_jobs(queue):
+    queue.enqueue("V1", b"a")
+    queue.claim(1)
+    assert queue.recover() == 1
+    assert [j["voter_id"] for j in queue.claim(1)] == ["V1"]
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from web3 import Web3
+
+from chain_rpc import RpcError
+from receipt_watcher import ReceiptWatcher
+
+TX_A, TX_B, TX_C = (bytes([c]) * 32 for c in (0xaa, 0xbb, 0xcc))
+
+
+class Chain:
+    def __init__(self):
+        self.block_number = 100
+        self.mined = {}  # tx hash bytes -> raw receipt, or an RpcError
+        self.requests = []
+        self.eth = self
+        self.batch = self
+
+    def receipts(self, keys):
+        self.requests.append(list(keys))
+        mined = {Web3.to_hex(k): v for k, v in self.mined.items()}
+        return [mined.get(k) for k in keys]
+
+
+def receipt(status):
+    return {"status": hex(status), "blockNumber": "0x65", "gasUsed": "0x5208", "transactionIndex": "0x0"}
+
+
+@pytest.fixture
+def chain():
+    return Chain()
+
+
+def test_pending_transaction_stays_unresolved(chain):
+    watcher = ReceiptWatcher(chain)
+    future = watcher.watch(TX_A)
+    watcher._poll()
+    assert not future.done() and watcher.stats()["pending"] == 1
+
+
+def test_mined_and_failed_transactions_resolve_in_one_batch(chain):
+    watcher = ReceiptWatcher(chain)
+    ok, failed, pending = watcher.watch(TX_A), watcher.watch(TX_B), watcher.watch(TX_C)
+    chain.mined = {TX_A: receipt(1), TX_B: receipt(0)}
+    watcher._poll()
+    assert chain.requests == [[Web3.to_hex(tx) for tx in (TX_A, TX_B, TX_C)]]
+    assert ok.result(0) == {"status": 1, "blockNumber": 101, "gasUsed": 21000, "transactionIndex": 0}
+    assert failed.result(0)["status"] == 0  # A reverted vote resolves; callers check status
+    assert not pending.done()
+    assert watcher.stats()["resolved"] == 2 and watcher.stats()["pending"] == 1
+
+
+def test_same_block_is_not_fetched_twice(chain):
+    watcher = ReceiptWatcher(chain)
+    watcher.watch(TX_A)
+    watcher._poll()
+    watcher._poll()
+    assert len(chain.requests) == 1
+    watcher.watch(TX_B)  # A new hash may already be in the current block
+    watcher._poll()
+    chain.block_number += 1
+    watcher._poll()
+    assert len(chain.requests) == 3
+
+
+def test_rpc_error_for_one_hash_leaves_it_pending(chain):
+    watcher = ReceiptWatcher(chain)
+    future = watcher.watch(TX_A)
+    chain.mined = {TX_A: RpcError({"code": -32000, "message": "header not found"})}
+    watcher._poll()
+    assert not future.done()
+    chain.mined = {TX_A: receipt(1)}
+    chain.block_number += 1
+    watcher._poll()
+    assert future.result(0)["status"] == 1
+
+
+def test_timed_out_waiters_stop_being_watched(chain):
+    watcher = ReceiptWatcher(chain)
+    with pytest.raises(TimeoutError):
+        watcher.wait_sync(TX_A, timeout=0.01)
+    with pytest.raises(TimeoutError):
+        asyncio.run(watcher.wait(TX_B, timeout=0.01))
+    assert watcher.stats()["pending"] == 0 and watcher.timeouts == 2
+
+
+def test_background_thread_resolves_waiters(chain):
+    watcher = ReceiptWatcher(chain, poll_interval=0.01)
+    chain.mined = {TX_A: receipt(1)}
+    watcher.start()
+    try:
+        assert watcher.wait_sync(TX_A, timeout=5)["status"] == 1
+    finally:
+        watcher.stop(timeout=5)
@@ -0,0 +1,116 @@
+import csv
+import os
+import stat
+from types import SimpleNamespace
+
+import pytest
+
+from roll_import import RollImporter, open_private
+
+ROWS = [f"ABC{i:07d}" for i in range(10)]
+
+
+class Table:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def select(self, *_):
+        return self
+
+    def in_(self, column, values):
+        self.query = values
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if hasattr(self, "query"):
+            return SimpleNamespace(data=[{"voter_id": v} for v in self.query if v in self.db.users])
+        if self.name != "users":
+            return SimpleNamespace(data=[])
+        self.db.batches += 1
+        if self.db.batches == self.db.fail_at:
+            raise ConnectionError("supabase went away")
+        new = [u for u in self.rows if u["voter_id"] not in self.db.users]
+        for u in new:
+            self.db.users[u["voter_id"]] = u
+        return SimpleNamespace(data=new)
+
+
+class FakeSupabase:
+    def __init__(self, users=None, fail_at=None):
+        self.users = users if users is not None else {}
+        self.batches = 0
+        self.fail_at = fail_at
+
+    def table(self, name):
+        return Table(self, name)
+
+
+@pytest.fixture
+def roll(tmp_path):
+    path = tmp_path / "roll.csv"
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["EPIC_Number", "Voter_Name", "Father_Name"])
+        for i, epic in enumerate(ROWS):
+            w.writerow([epic, f" : Voter {i}", ""])
+            if i == 4:
+                w.writerow(["bad", "Nobody", ""])
+                w.writerow([ROWS[0], "Again", ""])
+    return path
+
+
+def importer(client, roll, tmp_path):
+    return RollImporter(client, str(roll), batch_size=2, workers=1, rounds=4, checkpoint_every=1,
+                        pins_out=str(tmp_path / "pins.csv"), locations_path=str(tmp_path / "locations.json"))
+
+
+def pins(tmp_path):
+    with open(tmp_path / "pins.csv", newline="") as f:
+        return [row[0] for row in csv.reader(f)]
+
+
+def test_import_counts_rejects_and_pins(roll, tmp_path):
+    client = FakeSupabase(users={ROWS[9]: {"voter_id": ROWS[9]}})
+    stats = importer(client, roll, tmp_path).run()
+    assert stats["state"] == "done"
+    assert (stats["rows"], stats["imported"], stats["invalid"], stats["duplicates"]) == (12, 9, 1, 2)
+    assert sorted(client.users) == ROWS
+    assert sorted(pins(tmp_path)) == ROWS[:9]  # Only voters actually inserted get a PIN
+    assert client.users[ROWS[0]]["password"].startswith("$2b$04$")
+
+
+def test_interrupted_import_resumes_from_its_checkpoint(roll, tmp_path):
+    client = FakeSupabase(fail_at=3)
+    with pytest.raises(ConnectionError):
+        importer(client, roll, tmp_path).run()
+    assert sorted(client.users) == ROWS[:4]
+
+    client.fail_at = None
+    stats = importer(client, roll, tmp_path).run(resume=True)
+    assert stats["state"] == "done"
+    assert (stats["rows"], stats["imported"], stats["invalid"], stats["duplicates"]) == (12, 10, 1, 1)
+    assert sorted(client.users) == ROWS
+    assert sorted(pins(tmp_path)) == ROWS  # No voter lost or handed two PINs
+
+
+def test_checkpoint_of_another_roll_is_refused(roll, tmp_path):
+    client = FakeSupabase(fail_at=2)
+    with pytest.raises(ConnectionError):
+        importer(client, roll, tmp_path).run()
+    with open(roll, "a") as f:
+        f.write("ABC9999999,Late Voter,\n")
+    with pytest.raises(RuntimeError, match="different version"):
+        importer(FakeSupabase(), roll, tmp_path).run(resume=True)
+
+
+def test_private_files_are_owner_only(tmp_path):
+    path = tmp_path / "pins.csv"
+    path.write_text("")
+    os.chmod(path, 0o644)
+    with open_private(str(path), "a") as f:
+        f.write("x")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
@@ -0,0 +1,47 @@
+import pytest
+
+import session_store
+from session_store import TTLStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(session_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl_from_last_access(clock):
+    evicted = []
+    store = TTLStore(maxsize=10, ttl=5, on_evict=lambda k, v: evicted.append(k))
+    store.set("a", 1)
+    clock[0] += 4
+    assert store.get("a") == 1  # Touch extends it
+    clock[0] += 4
+    assert store.get("a", touch=False) == 1
+    clock[0] += 2
+    assert store.get("a") is None
+    assert evicted == ["a"]
+
+
+def test_least_recently_used_is_evicted_at_maxsize(clock):
+    evicted = []
+    store = TTLStore(maxsize=2, ttl=60, on_evict=lambda k, v: evicted.append(k))
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert evicted == ["b"]
+    assert "a" in store and "c" in store and len(store) == 2
+
+
+def test_pop_and_purge_call_on_evict(clock):
+    evicted = []
+    store = TTLStore(maxsize=10, ttl=5, on_evict=lambda k, v: evicted.append((k, v)))
+    store.set("a", 1)
+    store.set("b", 2)
+    assert store.pop("a") == 1
+    assert store.pop("a", "gone") == "gone"
+    clock[0] += 10
+    assert store.purge() == 1
+    assert evicted == [("a", 1), ("b", 2)]
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from vote_outbox import AlreadyQueued, VoteForwarder, VoteOutbox, VoteRejected
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return VoteOutbox(str(tmp_path / "outbox.sqlite3"))
+
+
+def test_enqueue_rejects_second_vote_of_voter(outbox):
+    outbox.enqueue("V1", "party-a", "h1")
+    with pytest.raises(AlreadyQueued):
+        outbox.enqueue("V1", "party-b", "h2")
+    assert outbox.contains("V1")
+    assert not outbox.contains("V2")
+
+
+def test_claim_takes_oldest_pending_once(outbox):
+    outbox.enqueue("V1", "p", "h1")
+    outbox.enqueue("V2", "p", "h2")
+    first, second = outbox.claim(), outbox.claim()
+    assert (first["voter_id"], second["voter_id"]) == ("V1", "V2")
+    assert first["status"] == "sending" and first["attempts"] == 1
+    assert outbox.claim() is None
+
+
+def test_concurrent_claims_never_share_a_vote(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    VoteOutbox(path)
+    seed = VoteOutbox(path)
+    for i in range(100):
+        seed.enqueue(f"V{i}", "p", "h")
+    claimed, lock = [], threading.Lock()
+
+    def worker():
+        store = VoteOutbox(path)  # Separate connection, like another worker process
+        while (entry := store.claim()) is not None:
+            with lock:
+                claimed.append(entry["voter_id"])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert sorted(claimed) == sorted(f"V{i}" for i in range(100))
+
+
+def test_finishing_only_applies_to_sending_rows(outbox):
+    outbox.enqueue("V1", "p", "h")
+    assert not outbox.mark_sent("V1", "0xabc")  # Not claimed yet
+    outbox.claim()
+    assert outbox.mark_sent("V1", "0xabc")
+    assert not outbox.mark_failed("V1", "reverted")  # A late loser must not overwrite it
+    assert outbox.counts()["sent"] == 1 and outbox.counts()["failed"] == 0
+
+
+def test_release_and_recover_requeue(outbox):
+    outbox.enqueue("V1", "p", "h")
+    outbox.enqueue("V2", "p", "h")
+    outbox.claim()
+    assert outbox.release("V1", "timeout")
+    outbox.claim()  # V1 again (oldest)
+    outbox.claim()  # V2
+    assert outbox.recover() == 2
+    assert outbox.counts()["pending"] == 2
+    assert outbox.claim()["attempts"] == 3
+
+
+def test_remove_only_drops_pending_rows(outbox):
+    outbox.enqueue("V1", "p", "h")
+    assert outbox.remove("V1")["status"] == "pending"
+    assert not outbox.contains("V1")
+
+    outbox.enqueue("V2", "p", "h")
+    outbox.claim()
+    outbox.mark_sent("V2", "0xdef")
+    row = outbox.remove("V2")
+    assert (row["status"], row["tx_hash"]) == ("sent", "0xdef")
+    assert outbox.contains("V2")
+    assert outbox.remove("missing") is None
+
+
+def test_forwarder_drains_rejects_and_stops_on_transient_error(outbox):
+    for voter in ("V1", "V2", "V3", "V4"):
+        outbox.enqueue(voter, "p", "h")
+    rejected = []
+
+    def submit(entry):
+        if entry["voter_id"] == "V2":
+            raise VoteRejected("Already voted")
+        if entry["voter_id"] == "V3" and entry["attempts"] == 1:
+            raise ConnectionError("node down")
+        return "0x" + entry["voter_id"]
+
+    forwarder = VoteForwarder(outbox, submit, ready=lambda: True,
+                              on_rejected=lambda entry, reason: rejected.append(entry["voter_id"]))
+    forwarder.drain()
+    counts = outbox.counts()
+    assert (counts["sent"], counts["failed"], counts["pending"]) == (1, 1, 2)
+    assert rejected == ["V2"]
+
+    forwarder.drain()  # V3 retried, then V4
+    assert outbox.counts()["sent"] == 3
+    assert forwarder.stats()["forwarded"] == 3
+
+
+def test_forwarder_waits_while_not_ready(outbox):
+    outbox.enqueue("V1", "p", "h")
+    forwarder = VoteForwarder(outbox, lambda entry: pytest.fail("submitted while not ready"), ready=lambda: False)
+    forwarder.drain()
+    assert outbox.counts()["pending"] == 1
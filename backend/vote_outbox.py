@@ -0,0 +1,173 @@
+"""
+Store-and-forward outbox for votes accepted while the chain is unavailable
+With CHAIN_BREAKER_MODE=queue, cast_vote records the vote in the database as usual and parks
+its chain transaction here (SQLite, one row per voter, so a voter cannot be queued twice).
+A forwarder thread submits the parked votes in arrival order once the circuit breaker has
+closed, and fills in the real tx hash; a vote the contract refuses is marked failed.
+Each vote is claimed (pending -> sending) in one transaction before it is submitted, so two
+forwarders on the same file can never both send it.
+"""
+
+import sqlite3
+import threading
+import time
+
+from sqlite_store import SQLiteStore
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    voter_id TEXT PRIMARY KEY,
+    party_uuid TEXT NOT NULL,
+    vote_hash TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    tx_hash TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    queued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_status_idx ON outbox(status, queued_at);
+"""
+
+
+class AlreadyQueued(Exception):
+    pass
+
+
+class VoteRejected(Exception):
+    """The contract refused the vote (revert): retrying cannot succeed"""
+
+
+class VoteOutbox(SQLiteStore):
+    def __init__(self, path: str):
+        super().__init__(path, SCHEMA)
+
+    def enqueue(self, voter_id: str, party_uuid: str, vote_hash: str):
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT INTO outbox (voter_id, party_uuid, vote_hash, queued_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (voter_id, party_uuid, vote_hash, now, now))
+        except sqlite3.IntegrityError:
+            raise AlreadyQueued(voter_id)
+
+    def contains(self, voter_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM outbox WHERE voter_id = ?", (voter_id,)).fetchone() is not None
+
+    def remove(self, voter_id: str):
+        """
+        Undo an enqueue whose database insert failed. Only a pending row is deleted; the row
+        as it was is returned (None if absent), so the caller can see a vote already sent.
+        """
+        with self._lock, self._db:
+            row = self._db.execute("SELECT * FROM outbox WHERE voter_id = ?", (voter_id,)).fetchone()
+            if row is not None and row["status"] == PENDING:
+                self._db.execute("DELETE FROM outbox WHERE voter_id = ?", (voter_id,))
+        return dict(row) if row is not None else None
+
+    def claim(self):
+        """Take the oldest pending vote (pending -> sending) in one transaction; None if there is none"""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT * FROM outbox WHERE status = ? ORDER BY queued_at LIMIT 1",
+                                   (PENDING,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE voter_id = ?",
+                             (SENDING, time.time(), row["voter_id"]))
+        return dict(row, status=SENDING, attempts=row["attempts"] + 1)
+
+    def recover(self) -> int:
+        """Re-queue votes a crashed forwarder left sending"""
+        with self._lock, self._db:
+            return self._db.execute("UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                                    (PENDING, time.time(), SENDING)).rowcount
+
+    def _finish(self, voter_id, **fields):
+        """Update a claimed row; a row no longer `sending` is left alone"""
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._db:
+            return self._db.execute(f"UPDATE outbox SET {cols} WHERE voter_id = ? AND status = ?",
+                                    (*fields.values(), voter_id, SENDING)).rowcount == 1
+
+    def mark_sent(self, voter_id: str, tx_hash: str):
+        return self._finish(voter_id, status=SENT, tx_hash=tx_hash, last_error=None)
+
+    def mark_failed(self, voter_id: str, error: str):
+        return self._finish(voter_id, status=FAILED, last_error=error[:500])
+
+    def release(self, voter_id: str, error: str):
+        """Return a claimed vote to the queue after a transient error"""
+        return self._finish(voter_id, status=PENDING, last_error=error[:500])
+
+    def counts(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            oldest = self._db.execute("SELECT MIN(queued_at) FROM outbox WHERE status = ?", (PENDING,)).fetchone()[0]
+        return {**{s: counts.get(s, 0) for s in (PENDING, SENDING, SENT, FAILED)},
+                "oldest_pending_s": round(time.time() - oldest, 1) if oldest else 0}
+
+
+class VoteForwarder:
+    """
+    Submits parked votes in order with `submit(entry) -> tx hash` while `ready()` is true.
+    A transient error stops the round (the chain is still unwell); VoteRejected fails the entry.
+    """
+
+    def __init__(self, outbox: VoteOutbox, submit, ready, interval: float = 2.0, on_rejected=None):
+        self.outbox = outbox
+        self.submit = submit
+        self.ready = ready
+        self.interval = interval
+        self.on_rejected = on_rejected
+        self._stop = threading.Event()
+        self._thread = None
+        self.forwarded = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._thread is None:
+            recovered = self.outbox.recover()
+            if recovered:
+                print(f"[Outbox] Re-queued {recovered} votes left sending")
+            self._thread = threading.Thread(target=self._run, name="vote-forwarder", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.ready():
+                self.drain()
+            self._stop.wait(self.interval)
+
+    def drain(self):
+        while not self._stop.is_set() and self.ready():
+            entry = self.outbox.claim()
+            if entry is None:
+                return
+            try:
+                tx_hash = self.submit(entry)
+            except VoteRejected as e:
+                if self.outbox.mark_failed(entry["voter_id"], str(e)):
+                    self.rejected += 1
+                    if self.on_rejected:
+                        self.on_rejected(entry, str(e))
+                continue
+            except Exception as e:
+                self.outbox.release(entry["voter_id"], f"{type(e).__name__}: {e}")
+                return
+            self.outbox.mark_sent(entry["voter_id"], tx_hash)
+            self.forwarded += 1
+            print(f"✅ [Outbox] Forwarded vote of {entry['voter_id']}: {tx_hash}")
+
+    def stats(self) -> dict:
+        return {"forwarded": self.forwarded, "rejected": self.rejected, **self.outbox.counts()}
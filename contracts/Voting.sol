@@ -76,4 +76,29 @@ contract VotingSystem {
     function getVoteHash(string memory _voterId) public view returns (string memory) {
         return voteHashes[_voterId];
     }
+
+    // Batched views: N candidates / voters in one eth_call instead of N
+    function getCandidates() public view returns (Candidate[] memory) {
+        Candidate[] memory list = new Candidate[](candidatesCount);
+        for (uint i = 1; i <= candidatesCount; i++) {
+            list[i - 1] = candidates[i];
+        }
+        return list;
+    }
+
+    function hasVotedMany(string[] memory _voterIds) public view returns (bool[] memory) {
+        bool[] memory voted = new bool[](_voterIds.length);
+        for (uint i = 0; i < _voterIds.length; i++) {
+            voted[i] = hasVoted[_voterIds[i]];
+        }
+        return voted;
+    }
+
+    function getVoteHashes(string[] memory _voterIds) public view returns (string[] memory) {
+        string[] memory hashes = new string[](_voterIds.length);
+        for (uint i = 0; i < _voterIds.length; i++) {
+            hashes[i] = voteHashes[_voterIds[i]];
+        }
+        return hashes;
+    }
 }
@@ -1,12 +1,17 @@
 from web3 import Web3
 import os
+import sys
 import json
 
-GANACHE_URL = "http://127.0.0.1:7545"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from chain_index import ChainEventStore, ChainIndexer
+from chain_rpc import make_web3
+from config.settings import GANACHE_URL, RPC_TIMEOUT, CHAIN_INDEX_DB, CHAIN_INDEX_CHUNK
+
 ADMIN_ACCOUNT_APP = "0xF554e0De3a76D64b41f1A22db74C4B55079Be859"
 
 def check():
-    w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+    w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
     if not w3.is_connected():
         print("Failed to connect to Ganache")
         return
@@ -36,20 +41,26 @@ def check():
                      abi = json.load(jf)["abi"]
                 
                 c = w3.eth.contract(address=addr, abi=abi)
-                count = c.functions.candidatesCount().call()
-                print(f"Candidates in Contract: {count}")
-                if count == 0:
+                # Candidates, tallies and the voter lookup come from the local event index
+                store = ChainEventStore(CHAIN_INDEX_DB)
+                ChainIndexer(w3, c, store, chunk=CHAIN_INDEX_CHUNK).sync()
+                candidates = store.candidates(c.address)
+                tallies = store.tallies(c.address)
+                print(f"Candidates in Contract: {len(candidates)}")
+                if not candidates:
                     print("WARNING: No candidates in contract. Voting will fail.")
                 else:
                     # List them
-                    for i in range(1, count + 1):
-                        cand = c.functions.candidates(i).call()
-                        print(f" - Candidate {i}: {cand}")
+                    for cand in candidates:
+                        cid = cand["candidate_id"]
+                        print(f" - Candidate {cid}: {cand['name']} ({cand['uuid']}) votes={tallies.get(cid, 0)}")
                 
                 # Check Specific Voter
                 voter_id = "XOE1854504"
-                has_voted = c.functions.voters(voter_id).call()
-                print(f"Has {voter_id} voted on chain? {has_voted}")
+                vote = store.vote_for(c.address, voter_id)
+                print(f"Has {voter_id} voted on chain? {vote is not None}")
+                if vote:
+                    print(f"   block {vote['block_number']}, tx {vote['tx_hash']}")
             else:
                 print("Contract Code: EMPTY (Contract does NOT exist on this chain instance)")
     else:
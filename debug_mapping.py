@@ -3,14 +3,19 @@ import os
 from dotenv import load_dotenv
 from web3 import Web3
 import json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from chain_rpc import make_web3
+from contract_reads import ContractReader
+from config.settings import GANACHE_URL, RPC_TIMEOUT
 
 load_dotenv('backend/.env')
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_KEY")
 supabase = create_client(url, key)
 
-GANACHE_URL = "http://127.0.0.1:7545"
-w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
 with open("artifacts/contracts/Voting.sol/VotingSystem.json") as f:
     abi = json.load(f)["abi"]
 with open("contract_address.txt", "r") as f:
@@ -24,10 +29,10 @@ for i, p in enumerate(parties):
     print(f"Index {i} -> ID {i+1} : {p['name']} ({p['id']})")
 
 print("\n--- Blockchain Candidates ---")
-count = contract.functions.candidatesCount().call()
-for i in range(1, count + 1):
-    c = contract.functions.candidates(i).call()
-    print(f"ID {c[0]} : {c[1]} (Votes: {c[2]})")
+# All candidates in one read (getCandidates, or one JSON-RPC batch on older deployments)
+chain_candidates = {c["id"]: c for c in ContractReader(w3, contract).candidates()}
+for c in chain_candidates.values():
+    print(f"ID {c['id']} : {c['name']} (Votes: {c['voteCount']})")
 
 print("\n--- MAPPING CHECK ---")
 for i, p in enumerate(parties):
@@ -35,9 +40,8 @@ for i, p in enumerate(parties):
     mapped_id = i + 1
     
     # Check what this maps to on chain
-    if mapped_id <= count:
-        chain_c = contract.functions.candidates(mapped_id).call()
-        chain_name = chain_c[1]
+    if mapped_id in chain_candidates:
+        chain_name = chain_candidates[mapped_id]["name"]
         
         status = "MATCH" if db_name == chain_name else "MISMATCH !!!"
         print(f"DB '{db_name}' -> Maps to ID {mapped_id} -> Chain '{chain_name}' : [{status}]")
@@ -2,15 +2,18 @@ from web3 import Web3
 from solcx import compile_standard, install_solc
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from chain_rpc import make_web3
+from config.settings import GANACHE_URL, RPC_TIMEOUT
 
 # Install solc compiler
 install_solc('0.8.19')
 
-GANACHE_URL = "http://127.0.0.1:7545"
-
 try:
     # Connect to Ganache
-    w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+    w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
     
     # Verify connection
     if not w3.is_connected():
@@ -1,56 +1,45 @@
 from web3 import Web3
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from chain_index import ChainEventStore, ChainIndexer
+from chain_rpc import make_web3
+from config.settings import GANACHE_URL, RPC_TIMEOUT, CHAIN_INDEX_DB, CHAIN_INDEX_CHUNK
 
-GANACHE_URL = "http://127.0.0.1:7545"
 TARGET_VOTER = "XOE1854504"
 
-def recover():
-    w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+def recover(voter_id=TARGET_VOTER):
+    w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
     if not w3.is_connected():
         print("Not connected.")
         return
 
-    print("Scanning for transaction hash...")
-
-    # Load ABI for decoding
     with open("artifacts/contracts/Voting.sol/VotingSystem.json") as f:
-        contract_json = json.load(f)
-        abi = contract_json["abi"]
-    
-    contract = w3.eth.contract(abi=abi)
-
-    # Simple scan of recent blocks
-    latest = w3.eth.block_number
-    print(f"Latest Block: {latest}")
-
-    found = False
-    for i in range(latest, 0, -1):
-        block = w3.eth.get_block(i, full_transactions=True)
-        for tx in block.transactions:
-            # Check if this tx is a function call to our contract
-            try:
-                # Decode
-                func_obj, func_params = contract.decode_function_input(tx.input)
-                if func_obj.fn_name == 'vote':
-                    # Params: {'_candidateId': 1, '_epicNumber': 'XOE1854504'}
-                    voter = func_params.get('_epicNumber')
-                    cand_id = func_params.get('_candidateId')
-                    
-                    if voter == TARGET_VOTER:
-                        print(f"FOUND MATCH!")
-                        print(f"Block: {i}")
-                        print(f"Voter: {voter}")
-                        print(f"Candidate ID: {cand_id}")
-                        print(f"TX HASH: {tx.hash.hex()}")
-                        found = True
-                        break
-            except Exception as e:
-                # Not a contract call we care about
-                pass
-        if found: break
-
-    if not found:
-        print("Could not find transaction for this voter in recent blocks.")
+        abi = json.load(f)["abi"]
+    with open("contract_address.txt", "r") as f:
+        addr = f.read().strip()
+    contract = w3.eth.contract(address=addr, abi=abi)
+
+    # Bring the local event index up to the head (resumes from its checkpoint), then look up
+    store = ChainEventStore(CHAIN_INDEX_DB)
+    indexer = ChainIndexer(w3, contract, store, chunk=CHAIN_INDEX_CHUNK)
+    print(f"Indexing VoteCast logs (from block {(store.checkpoint(contract.address) or -1) + 1})...")
+    new_logs = indexer.sync()
+    print(f"Indexed {new_logs} new logs, head {store.checkpoint(contract.address)}")
+
+    vote = store.vote_for(contract.address, voter_id)
+    if not vote:
+        print(f"No VoteCast event for {voter_id} on {contract.address}.")
+        return
+
+    print(f"FOUND MATCH!")
+    print(f"Block: {vote['block_number']}")
+    print(f"Voter: {voter_id}")
+    print(f"Candidate ID: {vote['candidate_id']}")
+    print(f"Vote Hash: {vote['vote_hash']}")
+    print(f"TX HASH: {vote['tx_hash']}")
 
 if __name__ == "__main__":
-    recover()
+    recover(sys.argv[1] if len(sys.argv) > 1 else TARGET_VOTER)
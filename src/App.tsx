@@ -32,6 +32,7 @@ function App() {
   const [alert, setAlert] = useState({ show: false, message: '', type: '' });
   const [loading, setLoading] = useState(false);
   const [txHash, setTxHash] = useState('');
+  const [biometricToken, setBiometricToken] = useState<string | undefined>(undefined);
 
   const showAlert = (message: string, type = 'error') => {
     setAlert({ show: true, message, type });
@@ -114,7 +115,9 @@ function App() {
     }
   };
 
-  const handleLivenessVerified = () => {
+  const handleLivenessVerified = (token?: string) => {
+    // Kept for retries: a failed vote can be resubmitted without repeating face verification
+    setBiometricToken(token);
     setView('voting');
   };
 
@@ -129,7 +132,8 @@ function App() {
         userId: epicNumber,
         partyName,
         boothId: 'ONLINE',
-        hash: null
+        hash: null,
+        biometricToken
       });
 
       console.log('Vote Result:', result);
@@ -139,6 +143,7 @@ function App() {
       } else {
         setTxHash('Hash Pending / Not Returned');
       }
+      setBiometricToken(undefined);
       setView('success');
 
     } catch (error: any) {
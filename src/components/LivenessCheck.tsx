@@ -8,7 +8,7 @@ import { FaceMesh, Results } from '@mediapipe/face_mesh';
 import * as cam from '@mediapipe/camera_utils';
 
 interface LivenessCheckProps {
-  onVerified: () => void;
+  onVerified: (biometricToken?: string) => void;
   onCancel: () => void;
   voterId: string;
 }
@@ -73,7 +73,7 @@ export const LivenessCheck: React.FC<LivenessCheckProps> = ({ onVerified, onCanc
         setMatchScore(score);
         setProcessingMsg("Identity Verified Successfully.");
         setStep(4);
-        setTimeout(onVerified, 2000);
+        setTimeout(() => onVerified(result.biometric_token), 2000);
       } else {
         setError(result.message || "Face Match Failed / அடையாளம் காணப்படவில்லை");
         setStep(1);
@@ -1,22 +1,25 @@
-
 from web3 import Web3
 import json
 import os
+import sys
 import uuid as uuid_lib
 from supabase import create_client
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from chain_rpc import make_web3
+from candidate_sync import sync_candidates
+from config.settings import GANACHE_URL, RPC_TIMEOUT
+
 # Env Load
 load_dotenv('backend/.env')
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_KEY")
 supabase = create_client(url, key)
 
-# Web3 Config
-GANACHE_URL = "http://127.0.0.1:7545"
-
+# Web3 Config (GANACHE_URL / RPC_TIMEOUT from backend settings)
 try:
-    w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+    w3 = make_web3(GANACHE_URL, timeout=RPC_TIMEOUT)
     
     # Get the first account from Ganache (automatically available)
     accounts = w3.eth.accounts
@@ -43,31 +46,22 @@ try:
 
     print(f"Found {len(parties)} parties.")
     
-    # Get current candidates count from Chain
-    candidates_count = contract.functions.candidatesCount().call()
-    print(f"Current Candidates on Chain: {candidates_count}")
-
-    if candidates_count < len(parties):
-        print("Syncing Candidates...")
-        for i, party in enumerate(parties):
-            if (i + 1) <= candidates_count:
-                print(f"Skipping {party['name']} (Already on chain)")
-                continue
+    # Ensure every party has a UUID (the on-chain key)
+    for party in parties:
+        if not party.get('uuid'):
+            party['uuid'] = str(uuid_lib.uuid4())
+            supabase.table("parties").update({"uuid": party['uuid']}).eq("id", party['id']).execute()
+            print(f"Generated UUID for {party['name']}: {party['uuid']}")
 
-            # Ensure party has UUID
-            party_uuid = party.get('uuid')
-            if not party_uuid:
-                party_uuid = str(uuid_lib.uuid4())
-                supabase.table("parties").update({"uuid": party_uuid}).eq("id", party['id']).execute()
-                print(f"Generated UUID for {party['name']}: {party_uuid}")
-            
-            print(f"Adding {party['name']} with UUID {party_uuid}...")
-            # New contract signature: addCandidate(name, uuid)
-            tx_hash = contract.functions.addCandidate(party['name'], party_uuid).transact()
-            w3.eth.wait_for_transaction_receipt(tx_hash)
-            print(f"  -> Added. TX: {w3.to_hex(tx_hash)}")
-    else:
-        print("All parties already synced.")
+    # Diff by UUID in one batched read, submit the missing ones back to back, await receipts together
+    print("Syncing Candidates...")
+    summary = sync_candidates(w3, contract, parties, ADMIN_ACCOUNT)
+    print(f"Already on chain: {summary['already']}")
+    for name in summary["added"]:
+        print(f"  -> Added {name}")
+    for f in summary["failed"]:
+        print(f"  !! {f['name']}: {f['error']}")
+    print(f"Took {summary['seconds']}s")
 
     print("✅ Sync Complete.")
 